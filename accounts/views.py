@@ -72,7 +72,7 @@ def dashboard(request):
     # ── Room bookings ─────────────────────────────────────
     all_room = RoomBooking.objects.filter(
         guest_email=email
-    ).select_related('room').order_by('-check_in')
+    ).select_related('room').prefetch_related('room__images').order_by('-check_in')
 
     upcoming_room = all_room.filter(
         check_in__gte=today
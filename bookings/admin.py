@@ -1,14 +1,52 @@
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import redirect
+from django.urls import path, reverse
 from django.utils.translation import gettext_lazy as _
 from django.utils.html import format_html, mark_safe
 from django.utils import timezone
-from django.db.models import Sum, Count
-from .models import RoomBooking, TableBooking, BookingStatus, EmailTemplate
+from django.db import transaction
+from django.db.models import Q
+from .models import (
+    RoomBooking, TableBooking, BookingStatus, EmailTemplate, OutboundEmail, LUNCH_LAST_SLOT,
+)
+from django.contrib.admin.views.main import ChangeList
+from .inventory import sync_queryset_nights, slot_occupancy, invalidate_table_availability
+from .events import publish_status_change
+from .rollups import schedule_refresh, queryset_dates
+from .exports import csv_response, ROOM_EXPORT_COLUMNS, TABLE_EXPORT_COLUMNS
 # ── Inline status actions ────────────────────────────────────
+def _set_status(queryset, status, allowed):
+    """
+    Moves the selected rows matching `allowed` (a Q) to `status` and
+    returns the pks that actually changed: rows are picked and locked
+    first, then updated, so follow-up work covers exactly those.
+    """
+    # A plain queryset: the changelist's may carry joins or annotations
+    rows = queryset.model.objects.filter(pk__in=queryset.values('pk'))
+    with transaction.atomic():
+        pks = list(
+            rows.filter(allowed).exclude(status=status)
+            .select_for_update().values_list('pk', flat=True)
+        )
+        queryset.model.objects.filter(pk__in=pks).update(status=status)
+    return pks
+
+
+def _set_room_status(queryset, status, allowed):
+    pks     = _set_status(queryset, status, allowed)
+    changed = RoomBooking.objects.filter(pk__in=pks)
+    sync_queryset_nights(changed)
+    publish_status_change('room', pks, status)
+    schedule_refresh(queryset_dates(changed))
+    return len(pks)
+
+
 def confirm_bookings(modeladmin, request, queryset):
-    updated = queryset.exclude(
-        status=BookingStatus.CANCELLED
-    ).update(status=BookingStatus.CONFIRMED)
+    updated = _set_room_status(
+        queryset, BookingStatus.CONFIRMED, ~Q(status=BookingStatus.CANCELLED)
+    )
     modeladmin.message_user(
         request,
         _('%(n)s booking(s) marked as Confirmed.') % {'n': updated}
@@ -17,9 +55,9 @@ confirm_bookings.short_description = _('Mark selected as Confirmed')
 
 
 def cancel_bookings(modeladmin, request, queryset):
-    updated = queryset.exclude(
-        status=BookingStatus.COMPLETED
-    ).update(status=BookingStatus.CANCELLED)
+    updated = _set_room_status(
+        queryset, BookingStatus.CANCELLED, ~Q(status=BookingStatus.COMPLETED)
+    )
     modeladmin.message_user(
         request,
         _('%(n)s booking(s) marked as Cancelled.') % {'n': updated}
@@ -28,9 +66,9 @@ cancel_bookings.short_description = _('Mark selected as Cancelled')
 
 
 def complete_bookings(modeladmin, request, queryset):
-    updated = queryset.filter(
-        status=BookingStatus.CONFIRMED
-    ).update(status=BookingStatus.COMPLETED)
+    updated = _set_room_status(
+        queryset, BookingStatus.COMPLETED, Q(status=BookingStatus.CONFIRMED)
+    )
     modeladmin.message_user(
         request,
         _('%(n)s booking(s) marked as Completed.') % {'n': updated}
@@ -65,11 +103,50 @@ class UpcomingFilter(admin.SimpleListFilter):
         return queryset
 
 
+# ── CSV export ───────────────────────────────────────────────
+class CsvExportMixin:
+    """
+    Streams bookings as CSV: an action for the selected rows, and an
+    "Export CSV" link exporting everything the change list's current
+    filters, search and date hierarchy select.
+    """
+    change_list_template = 'admin/bookings/change_list_export.html'
+    export_columns       = None
+    export_filename      = None
+
+    def get_urls(self):
+        opts = self.model._meta
+        return [
+            path(
+                'export/',
+                self.admin_site.admin_view(self.export_view),
+                name=f'{opts.app_label}_{opts.model_name}_export',
+            ),
+        ] + super().get_urls()
+
+    def export_view(self, request):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        try:
+            changelist = self.get_changelist_instance(request)
+        except IncorrectLookupParameters:
+            opts = self.model._meta
+            return redirect(reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist'))
+        return csv_response(
+            changelist.get_queryset(request), self.export_columns, self.export_filename
+        )
+
+    def export_csv(self, request, queryset):
+        return csv_response(queryset, self.export_columns, self.export_filename)
+    export_csv.short_description   = _('Export selected as CSV')
+    export_csv.allowed_permissions = ('view',)
+
+
 # ══════════════════════════════════════════════════════════════
 #   ROOM BOOKING ADMIN
 # ══════════════════════════════════════════════════════════════
 @admin.register(RoomBooking)
-class RoomBookingAdmin(admin.ModelAdmin):
+class RoomBookingAdmin(CsvExportMixin, admin.ModelAdmin):
 
     # ── List view ────────────────────────────────────────────
     list_display = (
@@ -101,9 +178,11 @@ class RoomBookingAdmin(admin.ModelAdmin):
     list_per_page      = 25
     ordering           = ('-check_in',)
     date_hierarchy     = 'check_in'
-    actions            = [confirm_bookings, cancel_bookings, complete_bookings]
+    actions            = [confirm_bookings, cancel_bookings, complete_bookings, 'export_csv']
     list_display_links = ('reference', 'guest_name')
     show_full_result_count = True
+    export_columns     = ROOM_EXPORT_COLUMNS
+    export_filename    = 'room-bookings'
 
     # ── Detail view ──────────────────────────────────────────
     readonly_fields = (
@@ -113,6 +192,7 @@ class RoomBookingAdmin(admin.ModelAdmin):
         'nights_display',
         'created_at',
         'updated_at',
+        'pre_arrival_sent_at',
         'booking_summary_panel',
     )
 
@@ -147,7 +227,7 @@ class RoomBookingAdmin(admin.ModelAdmin):
             ),
         }),
         (_('System'), {
-            'fields': ('reference', 'created_at', 'updated_at'),
+            'fields': ('reference', 'pre_arrival_sent_at', 'created_at', 'updated_at'),
             'classes': ('collapse',),
         }),
     )
@@ -311,10 +391,19 @@ class TableUpcomingFilter(admin.SimpleListFilter):
         return queryset
 
 
+def _set_table_status(queryset, status, allowed):
+    pks     = _set_status(queryset, status, allowed)
+    changed = TableBooking.objects.filter(pk__in=pks)
+    invalidate_table_availability(changed.values_list('date', flat=True))
+    publish_status_change('table', pks, status)
+    schedule_refresh(queryset_dates(changed))
+    return len(pks)
+
+
 def confirm_table_bookings(modeladmin, request, queryset):
-    updated = queryset.exclude(
-        status=BookingStatus.CANCELLED
-    ).update(status=BookingStatus.CONFIRMED)
+    updated = _set_table_status(
+        queryset, BookingStatus.CONFIRMED, ~Q(status=BookingStatus.CANCELLED)
+    )
     modeladmin.message_user(
         request,
         _('%(n)s reservation(s) marked as Confirmed.') % {'n': updated}
@@ -323,9 +412,9 @@ confirm_table_bookings.short_description = _('Mark selected as Confirmed')
 
 
 def cancel_table_bookings(modeladmin, request, queryset):
-    updated = queryset.exclude(
-        status=BookingStatus.COMPLETED
-    ).update(status=BookingStatus.CANCELLED)
+    updated = _set_table_status(
+        queryset, BookingStatus.CANCELLED, ~Q(status=BookingStatus.COMPLETED)
+    )
     modeladmin.message_user(
         request,
         _('%(n)s reservation(s) marked as Cancelled.') % {'n': updated}
@@ -333,8 +422,21 @@ def cancel_table_bookings(modeladmin, request, queryset):
 cancel_table_bookings.short_description = _('Mark selected as Cancelled')
 
 
+class TableBookingChangeList(ChangeList):
+    """
+    Loads slot occupancy for every date on the current page in one
+    grouped query, so slot_capacity doesn't aggregate per row.
+    """
+
+    def get_results(self, request):
+        super().get_results(request)
+        occupancy = slot_occupancy(obj.date for obj in self.result_list)
+        for obj in self.result_list:
+            obj.slot_seats_taken = occupancy[obj.date].get(obj.time_slot, 0)
+
+
 @admin.register(TableBooking)
-class TableBookingAdmin(admin.ModelAdmin):
+class TableBookingAdmin(CsvExportMixin, admin.ModelAdmin):
 
     list_display = (
         'reference',
@@ -363,13 +465,16 @@ class TableBookingAdmin(admin.ModelAdmin):
     list_per_page      = 25
     ordering           = ('-date', 'time_slot')
     date_hierarchy     = 'date'
-    actions            = [confirm_table_bookings, cancel_table_bookings]
+    actions            = [confirm_table_bookings, cancel_table_bookings, 'export_csv']
     list_display_links = ('reference', 'guest_name')
+    export_columns     = TABLE_EXPORT_COLUMNS
+    export_filename    = 'table-bookings'
 
     readonly_fields = (
         'reference',
         'created_at',
         'updated_at',
+        'reminder_sent_at',
         'table_summary_panel',
     )
 
@@ -396,20 +501,18 @@ class TableBookingAdmin(admin.ModelAdmin):
             ),
         }),
         (_('System'), {
-            'fields': ('reference', 'created_at', 'updated_at'),
+            'fields': ('reference', 'reminder_sent_at', 'created_at', 'updated_at'),
             'classes': ('collapse',),
         }),
     )
 
-    def slot_capacity(self, obj):
-        from django.db.models import Sum
-        from .models import BookingStatus
+    def get_changelist(self, request, **kwargs):
+        return TableBookingChangeList
 
-        seats_taken = TableBooking.objects.filter(
-            date=obj.date,
-            time_slot=obj.time_slot,
-            status__in=[BookingStatus.PENDING, BookingStatus.CONFIRMED],
-        ).aggregate(total=Sum('guests'))['total'] or 0
+    def slot_capacity(self, obj):
+        seats_taken = getattr(obj, 'slot_seats_taken', None)
+        if seats_taken is None:
+            seats_taken = slot_occupancy([obj.date])[obj.date].get(obj.time_slot, 0)
 
         capacity  = TableBooking.MAX_SEATS_PER_SLOT
         pct       = int((seats_taken / capacity) * 100)
@@ -450,7 +553,7 @@ class TableBookingAdmin(admin.ModelAdmin):
     status_badge.admin_order_field = 'status'
 
     def service_display(self, obj):
-        icon = '🌞' if obj.time_slot <= '14:30' else '🌙'
+        icon = '🌞' if obj.time_slot <= LUNCH_LAST_SLOT else '🌙'
         return format_html('{} {}', icon, obj.service)
     service_display.short_description = _('Service')
 
@@ -610,4 +713,46 @@ class EmailTemplateAdmin(admin.ModelAdmin):
                 'width:100%;'
             ),
         })
-        return form
\ No newline at end of file
+        return form
+
+
+# ══════════════════════════════════════════════════════════════
+#   EMAIL OUTBOX
+# ══════════════════════════════════════════════════════════════
+def retry_emails(modeladmin, request, queryset):
+    updated = queryset.exclude(
+        status=OutboundEmail.Status.SENT
+    ).update(
+        status=OutboundEmail.Status.QUEUED,
+        attempts=0,
+        next_attempt_at=timezone.now(),
+    )
+    modeladmin.message_user(
+        request,
+        _('%(n)s email(s) queued for another attempt.') % {'n': updated}
+    )
+retry_emails.short_description = _('Retry selected emails')
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+
+    list_display  = ('subject', 'recipients', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter   = ('status',)
+    search_fields = ('subject', 'to')
+    ordering      = ('-created_at',)
+    list_per_page = 50
+    actions       = [retry_emails]
+
+    readonly_fields = (
+        'subject', 'body', 'html_body', 'from_email', 'to',
+        'status', 'attempts', 'next_attempt_at', 'last_error',
+        'created_at', 'sent_at',
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def recipients(self, obj):
+        return ', '.join(obj.to)
+    recipients.short_description = _('To')
@@ -1,104 +1,126 @@
+import asyncio
+import time
+from datetime import MINYEAR, MAXYEAR
 from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponseForbidden, StreamingHttpResponse
 from django.shortcuts import render
 from django.utils import timezone
-from django.db.models import Sum, Count, Q
-from .models import RoomBooking, TableBooking, BookingStatus
+from .dashboard import dashboard_counts, dashboard_lists
+from .models import BookingStatus
+from .events import hub, SUBSCRIBER_BUFFER
+from .forms import ReportRangeForm
+from .reports import range_report
+from .rollups import yearly_report
+
+
+EVENTS_KEEPALIVE    = 20       # seconds; keeps proxies from closing idle streams
+EVENTS_MAX_LIFETIME = 10 * 60  # seconds; then the browser reconnects
+EVENTS_RETRY_MS     = 5000     # browser reconnect delay
 
 
 @staff_member_required
 def admin_dashboard(request):
+    """
+    Reception dashboard. Counters come from one conditional aggregate
+    per model and each list is fetched once, so the page costs a
+    fixed number of queries however many bookings exist.
+    """
     today = timezone.now().date()
     now   = timezone.now()
 
-    # ── Room Booking stats ────────────────────────────────
-    checkins_today = RoomBooking.objects.filter(
-        check_in=today,
-        status__in=[BookingStatus.CONFIRMED, BookingStatus.PENDING]
-    ).select_related('room').order_by('check_in')
-
-    checkouts_today = RoomBooking.objects.filter(
-        check_out=today,
-        status__in=[BookingStatus.CONFIRMED, BookingStatus.COMPLETED]
-    ).select_related('room').order_by('check_out')
-
-    pending_room = RoomBooking.objects.filter(
-        status=BookingStatus.PENDING
-    ).select_related('room').order_by('check_in')
-
-    upcoming_room = RoomBooking.objects.filter(
-        check_in__gt=today,
-        status=BookingStatus.CONFIRMED
-    ).select_related('room').order_by('check_in')[:8]
-
-    # Guests currently in-house
-    inhouse = RoomBooking.objects.filter(
-        check_in__lte=today,
-        check_out__gt=today,
-        status=BookingStatus.CONFIRMED
-    ).select_related('room')
-
-    # Revenue this month
-    month_start = today.replace(day=1)
-    revenue_month = RoomBooking.objects.filter(
-        created_at__date__gte=month_start,
-        status__in=[BookingStatus.CONFIRMED, BookingStatus.COMPLETED]
-    ).aggregate(total=Sum('total_price'))['total'] or 0
-
-    # ── Table Booking stats ───────────────────────────────
-    tables_today = TableBooking.objects.filter(
-        date=today,
-        status__in=[BookingStatus.CONFIRMED, BookingStatus.PENDING]
-    ).order_by('time_slot')
-
-    pending_table = TableBooking.objects.filter(
-        status=BookingStatus.PENDING
-    ).order_by('date', 'time_slot')
-
-    upcoming_table = TableBooking.objects.filter(
-        date__gt=today,
-        status=BookingStatus.CONFIRMED
-    ).order_by('date', 'time_slot')[:8]
-
-    # Covers tonight
-    covers_tonight = TableBooking.objects.filter(
-        date=today,
-        time_slot__gte='19:00',
-        status__in=[BookingStatus.CONFIRMED, BookingStatus.PENDING]
-    ).aggregate(total=Sum('guests'))['total'] or 0
-
-    covers_lunch = TableBooking.objects.filter(
-        date=today,
-        time_slot__lte='14:30',
-        status__in=[BookingStatus.CONFIRMED, BookingStatus.PENDING]
-    ).aggregate(total=Sum('guests'))['total'] or 0
-
-    # ── Summary counts ────────────────────────────────────
-    counts = {
-        'checkins_today':   checkins_today.count(),
-        'checkouts_today':  checkouts_today.count(),
-        'inhouse':          inhouse.count(),
-        'pending_room':     pending_room.count(),
-        'tables_today':     tables_today.count(),
-        'pending_table':    pending_table.count(),
-        'covers_tonight':   covers_tonight,
-        'covers_lunch':     covers_lunch,
-        'revenue_month':    revenue_month,
-    }
-
     context = {
         'title':            'Dashboard',
         'today':            today,
         'now':              now,
-        'counts':           counts,
-        'checkins_today':   checkins_today,
-        'checkouts_today':  checkouts_today,
-        'pending_room':     pending_room,
-        'upcoming_room':    upcoming_room,
-        'inhouse':          inhouse,
-        'tables_today':     tables_today,
-        'pending_table':    pending_table,
-        'upcoming_table':   upcoming_table,
+        'counts':           dashboard_counts(today),
+        **dashboard_lists(today),
+        'status_labels':    {value: str(label) for value, label in BookingStatus.choices},
         # Pass through admin context
         'has_permission':   True,
     }
-    return render(request, 'admin/dashboard.html', context)
\ No newline at end of file
+    return render(request, 'admin/dashboard.html', context)
+
+
+@staff_member_required
+def admin_reports(request):
+    """Monthly occupancy / revenue / covers for one year, from DailyStats."""
+    today = timezone.now().date()
+    try:
+        year = int(request.GET.get('year', today.year))
+    except ValueError:
+        year = today.year
+    if not MINYEAR <= year <= MAXYEAR:
+        year = today.year
+
+    context = {
+        'title':          f'Reports {year}',
+        'year':           year,
+        'previous_year':  year - 1,
+        'next_year':      year + 1,
+        **yearly_report(year),
+        'has_permission': True,
+    }
+    return render(request, 'admin/reports.html', context)
+
+
+@staff_member_required
+def admin_range_report(request):
+    """
+    ADR, RevPAR, occupancy by room type, covers by time slot and
+    cancellation rates for any date range (default: year to date).
+    """
+    today = timezone.now().date()
+    form  = ReportRangeForm(request.GET or {
+        'start': today.replace(month=1, day=1),
+        'end':   today,
+    })
+
+    report = None
+    if form.is_valid():
+        report = range_report(form.cleaned_data['start'], form.cleaned_data['end'])
+
+    context = {
+        'title':          'Occupancy & Revenue',
+        'form':           form,
+        'report':         report,
+        'has_permission': True,
+    }
+    return render(request, 'admin/range_report.html', context)
+
+
+async def admin_dashboard_events(request):
+    """
+    Server-sent events for the open dashboards: each message carries
+    the booking changes plus fresh counters. Served under ASGI (see
+    asgi.py) an open stream is just a coroutine waiting on its queue:
+    no worker thread and no database connection. It sends a keepalive
+    comment while idle and ends after EVENTS_MAX_LIFETIME, when the
+    browser's EventSource reconnects. The process-wide hub does the
+    only query per change.
+    """
+    user = await request.auser()
+    if not (user.is_active and user.is_staff):
+        return HttpResponseForbidden()
+
+    loop     = asyncio.get_running_loop()
+    messages = asyncio.Queue(maxsize=SUBSCRIBER_BUFFER)
+    hub.subscribe(loop, messages)
+
+    async def stream():
+        try:
+            yield f'retry: {EVENTS_RETRY_MS}\n\n'
+            deadline = time.monotonic() + EVENTS_MAX_LIFETIME
+            while time.monotonic() < deadline:
+                try:
+                    message = await asyncio.wait_for(messages.get(), EVENTS_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'
+                    continue
+                yield f'event: bookings\ndata: {message}\n\n'
+        finally:
+            hub.unsubscribe(loop, messages)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control']     = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'   # nginx: don't buffer the stream
+    return response
@@ -0,0 +1,92 @@
+from functools import reduce
+from operator import or_
+from django.db.models import Count, Q, Sum
+from .models import (
+    RoomBooking, TableBooking, BookingStatus, DailyStats,
+    ACTIVE_STATUSES, BILLABLE_STATUSES, LUNCH_LAST_SLOT,
+)
+
+
+UPCOMING_LIMIT = 8
+
+
+def _aggregate(queryset, **counters):
+    """
+    Every counter in one query. Rows matching none of the counters'
+    filters are excluded up front so the indexes can narrow the scan.
+    """
+    scope = reduce(or_, [counter.filter for counter in counters.values()])
+    return queryset.filter(scope).aggregate(**counters)
+
+
+# ══════════════════════════════════════════════════════════════
+#   COUNTERS (one query per model)
+# ══════════════════════════════════════════════════════════════
+
+def dashboard_counts(today):
+    month_start = today.replace(day=1)
+
+    rooms = _aggregate(
+        RoomBooking.objects.all(),
+        checkins_today=Count('pk', filter=Q(check_in=today, status__in=ACTIVE_STATUSES)),
+        checkouts_today=Count('pk', filter=Q(check_out=today, status__in=BILLABLE_STATUSES)),
+        inhouse=Count('pk', filter=Q(
+            check_in__lte=today, check_out__gt=today, status=BookingStatus.CONFIRMED
+        )),
+        pending_room=Count('pk', filter=Q(status=BookingStatus.PENDING)),
+    )
+
+    # Month to date from the daily rollups (at most 31 rows)
+    rooms['revenue_month'] = DailyStats.objects.filter(
+        date__gte=month_start, date__lte=today
+    ).aggregate(total=Sum('booked_revenue'))['total']
+
+    tables = _aggregate(
+        TableBooking.objects.all(),
+        tables_today=Count('pk', filter=Q(date=today, status__in=ACTIVE_STATUSES)),
+        pending_table=Count('pk', filter=Q(status=BookingStatus.PENDING)),
+        covers_tonight=Sum('guests', filter=Q(
+            date=today, time_slot__gt=LUNCH_LAST_SLOT, status__in=ACTIVE_STATUSES
+        )),
+        covers_lunch=Sum('guests', filter=Q(
+            date=today, time_slot__lte=LUNCH_LAST_SLOT, status__in=ACTIVE_STATUSES
+        )),
+    )
+
+    counts = {**rooms, **tables}
+    # Sum() over no rows is NULL
+    for key in ('revenue_month', 'covers_tonight', 'covers_lunch'):
+        counts[key] = counts[key] or 0
+    return counts
+
+
+# ══════════════════════════════════════════════════════════════
+#   LISTS (materialized once)
+# ══════════════════════════════════════════════════════════════
+
+def dashboard_lists(today):
+    rooms = RoomBooking.objects.select_related('room')
+    return {
+        'checkins_today': list(
+            rooms.filter(check_in=today, status__in=ACTIVE_STATUSES).order_by('check_in')
+        ),
+        'checkouts_today': list(
+            rooms.filter(check_out=today, status__in=BILLABLE_STATUSES).order_by('check_out')
+        ),
+        'pending_room': list(
+            rooms.filter(status=BookingStatus.PENDING).order_by('check_in')
+        ),
+        'upcoming_room': list(
+            rooms.filter(
+                check_in__gt=today, status=BookingStatus.CONFIRMED
+            ).order_by('check_in')[:UPCOMING_LIMIT]
+        ),
+        'tables_today': list(
+            TableBooking.objects.filter(date=today, status__in=ACTIVE_STATUSES).order_by('time_slot')
+        ),
+        'upcoming_table': list(
+            TableBooking.objects.filter(
+                date__gt=today, status=BookingStatus.CONFIRMED
+            ).order_by('date', 'time_slot')[:UPCOMING_LIMIT]
+        ),
+    }
@@ -1,7 +1,7 @@
 from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.conf import settings
-from .models import EmailTemplate
+from .models import EmailTemplate, OutboundEmail
 
 
 # ══════════════════════════════════════════════════════════════
@@ -44,11 +44,11 @@ def _build_context(booking, booking_type='room'):
 #   TEMPLATE LOADER
 # ══════════════════════════════════════════════════════════════
 
-def _get_template(key):
+def get_email_template(key):
     """
     Returns the active EmailTemplate for the given key.
-    Raises ValueError if none is found — the booking view catches
-    this and still saves the booking without crashing.
+    Raises ValueError if none is found — the booking view and the
+    reminder command catch this and carry on without the email.
     """
     template = EmailTemplate.get(key)
     if not template:
@@ -65,11 +65,12 @@ def _get_template(key):
 
 def send_booking_confirmation(booking):
     """
-    Sends a confirmation email to the guest and a notification
-    to the hotel manager for a room booking.
+    Queues a confirmation email to the guest and a notification
+    to the hotel manager for a room booking. Delivery happens in
+    `manage.py send_queued_emails`, outside the request.
     """
     context  = _build_context(booking, 'room')
-    template = _get_template(EmailTemplate.TemplateKey.ROOM_CONFIRMATION)
+    template = get_email_template(EmailTemplate.TemplateKey.ROOM_CONFIRMATION)
 
     subject   = template.render_subject(context)
     body_txt  = template.render_body(context)
@@ -85,7 +86,7 @@ def send_booking_confirmation(booking):
         to         = [booking.guest_email],
     )
     guest_msg.attach_alternative(body_html, 'text/html')
-    guest_msg.send(fail_silently=False)
+    OutboundEmail.queue(guest_msg)
 
     # ── Notification to manager ───────────────────────────
     manager_body = (
@@ -104,12 +105,12 @@ def send_booking_confirmation(booking):
     if booking.special_requests:
         manager_body += f"Richieste    : {booking.special_requests}\n"
 
-    EmailMultiAlternatives(
+    OutboundEmail.queue(EmailMultiAlternatives(
         subject    = f"[Nuova Prenotazione] {booking.reference} — {booking.guest_name}",
         body       = manager_body,
         from_email = settings.DEFAULT_FROM_EMAIL,
         to         = [settings.MANAGER_EMAIL],
-    ).send(fail_silently=True)
+    ))
 
 
 # ══════════════════════════════════════════════════════════════
@@ -118,11 +119,11 @@ def send_booking_confirmation(booking):
 
 def send_table_confirmation(booking):
     """
-    Sends a confirmation email to the guest and a notification
+    Queues a confirmation email to the guest and a notification
     to the hotel manager for a table reservation.
     """
     context  = _build_context(booking, 'table')
-    template = _get_template(EmailTemplate.TemplateKey.TABLE_CONFIRMATION)
+    template = get_email_template(EmailTemplate.TemplateKey.TABLE_CONFIRMATION)
 
     subject   = template.render_subject(context)
     body_txt  = template.render_body(context)
@@ -138,7 +139,7 @@ def send_table_confirmation(booking):
         to         = [booking.guest_email],
     )
     guest_msg.attach_alternative(body_html, 'text/html')
-    guest_msg.send(fail_silently=False)
+    OutboundEmail.queue(guest_msg)
 
     # ── Notification to manager ───────────────────────────
     manager_body = (
@@ -155,9 +156,27 @@ def send_table_confirmation(booking):
     if booking.special_requests:
         manager_body += f"Richieste    : {booking.special_requests}\n"
 
-    EmailMultiAlternatives(
+    OutboundEmail.queue(EmailMultiAlternatives(
         subject    = f"[Nuovo Tavolo] {booking.reference} — {booking.guest_name}",
         body       = manager_body,
         from_email = settings.DEFAULT_FROM_EMAIL,
         to         = [settings.MANAGER_EMAIL],
-    ).send(fail_silently=True)
\ No newline at end of file
+    ))
+
+
+# ══════════════════════════════════════════════════════════════
+#   REMINDERS (pre-arrival / table)
+# ══════════════════════════════════════════════════════════════
+
+def build_reminder(booking, template, booking_type='room'):
+    """
+    Renders a plain-text reminder for one booking from an already
+    loaded EmailTemplate. Returns an unsent EmailMultiAlternatives.
+    """
+    context = _build_context(booking, booking_type)
+    return EmailMultiAlternatives(
+        subject    = template.render_subject(context),
+        body       = template.render_body(context),
+        from_email = settings.DEFAULT_FROM_EMAIL,
+        to         = [booking.guest_email],
+    )
@@ -0,0 +1,157 @@
+import json
+import logging
+import select
+import threading
+import time
+from asyncio import QueueFull
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, connections, transaction
+from django.utils import timezone
+from .dashboard import dashboard_counts
+
+logger = logging.getLogger(__name__)
+
+
+# PostgreSQL LISTEN/NOTIFY channel shared by every web process
+CHANNEL = 'booking_events'
+
+SUBSCRIBER_BUFFER = 100   # messages a slow dashboard may fall behind
+LISTEN_TIMEOUT    = 5     # seconds between liveness checks
+RECONNECT_DELAY   = 5     # seconds
+MAX_EVENT_IDS     = 200   # keeps NOTIFY payloads well under 8000 bytes
+
+
+# ══════════════════════════════════════════════════════════════
+#   PUBLISHING
+# ══════════════════════════════════════════════════════════════
+
+def publish(event):
+    """
+    Announces a booking change to every open dashboard, in every
+    process, once the surrounding transaction commits.
+    """
+    payload = json.dumps(event, cls=DjangoJSONEncoder)
+    if connection.vendor == 'postgresql':
+        # NOTIFY is transactional: delivered on commit, dropped on rollback
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [CHANNEL, payload])
+    else:
+        # Single-process development: fan out in-process
+        transaction.on_commit(lambda: hub.dispatch([json.loads(payload)]))
+
+
+def booking_event(booking, action):
+    """
+    Event for one saved RoomBooking / TableBooking. NOTIFY payloads
+    are visible to any session LISTENing on the channel, so no guest
+    details: ids, status and the reference are all the dashboard uses.
+    """
+    return {
+        'model':      'room' if booking._meta.model_name == 'roombooking' else 'table',
+        'action':     action,
+        'ids':        [booking.pk],
+        'status':     booking.status,
+        'reference':  booking.reference,
+    }
+
+
+def publish_status_change(model_name, pks, status):
+    """
+    Event for an admin bulk action (queryset.update() sends no
+    signals). `pks` are the rows the action actually changed.
+    """
+    publish({
+        'model':  model_name,
+        'action': 'status',
+        'ids':    list(pks)[:MAX_EVENT_IDS],
+        'status': status,
+    })
+
+
+# ══════════════════════════════════════════════════════════════
+#   FAN-OUT (one per process)
+# ══════════════════════════════════════════════════════════════
+
+class EventHub:
+    """
+    Holds the open dashboard streams of this process, one
+    (event loop, asyncio.Queue) each. One LISTEN connection feeds all
+    of them, and the dashboard counters are recomputed once per batch
+    of events rather than once per viewer.
+    """
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock        = threading.Lock()
+        self._listener    = None
+
+    def subscribe(self, loop, queue):
+        with self._lock:
+            self._subscribers.add((loop, queue))
+            if connection.vendor == 'postgresql' and self._listener is None:
+                self._listener = threading.Thread(
+                    target=self._listen, name='booking-events', daemon=True
+                )
+                self._listener.start()
+
+    def unsubscribe(self, loop, queue):
+        with self._lock:
+            self._subscribers.discard((loop, queue))
+
+    def dispatch(self, events):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if not subscribers:
+            return
+
+        message = json.dumps({
+            'events': events,
+            'counts': dashboard_counts(timezone.now().date()),
+        }, cls=DjangoJSONEncoder)
+        for loop, queue in subscribers:
+            if loop.is_closed():
+                self.unsubscribe(loop, queue)
+                continue
+            # asyncio.Queue is not thread-safe: hand over on its own loop
+            loop.call_soon_threadsafe(_offer, queue, message)
+
+    def _listen(self):
+        while True:
+            try:
+                self._listen_once()
+            except Exception:
+                logger.exception('Booking event listener lost its connection')
+            finally:
+                connections.close_all()
+            time.sleep(RECONNECT_DELAY)
+
+    def _listen_once(self):
+        db     = connections['default']
+        listen = db.Database.connect(**db.get_connection_params())
+        listen.autocommit = True
+        try:
+            with listen.cursor() as cursor:
+                cursor.execute(f'LISTEN {CHANNEL}')
+            while True:
+                if select.select([listen], [], [], LISTEN_TIMEOUT) == ([], [], []):
+                    continue
+                listen.poll()
+                events = [json.loads(note.payload) for note in listen.notifies]
+                listen.notifies.clear()
+                if events:
+                    self.dispatch(events)
+                    # The counters query ran on this thread's own connection
+                    connections.close_all()
+        finally:
+            listen.close()
+
+
+def _offer(queue, message):
+    # A dashboard that fell SUBSCRIBER_BUFFER messages behind skips this one
+    try:
+        queue.put_nowait(message)
+    except QueueFull:
+        pass
+
+
+hub = EventHub()
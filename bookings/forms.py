@@ -1,8 +1,11 @@
 from django import forms
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
+from django.utils.formats import date_format
+from restaurant.models import RestaurantSettings
 from .models import RoomBooking, BookingStatus, TimeSlot, TableBooking
-from django.db import models
+from .inventory import room_is_free, slot_occupancy
+from .reports import MAX_REPORT_DAYS
 
 class RoomBookingForm(forms.ModelForm):
 
@@ -102,14 +105,7 @@ class RoomBookingForm(forms.ModelForm):
 
         # Check date conflicts
         if self.room and check_in and check_out:
-            from .models import BookingStatus
-            conflict = RoomBooking.objects.filter(
-                room=self.room,
-                status__in=[BookingStatus.PENDING, BookingStatus.CONFIRMED],
-                check_in__lt=check_out,
-                check_out__gt=check_in,
-            ).exists()
-            if conflict:
+            if not room_is_free(self.room, check_in, check_out):
                 raise forms.ValidationError(
                     _('This room is not available for the selected dates. Please choose different dates.')
                 )
@@ -179,9 +175,9 @@ class TableBookingForm(forms.ModelForm):
             raise forms.ValidationError(
                 _('Reservation date cannot be in the past.')
             )
-        if date.weekday() == 0:
+        if RestaurantSettings.get().is_closed_on(date):
             raise forms.ValidationError(
-                _('The restaurant is closed on Mondays.')
+                _('The restaurant is closed on %(day)s.') % {'day': date_format(date, 'l')}
             )
         return date
 
@@ -201,18 +197,40 @@ class TableBookingForm(forms.ModelForm):
 
         if date and time_slot and guests:
             # Check seat availability
-            from .models import TableBooking as TB
-            seats_taken = TB.objects.filter(
-                date=date,
-                time_slot=time_slot,
-                status__in=[BookingStatus.PENDING, BookingStatus.CONFIRMED],
-            ).aggregate(
-                total=models.Sum('guests')
-            )['total'] or 0
+            seats_taken = slot_occupancy([date])[date].get(time_slot, 0)
 
             available = TableBooking.MAX_SEATS_PER_SLOT - seats_taken
             if guests > available:
                 raise forms.ValidationError(
                     _('Not enough seats available for this time slot. Please choose a different time.')
                 )
-        return cleaned
\ No newline at end of file
+        return cleaned
+
+
+class ReportRangeForm(forms.Form):
+    """Date range for the staff occupancy / revenue report."""
+
+    start = forms.DateField(
+        label=_('From'),
+        widget=forms.DateInput(attrs={'type': 'date'}),
+    )
+    end = forms.DateField(
+        label=_('To'),
+        widget=forms.DateInput(attrs={'type': 'date'}),
+    )
+
+    def clean(self):
+        cleaned = super().clean()
+        start   = cleaned.get('start')
+        end     = cleaned.get('end')
+
+        if start and end:
+            if end < start:
+                raise forms.ValidationError(
+                    _('The end date must not be before the start date.')
+                )
+            if (end - start).days >= MAX_REPORT_DAYS:
+                raise forms.ValidationError(
+                    _('Please choose a range of at most %(days)s days.') % {'days': MAX_REPORT_DAYS}
+                )
+        return cleaned
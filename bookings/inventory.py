@@ -0,0 +1,282 @@
+from datetime import date, timedelta
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from core.cache import cache_version, bump_cache_version
+from restaurant.models import RestaurantSettings
+from rooms.models import Room
+from .models import (
+    RoomBooking, RoomNight, TableBooking, TimeSlot,
+    ACTIVE_STATUSES, LUNCH_LAST_SLOT,
+)
+
+
+# ══════════════════════════════════════════════════════════════
+#   LEDGER MAINTENANCE
+# ══════════════════════════════════════════════════════════════
+
+def stay_nights(check_in, check_out):
+    """
+    Returns every night of a stay as a list of dates.
+    The check-out day itself is not a night.
+    """
+    return [
+        check_in + timedelta(days=i)
+        for i in range((check_out - check_in).days)
+    ]
+
+
+def sync_booking_nights(booking):
+    """
+    Rewrites the ledger rows held by a single booking.
+    Cancelled / completed bookings release their nights.
+    """
+    RoomNight.objects.filter(booking=booking).delete()
+    transaction.on_commit(bump_room_calendar_version)
+
+    if booking.status not in ACTIVE_STATUSES:
+        return
+
+    RoomNight.objects.bulk_create([
+        RoomNight(room_id=booking.room_id, booking=booking, night=night)
+        for night in stay_nights(booking.check_in, booking.check_out)
+    ])
+
+
+def sync_queryset_nights(queryset):
+    """
+    Re-syncs the ledger after a bulk queryset.update() —
+    used by the admin status actions, which bypass save().
+    """
+    for booking in queryset.only('pk', 'room_id', 'check_in', 'check_out', 'status'):
+        sync_booking_nights(booking)
+
+
+def rebuild_ledger():
+    """
+    Drops and rebuilds the whole ledger from RoomBooking.
+    Overlapping legacy bookings keep whichever night was written first.
+    Returns the number of nights written.
+    """
+    RoomNight.objects.all().delete()
+
+    bookings = RoomBooking.objects.filter(
+        status__in=ACTIVE_STATUSES
+    ).only('pk', 'room_id', 'check_in', 'check_out').order_by('created_at')
+
+    written = 0
+    for booking in bookings.iterator(chunk_size=500):
+        nights = [
+            RoomNight(room_id=booking.room_id, booking_id=booking.pk, night=night)
+            for night in stay_nights(booking.check_in, booking.check_out)
+        ]
+        RoomNight.objects.bulk_create(nights, ignore_conflicts=True)
+        written += len(nights)
+    transaction.on_commit(bump_room_calendar_version)
+    return written
+
+
+# ══════════════════════════════════════════════════════════════
+#   AVAILABILITY LOOKUPS
+# ══════════════════════════════════════════════════════════════
+
+def room_is_free(room, check_in, check_out, exclude_booking=None):
+    """
+    True if none of the requested nights are held for this room.
+    Served entirely by the (room, night) unique index.
+    """
+    taken = RoomNight.objects.filter(
+        room=room,
+        night__gte=check_in,
+        night__lt=check_out,
+    )
+    if exclude_booking is not None and exclude_booking.pk:
+        taken = taken.exclude(booking=exclude_booking)
+    return not taken.exists()
+
+
+def free_rooms(rooms, check_in, check_out):
+    """
+    Narrows a Room queryset to the rooms with no held night
+    in [check_in, check_out), as a single anti-join.
+    """
+    taken_room_ids = RoomNight.objects.filter(
+        night__gte=check_in,
+        night__lt=check_out,
+    ).values('room_id')
+    return rooms.exclude(pk__in=taken_room_ids)
+
+
+# ══════════════════════════════════════════════════════════════
+#   TABLE SLOT OCCUPANCY
+# ══════════════════════════════════════════════════════════════
+
+def _occupancy_map(bookings, dates):
+    """
+    Groups active table bookings by (date, time_slot) in one query.
+    Returns {date: {time_slot: seats_taken}} with every TimeSlot
+    present for every requested date.
+    """
+    occupancy = {
+        day: {slot: 0 for slot in TimeSlot.values}
+        for day in dates
+    }
+    rows = bookings.filter(
+        status__in=ACTIVE_STATUSES,
+    ).values('date', 'time_slot').annotate(
+        seats=Sum('guests')
+    ).order_by()
+
+    for row in rows:
+        day_slots = occupancy.setdefault(
+            row['date'], {slot: 0 for slot in TimeSlot.values}
+        )
+        day_slots[row['time_slot']] = row['seats'] or 0
+    return occupancy
+
+
+def slot_occupancy(dates, exclude_booking=None):
+    """
+    Seats taken for every time slot on each of the given dates.
+    exclude_booking leaves one reservation out (used when re-validating it).
+    """
+    dates    = set(dates)
+    bookings = TableBooking.objects.filter(date__in=dates)
+    if exclude_booking is not None and exclude_booking.pk:
+        bookings = bookings.exclude(pk=exclude_booking.pk)
+    return _occupancy_map(bookings, dates)
+
+
+def slot_occupancy_between(start, end):
+    """Seats taken for every time slot on every date in [start, end]."""
+    dates = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    bookings = TableBooking.objects.filter(date__gte=start, date__lte=end)
+    return _occupancy_map(bookings, dates)
+
+
+# ══════════════════════════════════════════════════════════════
+#   TABLE SLOT AVAILABILITY (cached, for the booking form)
+# ══════════════════════════════════════════════════════════════
+
+TABLE_AVAILABILITY_TTL = 30   # seconds
+
+
+def _table_availability_key(day):
+    # Settings edits (closed days, services) retire every date at once
+    version = cache_version('restaurant-settings')
+    return f'bookings:table-availability:{version}:{day.isoformat()}'
+
+
+def table_slot_availability(day):
+    """
+    Remaining seats for every TimeSlot on one date, honouring closed
+    days and disabled services in RestaurantSettings. Cached briefly;
+    table booking writes drop the entry for their date once committed,
+    and a settings save retires all of them.
+    """
+    key  = _table_availability_key(day)
+    data = cache.get(key)
+    if data is not None:
+        return data
+
+    rs     = RestaurantSettings.get()
+    closed = day < timezone.now().date() or rs.is_closed_on(day)
+    taken  = slot_occupancy([day])[day]
+
+    slots = []
+    for value, label in TimeSlot.choices:
+        is_lunch   = value <= LUNCH_LAST_SLOT
+        enabled    = rs.lunch_enabled if is_lunch else rs.dinner_enabled
+        seats_left = max(TableBooking.MAX_SEATS_PER_SLOT - taken[value], 0)
+        slots.append({
+            'time_slot':  value,
+            'seats_left': seats_left,
+            'available':  not closed and enabled and seats_left > 0,
+        })
+
+    data = {
+        'date':      day.isoformat(),
+        'closed':    closed,
+        'max_seats': TableBooking.MAX_SEATS_PER_SLOT,
+        'slots':     slots,
+    }
+    cache.set(key, data, TABLE_AVAILABILITY_TTL)
+    return data
+
+
+def invalidate_table_availability(dates):
+    """
+    Drops the cached dates after the surrounding transaction commits,
+    so a concurrent reader can't re-cache the pre-commit seat counts.
+    """
+    dates = set(dates)
+    transaction.on_commit(
+        lambda: cache.delete_many([_table_availability_key(day) for day in dates])
+    )
+
+
+# ══════════════════════════════════════════════════════════════
+#   ROOM AVAILABILITY CALENDAR
+# ══════════════════════════════════════════════════════════════
+
+ROOM_CALENDAR_TTL         = 300   # seconds
+ROOM_CALENDAR_MAX_MONTHS  = 12
+
+
+def room_calendar_version():
+    return cache_version('room-calendar')
+
+
+def bump_room_calendar_version():
+    bump_cache_version('room-calendar')
+
+
+def add_months(first_of_month, months):
+    month_index = first_of_month.month - 1 + months
+    return date(first_of_month.year + month_index // 12, month_index % 12 + 1, 1)
+
+
+def booked_night_runs(start, months, room_id=None):
+    """
+    Booked nights for `months` months from `start` (a first-of-month),
+    for one room or every bookable room, from a single RoomNight range
+    query. Each room maps to run-length encoded booked runs:
+    [[offset, length], ...], offset counted in days from `start`.
+    """
+    version = room_calendar_version()
+    key     = f'bookings:room-calendar:{version}:{room_id or "all"}:{start.isoformat()}:{months}'
+    data    = cache.get(key)
+    if data is not None:
+        return data
+
+    end   = add_months(start, months)
+    rooms = Room.objects.filter(is_available=True)
+    if room_id:
+        rooms = rooms.filter(pk=room_id)
+    booked = {pk: [] for pk in rooms.values_list('pk', flat=True)}
+
+    nights = RoomNight.objects.filter(
+        room_id__in=booked.keys(),
+        night__gte=start,
+        night__lt=end,
+    ).values_list('room_id', 'night').order_by('room_id', 'night')
+
+    for room_pk, night in nights:
+        runs   = booked[room_pk]
+        offset = (night - start).days
+        if runs and runs[-1][0] + runs[-1][1] == offset:
+            runs[-1][1] += 1
+        else:
+            runs.append([offset, 1])
+
+    data = {
+        'version':  version,
+        'start':    start.isoformat(),
+        'end':      end.isoformat(),
+        'days':     (end - start).days,
+        'encoding': 'booked-runs',
+        'rooms':    {str(pk): runs for pk, runs in booked.items()},
+    }
+    cache.set(key, data, ROOM_CALENDAR_TTL)
+    return data
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from bookings.rollups import rebuild_daily_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the DailyStats occupancy / revenue rollups from bookings.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First day to rebuild (YYYY-MM-DD). Default: first booking.')
+        parser.add_argument('--end',   help='Last day to rebuild (YYYY-MM-DD). Default: last booking.')
+
+    def handle(self, *args, **options):
+        start = parse_date(options['start']) if options['start'] else None
+        end   = parse_date(options['end'])   if options['end']   else None
+        if (options['start'] and not start) or (options['end'] and not end):
+            raise CommandError('Dates must be YYYY-MM-DD.')
+        if start and end and end < start:
+            raise CommandError('--end must not be before --start.')
+
+        written = rebuild_daily_stats(start, end)
+        self.stdout.write(self.style.SUCCESS(
+            f'Daily stats rebuilt: {written} day(s) written.'
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from bookings.inventory import rebuild_ledger
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the RoomNight inventory ledger from existing room bookings.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            written = rebuild_ledger()
+        self.stdout.write(self.style.SUCCESS(
+            f'Room-night ledger rebuilt: {written} night(s) written.'
+        ))
@@ -0,0 +1,100 @@
+import logging
+from itertools import islice
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from bookings.emails import build_reminder, get_email_template
+from bookings.models import RoomBooking, TableBooking, BookingStatus, EmailTemplate, OutboundEmail
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Queues pre-arrival emails for upcoming stays and reminders for '
+        "tomorrow's table reservations in the outbox. Each booking is "
+        'emailed at most once; send_queued_emails delivers them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--arrival-days', type=int, default=2,
+            help='Email guests checking in within this many days (default 2).',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=200,
+            help='Bookings rendered and queued per transaction (default 200).',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Count recipients without queueing anything.',
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.now().date()
+
+        arrivals = RoomBooking.objects.filter(
+            status=BookingStatus.CONFIRMED,
+            check_in__gte=today,
+            check_in__lte=today + timezone.timedelta(days=options['arrival_days']),
+            pre_arrival_sent_at__isnull=True,
+        ).select_related('room').order_by('pk')
+
+        dinners = TableBooking.objects.filter(
+            status__in=[BookingStatus.PENDING, BookingStatus.CONFIRMED],
+            date=today + timezone.timedelta(days=1),
+            reminder_sent_at__isnull=True,
+        ).order_by('pk')
+
+        jobs = [
+            (arrivals, EmailTemplate.TemplateKey.ROOM_PRE_ARRIVAL,  'room',  'pre_arrival_sent_at'),
+            (dinners,  EmailTemplate.TemplateKey.TABLE_REMINDER,    'table', 'reminder_sent_at'),
+        ]
+        for queryset, key, booking_type, sent_field in jobs:
+            if options['dry_run']:
+                self.stdout.write(f'{key}: {queryset.count()} recipient(s).')
+                continue
+            # A missing template skips its own reminders, not the others
+            try:
+                template = get_email_template(key)
+            except ValueError as e:
+                logger.error('Skipping %s reminders: %s', key, e)
+                self.stderr.write(f'{key}: skipped, {e}')
+                continue
+            queued, failed = self.queue_all(
+                queryset, template, booking_type, sent_field, options['chunk_size']
+            )
+            self.stdout.write(f'{key}: queued {queued}, failed {failed}.')
+
+    def queue_all(self, queryset, template, booking_type, sent_field, chunk_size):
+        """
+        Streams the queryset in chunks so memory stays flat however
+        many guests are due. Each chunk's outbox rows and sent stamps
+        commit together, so a booking is never queued twice.
+        """
+        queued = failed = 0
+        bookings = queryset.iterator(chunk_size=chunk_size)
+
+        while True:
+            chunk = list(islice(bookings, chunk_size))
+            if not chunk:
+                break
+
+            messages, rendered = [], []
+            for booking in chunk:
+                try:
+                    messages.append(build_reminder(booking, template, booking_type))
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f'{booking.reference}: {e}')
+                else:
+                    rendered.append(booking.pk)
+
+            with transaction.atomic():
+                OutboundEmail.queue_many(messages)
+                queryset.model.objects.filter(pk__in=rendered).update(
+                    **{sent_field: timezone.now()}
+                )
+            queued += len(rendered)
+        return queued, failed
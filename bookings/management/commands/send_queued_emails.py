@@ -0,0 +1,101 @@
+import time
+from datetime import timedelta
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from bookings.models import OutboundEmail
+
+
+class Command(BaseCommand):
+    help = (
+        'Delivers queued booking emails in batches over one SMTP connection. '
+        'Failed messages are retried with exponential backoff, then dead-lettered.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=50,
+            help='Messages claimed and sent per SMTP session (default 50).',
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the outbox instead of exiting when it is empty.',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5.0,
+            help='Seconds to sleep between polls with --loop (default 5).',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = self.send_batch(options['batch_size'])
+            if sent or failed:
+                self.stdout.write(f'Sent {sent}, failed {failed}.')
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def claim_batch(self, batch_size):
+        """
+        Leases up to batch_size due messages in a short transaction:
+        their next_attempt_at moves CLAIM_LEASE into the future, so no
+        other worker picks them up while this one sends, and a worker
+        that dies mid-batch only delays them until the lease runs out.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            batch = list(
+                OutboundEmail.objects.select_for_update(skip_locked=True).filter(
+                    status=OutboundEmail.Status.QUEUED,
+                    next_attempt_at__lte=now,
+                ).order_by('next_attempt_at')[:batch_size]
+            )
+            OutboundEmail.objects.filter(pk__in=[email.pk for email in batch]).update(
+                next_attempt_at=now + timedelta(seconds=OutboundEmail.CLAIM_LEASE)
+            )
+        return batch
+
+    def send_batch(self, batch_size):
+        """
+        Claims up to batch_size due messages and sends them over a
+        single connection. No transaction or row lock is held during
+        the SMTP I/O; the results are recorded afterwards.
+        Returns (sent, failed).
+        """
+        batch = self.claim_batch(batch_size)
+        if not batch:
+            return 0, 0
+
+        sent = failed = 0
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except Exception as e:
+            for email in batch:
+                email.mark_failed(e)
+            self._save(batch)
+            return 0, len(batch)
+
+        try:
+            for email in batch:
+                try:
+                    connection.send_messages([email.as_message(connection)])
+                except Exception as e:
+                    email.mark_failed(e)
+                    failed += 1
+                else:
+                    email.mark_sent()
+                    sent += 1
+        finally:
+            connection.close()
+
+        self._save(batch)
+        return sent, failed
+
+    def _save(self, batch):
+        OutboundEmail.objects.bulk_update(
+            batch,
+            ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at'],
+        )
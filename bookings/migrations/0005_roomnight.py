@@ -0,0 +1,56 @@
+# Generated by Django 5.0.4 on 2026-10-18 08:40
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_room_nights(apps, schema_editor):
+    RoomBooking = apps.get_model('bookings', 'RoomBooking')
+    RoomNight   = apps.get_model('bookings', 'RoomNight')
+
+    bookings = RoomBooking.objects.filter(
+        status__in=['pending', 'confirmed']
+    ).order_by('created_at')
+
+    for booking in bookings.iterator(chunk_size=500):
+        RoomNight.objects.bulk_create([
+            RoomNight(
+                room_id=booking.room_id,
+                booking_id=booking.pk,
+                night=booking.check_in + timedelta(days=i),
+            )
+            for i in range((booking.check_out - booking.check_in).days)
+        ], ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_seed_email_templates'),
+        ('rooms', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomNight',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('night', models.DateField(verbose_name='Night')),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='room_nights', to='bookings.roombooking', verbose_name='Booking')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booked_nights', to='rooms.room', verbose_name='Room')),
+            ],
+            options={
+                'verbose_name': 'Room Night',
+                'verbose_name_plural': 'Room Nights',
+                'ordering': ['room', 'night'],
+                'indexes': [models.Index(fields=['night'], name='bookings_roomnight_night_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='roomnight',
+            constraint=models.UniqueConstraint(fields=('room', 'night'), name='bookings_roomnight_unique_room_night'),
+        ),
+        migrations.RunPython(backfill_room_nights, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.0.4 on 2026-10-18 08:41
+
+import bookings.models
+import django.contrib.postgres.constraints
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+
+REPORT_LIMIT = 50   # overlapping pairs listed before truncating
+
+
+def check_overlapping_stays(apps, schema_editor):
+    """
+    Refuses to add the constraint while active bookings still overlap,
+    listing them so they can be moved or cancelled in the admin first.
+    Bookings are never changed here — which stay wins is a staff call.
+    """
+    RoomBooking = apps.get_model('bookings', 'RoomBooking')
+    stays = RoomBooking.objects.filter(
+        status__in=['pending', 'confirmed'],
+        check_out__gt=models.F('check_in'),
+    ).order_by('room_id', 'check_in', 'pk').values_list(
+        'room_id', 'reference', 'check_in', 'check_out'
+    )
+
+    overlaps = []
+    latest   = None   # (room_id, reference, check_out) reaching furthest so far
+    for room_id, reference, check_in, check_out in stays.iterator(chunk_size=2000):
+        if latest and latest[0] == room_id and check_in < latest[2]:
+            overlaps.append(f'  room {room_id}: {latest[1]} overlaps {reference} ({check_in} → {check_out})')
+        if not latest or latest[0] != room_id or check_out > latest[2]:
+            latest = (room_id, reference, check_out)
+
+    if overlaps:
+        listed = overlaps[:REPORT_LIMIT]
+        if len(overlaps) > REPORT_LIMIT:
+            listed.append(f'  … and {len(overlaps) - REPORT_LIMIT} more')
+        raise RuntimeError(
+            f'{len(overlaps)} active room booking(s) overlap another stay in the same room.\n'
+            + '\n'.join(listed)
+            + '\nCancel or move them in the admin, then run migrate again.'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0005_roomnight'),
+        ('rooms', '0001_initial'),
+    ]
+
+    operations = [
+        # GiST support for the `room =` part of the exclusion constraint
+        BtreeGistExtension(),
+        migrations.RunPython(check_overlapping_stays, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='roombooking',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('status__in', ['pending', 'confirmed'])), expressions=[(bookings.models.DateRange('check_in', 'check_out'), '&&'), ('room', '=')], name='bookings_roombooking_no_overlapping_stays'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.4 on 2026-10-18 08:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0006_roombooking_no_overlapping_stays'),
+        ('rooms', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='roombooking',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'confirmed'])), fields=['room', 'check_in', 'check_out'], name='bk_room_active_stay_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='roombooking',
+            index=models.Index(fields=['guest_email', '-check_in'], name='bk_room_email_checkin_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='roombooking',
+            index=models.Index(fields=['check_in', 'status'], name='bk_room_checkin_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='roombooking',
+            index=models.Index(fields=['check_out', 'status'], name='bk_room_checkout_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tablebooking',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'confirmed'])), fields=['date', 'time_slot'], include=('guests',), name='bk_table_active_slot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tablebooking',
+            index=models.Index(fields=['guest_email', '-date'], name='bk_table_email_date_idx'),
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.0.4 on 2026-10-18 08:46
+
+from django.db import migrations, models
+
+
+def seed_reminder_templates(apps, schema_editor):
+    EmailTemplate = apps.get_model('bookings', 'EmailTemplate')
+
+    EmailTemplate.objects.get_or_create(
+        key='room_pre_arrival',
+        defaults={
+            'subject': 'A presto! Il suo soggiorno {{ reference }} — Hotel Santa Filomena',
+            'body': (
+                "Gentile {{ guest_name }},\n\n"
+                "La aspettiamo a breve all'Hotel Santa Filomena.\n\n"
+                "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+                "Numero di riferimento : {{ reference }}\n"
+                "Camera                : {{ room_name }}\n"
+                "Check-in              : {{ check_in }} (dalle 15:00)\n"
+                "Check-out             : {{ check_out }} (entro le 11:00)\n"
+                "Ospiti                : {{ guests }}\n"
+                "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+                "Per l'orario di arrivo o richieste particolari:\n"
+                "Email : info@santafilomena.com\n"
+                "Tel   : +39 06 1234 5678\n\n"
+                "— Il Team di Hotel Santa Filomena"
+            ),
+            'is_active': True,
+        }
+    )
+
+    EmailTemplate.objects.get_or_create(
+        key='table_reminder',
+        defaults={
+            'subject': 'Promemoria: il suo tavolo {{ date }} alle {{ time_slot }} — Ristorante Santa Filomena',
+            'body': (
+                "Gentile {{ guest_name }},\n\n"
+                "Le ricordiamo la sua prenotazione al ristorante.\n\n"
+                "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+                "Numero di riferimento : {{ reference }}\n"
+                "Data                  : {{ date }}\n"
+                "Orario                : {{ time_slot }}\n"
+                "Ospiti                : {{ guests }}\n"
+                "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+                "Se i suoi piani sono cambiati, ci avvisi il prima possibile.\n\n"
+                "Tel   : +39 06 1234 5678\n\n"
+                "— Il Team di Hotel Santa Filomena"
+            ),
+            'is_active': True,
+        }
+    )
+
+
+def unseed_reminder_templates(apps, schema_editor):
+    EmailTemplate = apps.get_model('bookings', 'EmailTemplate')
+    EmailTemplate.objects.filter(
+        key__in=['room_pre_arrival', 'table_reminder']
+    ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0008_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='roombooking',
+            name='pre_arrival_sent_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Pre-Arrival Email Sent'),
+        ),
+        migrations.AddField(
+            model_name='tablebooking',
+            name='reminder_sent_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Reminder Sent'),
+        ),
+        migrations.AlterField(
+            model_name='emailtemplate',
+            name='key',
+            field=models.CharField(choices=[('room_confirmation', 'Room Booking Confirmation'), ('table_confirmation', 'Table Booking Confirmation'), ('room_pre_arrival', 'Room Pre-Arrival Reminder'), ('table_reminder', 'Table Reservation Reminder')], max_length=50, unique=True, verbose_name='Template'),
+        ),
+        migrations.RunPython(seed_reminder_templates, unseed_reminder_templates),
+    ]
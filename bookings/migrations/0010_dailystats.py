@@ -0,0 +1,101 @@
+# Generated by Django 5.0.4 on 2026-10-18 09:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Same figures as bookings.rollups.compute_daily_stats, set-based, for
+# every date from the first booking to the last.
+BACKFILL_SQL = """
+INSERT INTO {stats}
+       (date, room_nights_sold, rooms_available, room_revenue, booked_revenue,
+        lunch_covers, dinner_covers, updated_at)
+SELECT d.day,
+       COALESCE(n.sold, 0),
+       (SELECT COUNT(*) FROM {room} WHERE is_available),
+       COALESCE(n.revenue, 0),
+       COALESCE(b.booked, 0),
+       COALESCE(c.lunch, 0),
+       COALESCE(c.dinner, 0),
+       NOW()
+  FROM (
+        SELECT generate_series(MIN(first), MAX(last), interval '1 day')::date AS day
+          FROM (SELECT MIN(check_in) AS first, MAX(check_out) AS last FROM {booking}
+                UNION ALL
+                SELECT MIN((created_at AT TIME ZONE %(tz)s)::date), NULL FROM {booking}
+                UNION ALL
+                SELECT MIN(date), MAX(date) FROM {table}) bounds
+       ) d
+  LEFT JOIN (
+        SELECT night::date AS day,
+               COUNT(*) AS sold,
+               ROUND(SUM(r.total_price / (r.check_out - r.check_in)), 2) AS revenue
+          FROM {booking} r
+         CROSS JOIN LATERAL generate_series(r.check_in, r.check_out - 1, interval '1 day') AS night
+         WHERE r.status IN %(billable)s AND r.check_out > r.check_in
+         GROUP BY 1
+       ) n ON n.day = d.day
+  LEFT JOIN (
+        SELECT (created_at AT TIME ZONE %(tz)s)::date AS day, SUM(total_price) AS booked
+          FROM {booking}
+         WHERE status IN %(billable)s
+         GROUP BY 1
+       ) b ON b.day = d.day
+  LEFT JOIN (
+        SELECT date AS day,
+               SUM(guests) FILTER (WHERE time_slot <= %(lunch_last)s) AS lunch,
+               SUM(guests) FILTER (WHERE time_slot >  %(lunch_last)s) AS dinner
+          FROM {table}
+         WHERE status <> 'cancelled'
+         GROUP BY 1
+       ) c ON c.day = d.day
+    ON CONFLICT (date) DO NOTHING
+"""
+
+
+def backfill_daily_stats(apps, schema_editor):
+    def table(model):
+        return apps.get_model(*model.split('.'))._meta.db_table
+
+    sql = BACKFILL_SQL.format(
+        stats=table('bookings.DailyStats'),
+        room=table('rooms.Room'),
+        booking=table('bookings.RoomBooking'),
+        table=table('bookings.TableBooking'),
+    )
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(sql, {
+            'tz':         settings.TIME_ZONE,
+            'billable':   ('confirmed', 'completed'),
+            'lunch_last': '14:30',
+        })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0009_guest_reminders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True, verbose_name='Date')),
+                ('room_nights_sold', models.PositiveIntegerField(default=0, verbose_name='Room Nights Sold')),
+                ('rooms_available', models.PositiveIntegerField(default=0, verbose_name='Rooms Available')),
+                ('room_revenue', models.DecimalField(decimal_places=2, default=0, help_text='Stay revenue earned on this night (price per night of each stay).', max_digits=12, verbose_name='Room Revenue')),
+                ('booked_revenue', models.DecimalField(decimal_places=2, default=0, help_text='Total value of the bookings made on this day.', max_digits=12, verbose_name='Booked Revenue')),
+                ('lunch_covers', models.PositiveIntegerField(default=0, verbose_name='Lunch Covers')),
+                ('dinner_covers', models.PositiveIntegerField(default=0, verbose_name='Dinner Covers')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Daily Stats',
+                'verbose_name_plural': 'Daily Stats',
+                'ordering': ['date'],
+            },
+        ),
+        migrations.RunPython(backfill_daily_stats, migrations.RunPython.noop),
+    ]
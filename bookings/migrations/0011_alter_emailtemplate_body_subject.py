@@ -0,0 +1,23 @@
+# Generated by Django 5.0.4 on 2026-10-18 08:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0010_dailystats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='emailtemplate',
+            name='body',
+            field=models.TextField(verbose_name='Body'),
+        ),
+        migrations.AlterField(
+            model_name='emailtemplate',
+            name='subject',
+            field=models.CharField(max_length=200, verbose_name='Subject'),
+        ),
+    ]
@@ -1,7 +1,14 @@
-from django.db import models
+import secrets
+import string
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateRangeField, RangeOperators
+from django.db import models, transaction, IntegrityError
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
 from django.utils import timezone
+from django.utils.formats import date_format
+from core.cache import cache_version
+from restaurant.models import RestaurantSettings
 from rooms.models import Room
 
 
@@ -10,6 +17,63 @@ class BookingStatus(models.TextChoices):
     CONFIRMED = 'confirmed', _('Confirmed')
     CANCELLED = 'cancelled', _('Cancelled')
     COMPLETED = 'completed', _('Completed')
+
+
+# Statuses that hold room nights and table seats
+ACTIVE_STATUSES   = [BookingStatus.PENDING, BookingStatus.CONFIRMED]
+# Statuses counted as sold / billed (dashboard, rollups, reports)
+BILLABLE_STATUSES = [BookingStatus.CONFIRMED, BookingStatus.COMPLETED]
+
+
+class DateRange(models.Func):
+    """daterange(check_in, check_out) — half-open, so check-out day is free."""
+    function     = 'DATERANGE'
+    output_field = DateRangeField()
+
+
+# Database constraints that reject a second active booking for a night
+STAY_CONFLICT_CONSTRAINTS = (
+    'bookings_roombooking_no_overlapping_stays',
+    'bookings_roomnight_unique_room_night',
+)
+
+
+# ── Booking references ──────────────────────────────────
+# 36^8 ≈ 2.8 trillion codes per prefix, so a collision is rare
+# enough to leave to the unique index instead of pre-querying.
+REFERENCE_CHARS    = string.ascii_uppercase + string.digits
+REFERENCE_LENGTH   = 8
+REFERENCE_ATTEMPTS = 5
+
+
+def new_reference(prefix):
+    """Random booking reference, e.g. 'SF7K2Q9XMA'."""
+    return prefix + ''.join(
+        secrets.choice(REFERENCE_CHARS) for _ in range(REFERENCE_LENGTH)
+    )
+
+
+def save_with_reference(instance, prefix, save):
+    """
+    Runs save() in a savepoint, first assigning a fresh reference
+    if the instance has none. On a reference collision the insert
+    is rolled back and retried with a new code.
+    """
+    if instance.reference:
+        with transaction.atomic():
+            return save()
+
+    for attempt in range(1, REFERENCE_ATTEMPTS + 1):
+        instance.reference = new_reference(prefix)
+        try:
+            with transaction.atomic():
+                return save()
+        except IntegrityError as e:
+            if attempt == REFERENCE_ATTEMPTS or not _is_reference_collision(e):
+                instance.reference = ''
+                raise
+
+
 class TimeSlot(models.TextChoices):
     LUNCH_1  = '12:30', _('12:30')
     LUNCH_2  = '13:00', _('13:00')
@@ -22,6 +86,10 @@ class TimeSlot(models.TextChoices):
     DINNER_5 = '21:30', _('21:30')
 
 
+# Slots up to this one are lunch (TableBooking.service); later ones dinner
+LUNCH_LAST_SLOT = '14:30'
+
+
 class TableBooking(models.Model):
 
     # ── Guest Info ──────────────────────────────────────
@@ -72,6 +140,13 @@ class TableBooking(models.Model):
         blank=True
     )
 
+    # ── Guest communication ─────────────────────────────
+    reminder_sent_at = models.DateTimeField(
+        _('Reminder Sent'),
+        null=True,
+        blank=True
+    )
+
     # ── Timestamps ──────────────────────────────────────
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -83,6 +158,17 @@ class TableBooking(models.Model):
         verbose_name        = _('Table Booking')
         verbose_name_plural = _('Table Bookings')
         ordering            = ['-date', 'time_slot']
+        indexes = [
+            # Slot occupancy: Sum('guests') per (date, time_slot), index-only
+            models.Index(
+                fields=['date', 'time_slot'],
+                include=['guests'],
+                condition=models.Q(status__in=['pending', 'confirmed']),
+                name='bk_table_active_slot_idx',
+            ),
+            # Guest dashboard
+            models.Index(fields=['guest_email', '-date'], name='bk_table_email_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.reference} — {self.guest_name} ({self.date} {self.time_slot})"
@@ -95,19 +181,15 @@ class TableBooking(models.Model):
     @property
     def service(self):
         """Returns 'Pranzo' or 'Cena' based on time slot."""
-        if self.time_slot and self.time_slot <= '14:30':
+        if self.time_slot and self.time_slot <= LUNCH_LAST_SLOT:
             return _('Lunch')
         return _('Dinner')
 
     # ── Generate unique reference ───────────────────────
+    REFERENCE_PREFIX = 'TB'
+
     def generate_reference(self):
-        import random
-        import string
-        chars = string.ascii_uppercase + string.digits
-        while True:
-            ref = 'TB' + ''.join(random.choices(chars, k=8))
-            if not TableBooking.objects.filter(reference=ref).exists():
-                return ref
+        return new_reference(self.REFERENCE_PREFIX)
 
     # ── Seats taken for this slot ───────────────────────
     def seats_taken(self):
@@ -115,13 +197,9 @@ class TableBooking(models.Model):
         Total guests already booked for the same date + time slot.
         Excludes cancelled bookings and the current instance.
         """
-        return TableBooking.objects.filter(
-            date=self.date,
-            time_slot=self.time_slot,
-            status__in=[BookingStatus.PENDING, BookingStatus.CONFIRMED],
-        ).exclude(pk=self.pk).aggregate(
-            total=models.Sum('guests')
-        )['total'] or 0
+        from .inventory import slot_occupancy
+        occupancy = slot_occupancy([self.date], exclude_booking=self)
+        return occupancy[self.date].get(self.time_slot, 0)
 
     # ── Validation ──────────────────────────────────────
     def clean(self):
@@ -130,10 +208,9 @@ class TableBooking(models.Model):
                 _('Reservation date cannot be in the past.')
             )
 
-        # Monday = 0 in Python's weekday()
-        if self.date and self.date.weekday() == 0:
+        if self.date and RestaurantSettings.get().is_closed_on(self.date):
             raise ValidationError(
-                _('The restaurant is closed on Mondays.')
+                _('The restaurant is closed on %(day)s.') % {'day': date_format(self.date, 'l')}
             )
 
         if self.guests and self.guests > 12:
@@ -150,9 +227,10 @@ class TableBooking(models.Model):
 
     # ── Auto-fill reference on save ─────────────────────
     def save(self, *args, **kwargs):
-        if not self.reference:
-            self.reference = self.generate_reference()
-        super().save(*args, **kwargs)
+        save_with_reference(
+            self, self.REFERENCE_PREFIX,
+            lambda: super(TableBooking, self).save(*args, **kwargs),
+        )
 
 
 class RoomBooking(models.Model):
@@ -224,6 +302,13 @@ class RoomBooking(models.Model):
         blank=True
     )
 
+    # ── Guest communication ─────────────────────────────
+    pre_arrival_sent_at = models.DateTimeField(
+        _('Pre-Arrival Email Sent'),
+        null=True,
+        blank=True
+    )
+
     # ── Timestamps ──────────────────────────────────────
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -232,6 +317,30 @@ class RoomBooking(models.Model):
         verbose_name        = _('Room Booking')
         verbose_name_plural = _('Room Bookings')
         ordering            = ['-created_at']
+        indexes = [
+            # Conflict checks on active stays
+            models.Index(
+                fields=['room', 'check_in', 'check_out'],
+                condition=models.Q(status__in=['pending', 'confirmed']),
+                name='bk_room_active_stay_idx',
+            ),
+            # Guest dashboard
+            models.Index(fields=['guest_email', '-check_in'], name='bk_room_email_checkin_idx'),
+            # Admin dashboard: arrivals / departures / in-house
+            models.Index(fields=['check_in', 'status'], name='bk_room_checkin_status_idx'),
+            models.Index(fields=['check_out', 'status'], name='bk_room_checkout_status_idx'),
+        ]
+        constraints = [
+            # Requires the btree_gist extension (see migration 0006)
+            ExclusionConstraint(
+                name='bookings_roombooking_no_overlapping_stays',
+                expressions=[
+                    (DateRange('check_in', 'check_out'), RangeOperators.OVERLAPS),
+                    ('room', RangeOperators.EQUAL),
+                ],
+                condition=models.Q(status__in=['pending', 'confirmed']),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.reference} — {self.guest_name} ({self.check_in} → {self.check_out})"
@@ -246,14 +355,10 @@ class RoomBooking(models.Model):
         return self.check_in >= timezone.now().date()
 
     # ── Generate unique reference ───────────────────────
+    REFERENCE_PREFIX = 'SF'
+
     def generate_reference(self):
-        import random
-        import string
-        chars = string.ascii_uppercase + string.digits
-        while True:
-            ref = 'SF' + ''.join(random.choices(chars, k=8))
-            if not RoomBooking.objects.filter(reference=ref).exists():
-                return ref
+        return new_reference(self.REFERENCE_PREFIX)
 
     # ── Date conflict check ─────────────────────────────
     def has_conflict(self):
@@ -261,19 +366,18 @@ class RoomBooking(models.Model):
         Returns True if another confirmed/pending booking
         overlaps the requested dates for the same room.
         Only runs if room is already assigned to the instance.
+        Reads the RoomNight ledger instead of scanning RoomBooking.
         """
+        from .inventory import room_is_free
         try:
             room = self.room
         except Exception:
             # Room not assigned yet — skip conflict check
             return False
 
-        return RoomBooking.objects.filter(
-            room=room,
-            status__in=[BookingStatus.PENDING, BookingStatus.CONFIRMED],
-            check_in__lt=self.check_out,
-            check_out__gt=self.check_in,
-        ).exclude(pk=self.pk).exists()
+        return not room_is_free(
+            room, self.check_in, self.check_out, exclude_booking=self
+        )
 
     # ── Validation ──────────────────────────────────────
     def clean(self):
@@ -299,19 +403,89 @@ class RoomBooking(models.Model):
 
     # ── Auto-fill price + reference on save ─────────────
     def save(self, *args, **kwargs):
-        if not self.reference:
-            self.reference = self.generate_reference()
         if not self.price_per_night:
             self.price_per_night = self.room.price_per_night
         if not self.total_price:
             self.total_price = self.price_per_night * self.nights
-        super().save(*args, **kwargs)
+        from .inventory import sync_booking_nights
+
+        def save_and_sync():
+            super(RoomBooking, self).save(*args, **kwargs)
+            sync_booking_nights(self)
+
+        try:
+            save_with_reference(self, self.REFERENCE_PREFIX, save_and_sync)
+        except IntegrityError as e:
+            if _violated_constraint(e) in STAY_CONFLICT_CONSTRAINTS:
+                raise ValidationError(
+                    _('This room is not available for the selected dates.')
+                ) from e
+            raise
+
+
+def _violated_constraint(error):
+    """Name of the constraint behind an IntegrityError, if the driver reports it."""
+    diag = getattr(error.__cause__, 'diag', None)
+    name = getattr(diag, 'constraint_name', None)
+    if name:
+        return name
+    for name in STAY_CONFLICT_CONSTRAINTS:
+        if name in str(error):
+            return name
+    return None
+
+
+def _is_reference_collision(error):
+    return 'reference' in (_violated_constraint(error) or str(error))
+
+
+class RoomNight(models.Model):
+    """
+    Inventory ledger — one row per room per night held by an
+    active (pending/confirmed) RoomBooking. Kept in sync from
+    RoomBooking.save(); rebuild with `manage.py rebuild_room_nights`.
+    """
+
+    room = models.ForeignKey(
+        Room,
+        on_delete=models.CASCADE,
+        related_name='booked_nights',
+        verbose_name=_('Room')
+    )
+    booking = models.ForeignKey(
+        RoomBooking,
+        on_delete=models.CASCADE,
+        related_name='room_nights',
+        verbose_name=_('Booking')
+    )
+    night = models.DateField(
+        _('Night')
+    )
+
+    class Meta:
+        verbose_name        = _('Room Night')
+        verbose_name_plural = _('Room Nights')
+        ordering            = ['room', 'night']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['room', 'night'],
+                name='bookings_roomnight_unique_room_night',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['night'], name='bookings_roomnight_night_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.room_id} — {self.night}"
 
 class EmailTemplate(models.Model):
 
     class TemplateKey(models.TextChoices):
         ROOM_CONFIRMATION   = 'room_confirmation',   _('Room Booking Confirmation')
         TABLE_CONFIRMATION  = 'table_confirmation',  _('Table Booking Confirmation')
+        ROOM_PRE_ARRIVAL    = 'room_pre_arrival',    _('Room Pre-Arrival Reminder')
+        TABLE_REMINDER      = 'table_reminder',      _('Table Reservation Reminder')
 
     key = models.CharField(
         _('Template'),
@@ -341,24 +515,237 @@ class EmailTemplate(models.Model):
     def __str__(self):
         return self.get_key_display()
 
+    # Process-local (version, {key: template or None}); see get()
+    _cached = None
+
     @classmethod
     def get(cls, key):
         """
-        Returns the active EmailTemplate for the given key,
-        or None if not found / inactive.
+        Returns the active EmailTemplate for the given key, or None
+        if not found / inactive. Rows are loaded and compiled once per
+        'email-templates' version, which is bumped on save/delete.
+        Treat the result as read-only — it is shared between threads.
         """
-        try:
-            return cls.objects.get(key=key, is_active=True)
-        except cls.DoesNotExist:
-            return None
+        version = cache_version('email-templates')
+        cached  = cls._cached
+        if cached is None or cached[0] != version:
+            cached = (version, {})
+        if key not in cached[1]:
+            template = cls.objects.filter(key=key, is_active=True).first()
+            if template:
+                template.compiled()
+            # Swap in a new dict rather than mutating one other
+            # threads may be reading
+            cached = (version, {**cached[1], key: template})
+            cls._cached = cached
+        return cached[1][key]
+
+    def compiled(self):
+        """Parsed (subject, body) Templates, compiled once per instance."""
+        from django.template import Template
+        templates = getattr(self, '_templates', None)
+        if templates is None:
+            templates = (Template(self.subject), Template(self.body))
+            self._templates = templates
+        return templates
 
     def render_subject(self, context):
-        from django.template import Template, Context
-        return Template(self.subject).render(Context(context)).strip()
+        from django.template import Context
+        return self.compiled()[0].render(Context(context)).strip()
 
     def render_body(self, context):
-        from django.template import Template, Context
-        return Template(self.body).render(Context(context))
+        from django.template import Context
+        return self.compiled()[1].render(Context(context))
+
+
+class OutboundEmail(models.Model):
+    """
+    Outbox row for one email. Booking views only queue messages;
+    `manage.py send_queued_emails` delivers them in batches over a
+    single SMTP connection, retrying with exponential backoff.
+    """
 
+    class Status(models.TextChoices):
+        QUEUED = 'queued', _('Queued')
+        SENT   = 'sent',   _('Sent')
+        DEAD   = 'dead',   _('Failed permanently')
 
-        
\ No newline at end of file
+    # ── Message ─────────────────────────────────────────
+    subject = models.CharField(
+        _('Subject'),
+        max_length=255
+    )
+    body = models.TextField(
+        _('Body')
+    )
+    html_body = models.TextField(
+        _('HTML Body'),
+        blank=True
+    )
+    from_email = models.CharField(
+        _('From'),
+        max_length=254
+    )
+    to = models.JSONField(
+        _('To'),
+        default=list
+    )
+
+    # ── Delivery ────────────────────────────────────────
+    status = models.CharField(
+        _('Status'),
+        max_length=10,
+        choices=Status.choices,
+        default=Status.QUEUED
+    )
+    attempts = models.PositiveIntegerField(
+        _('Attempts'),
+        default=0
+    )
+    next_attempt_at = models.DateTimeField(
+        _('Next Attempt'),
+        default=timezone.now
+    )
+    last_error = models.TextField(
+        _('Last Error'),
+        blank=True
+    )
+
+    # ── Timestamps ──────────────────────────────────────
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at    = models.DateTimeField(null=True, blank=True)
+
+    MAX_ATTEMPTS  = 6
+    RETRY_BACKOFF = 60   # seconds, doubled after every failed attempt
+    CLAIM_LEASE   = 600  # seconds a worker holds claimed rows before they are due again
+
+    class Meta:
+        verbose_name        = _('Outbound Email')
+        verbose_name_plural = _('Outbound Emails')
+        ordering            = ['-created_at']
+        indexes = [
+            # Worker pickup: queued rows that are due
+            models.Index(
+                fields=['next_attempt_at'],
+                condition=models.Q(status='queued'),
+                name='bk_outbox_due_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} → {', '.join(self.to)}"
+
+    @classmethod
+    def from_message(cls, message):
+        """Unsaved outbox row for an EmailMessage / EmailMultiAlternatives."""
+        html_body = ''
+        for content, mimetype in getattr(message, 'alternatives', []):
+            if mimetype == 'text/html':
+                html_body = content
+        return cls(
+            subject    = message.subject,
+            body       = message.body,
+            html_body  = html_body,
+            from_email = message.from_email,
+            to         = list(message.to),
+        )
+
+    @classmethod
+    def queue(cls, message):
+        """Stores a message for the worker."""
+        email = cls.from_message(message)
+        email.save()
+        return email
+
+    @classmethod
+    def queue_many(cls, messages):
+        """Stores a batch of messages for the worker in one INSERT."""
+        return cls.objects.bulk_create([cls.from_message(m) for m in messages])
+
+    def as_message(self, connection=None):
+        from django.core.mail import EmailMultiAlternatives
+        message = EmailMultiAlternatives(
+            subject    = self.subject,
+            body       = self.body,
+            from_email = self.from_email,
+            to         = self.to,
+            connection = connection,
+        )
+        if self.html_body:
+            message.attach_alternative(self.html_body, 'text/html')
+        return message
+
+    def mark_sent(self):
+        self.status   = self.Status.SENT
+        self.attempts += 1
+        self.sent_at  = timezone.now()
+        self.last_error = ''
+
+    def mark_failed(self, error):
+        """Schedules a retry, or dead-letters after MAX_ATTEMPTS."""
+        self.attempts  += 1
+        self.last_error = str(error)[:2000]
+        if self.attempts >= self.MAX_ATTEMPTS:
+            self.status = self.Status.DEAD
+        else:
+            delay = self.RETRY_BACKOFF * 2 ** (self.attempts - 1)
+            self.next_attempt_at = timezone.now() + timezone.timedelta(seconds=delay)
+
+
+class DailyStats(models.Model):
+    """
+    Materialized per-day rollup for the dashboard and reports.
+    Room figures count confirmed / completed stays; covers count every
+    reservation that isn't cancelled. Maintained by bookings.rollups
+    on booking changes; rebuild with `manage.py rebuild_daily_stats`.
+    """
+
+    date = models.DateField(
+        _('Date'),
+        unique=True
+    )
+
+    # ── Rooms (the night starting on `date`) ────────────
+    room_nights_sold = models.PositiveIntegerField(
+        _('Room Nights Sold'),
+        default=0
+    )
+    rooms_available = models.PositiveIntegerField(
+        _('Rooms Available'),
+        default=0
+    )
+    room_revenue = models.DecimalField(
+        _('Room Revenue'),
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        help_text=_('Stay revenue earned on this night (price per night of each stay).')
+    )
+    booked_revenue = models.DecimalField(
+        _('Booked Revenue'),
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        help_text=_('Total value of the bookings made on this day.')
+    )
+
+    # ── Restaurant ──────────────────────────────────────
+    lunch_covers  = models.PositiveIntegerField(_('Lunch Covers'),  default=0)
+    dinner_covers = models.PositiveIntegerField(_('Dinner Covers'), default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name        = _('Daily Stats')
+        verbose_name_plural = _('Daily Stats')
+        ordering            = ['date']
+
+    def __str__(self):
+        return f"Stats {self.date}"
+
+    @property
+    def occupancy(self):
+        """Percentage of bookable rooms sold for the night."""
+        if not self.rooms_available:
+            return 0
+        return round(100 * self.room_nights_sold / self.rooms_available, 1)
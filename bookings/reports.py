@@ -0,0 +1,158 @@
+from decimal import Decimal
+from django.db import connection
+from django.db.models import Count, Q, Sum
+from rooms.models import Room, RoomType
+from .models import RoomBooking, TableBooking, BookingStatus, TimeSlot, BILLABLE_STATUSES
+
+
+MAX_REPORT_DAYS = 5 * 366   # widest range the report accepts
+
+CENT = Decimal('0.01')
+ZERO = Decimal('0.00')
+
+
+# ══════════════════════════════════════════════════════════════
+#   ROOM NIGHTS (one set-based query)
+# ══════════════════════════════════════════════════════════════
+
+ROOM_TYPE_SQL = """
+WITH nights(night) AS (
+    SELECT d::date FROM generate_series(%s::date, %s::date, interval '1 day') AS d
+),
+sold AS (
+    SELECT b.room_id,
+           COUNT(*)                                          AS nights_sold,
+           SUM(b.total_price / (b.check_out - b.check_in))  AS revenue
+      FROM {booking} b
+      JOIN nights n ON n.night >= b.check_in AND n.night < b.check_out
+     WHERE b.status IN ({statuses})
+       AND b.check_in  <= %s
+       AND b.check_out >  %s
+       AND b.check_out >  b.check_in
+     GROUP BY b.room_id
+)
+SELECT r.room_type,
+       SUM(CASE WHEN r.is_available THEN 1 ELSE 0 END),
+       COALESCE(SUM(s.nights_sold), 0),
+       COALESCE(SUM(s.revenue), 0)
+  FROM {room} r
+  LEFT JOIN sold s ON s.room_id = r.id
+ GROUP BY r.room_type
+"""
+
+
+def _money(value):
+    return (value or ZERO).quantize(CENT)
+
+
+def room_type_rows(start, end):
+    """
+    Rooms, nights sold and revenue per RoomType for [start, end]:
+    every stay is joined against the calendar of the range, so each
+    night sold is one joined row and revenue is spread per night.
+    """
+    sql = ROOM_TYPE_SQL.format(
+        booking=RoomBooking._meta.db_table,
+        room=Room._meta.db_table,
+        statuses=', '.join(['%s'] * len(BILLABLE_STATUSES)),
+    )
+    params = [start, end, *BILLABLE_STATUSES, end, start]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+# ══════════════════════════════════════════════════════════════
+#   REPORT
+# ══════════════════════════════════════════════════════════════
+
+def _room_metrics(rooms, nights_sold, revenue, days):
+    """Occupancy %, ADR and RevPAR for one row of rooms."""
+    available = rooms * days
+    return {
+        'rooms':            rooms,
+        'nights_available': available,
+        'nights_sold':      nights_sold,
+        'revenue':          revenue,
+        'occupancy':        round(100 * nights_sold / available, 1) if available else 0,
+        'adr':              (revenue / nights_sold).quantize(CENT) if nights_sold else ZERO,
+        'revpar':           (revenue / available).quantize(CENT) if available else ZERO,
+    }
+
+
+def range_report(start, end):
+    """
+    Occupancy, ADR, RevPAR per room type, covers per time slot and
+    cancellation rates for [start, end] — three aggregate queries
+    whatever the length of the range.
+    Available nights use today's bookable rooms (no history is kept).
+    """
+    days   = (end - start).days + 1
+    labels = dict(RoomType.choices)
+
+    # ── Rooms by type ───────────────────────────────────
+    room_types = []
+    total_rooms, total_sold, total_revenue = 0, 0, ZERO
+    for room_type, rooms, nights_sold, revenue in room_type_rows(start, end):
+        revenue = _money(revenue)
+        room_types.append({
+            'room_type': labels.get(room_type, room_type),
+            **_room_metrics(rooms or 0, nights_sold, revenue, days),
+        })
+        total_rooms   += rooms or 0
+        total_sold    += nights_sold
+        total_revenue += revenue
+    room_types.sort(key=lambda row: -row['revenue'])
+
+    # ── Arrivals in range: cancellation rate ────────────
+    arrivals = RoomBooking.objects.filter(check_in__gte=start, check_in__lte=end).aggregate(
+        total=Count('pk'),
+        cancelled=Count('pk', filter=Q(status=BookingStatus.CANCELLED)),
+    )
+
+    # ── Tables by time slot ─────────────────────────────
+    not_cancelled = ~Q(status=BookingStatus.CANCELLED)
+    by_slot = {
+        row['time_slot']: row
+        for row in TableBooking.objects.filter(date__gte=start, date__lte=end)
+        .values('time_slot')
+        .annotate(
+            bookings=Count('pk', filter=not_cancelled),
+            covers=Sum('guests', filter=not_cancelled),
+            cancelled=Count('pk', filter=Q(status=BookingStatus.CANCELLED)),
+        )
+        .order_by()
+    }
+    time_slots = [
+        {
+            'time_slot': label,
+            'bookings':  by_slot.get(value, {}).get('bookings', 0),
+            'covers':    by_slot.get(value, {}).get('covers') or 0,
+        }
+        for value, label in TimeSlot.choices
+    ]
+    tables = {
+        'total':     sum(row['bookings'] + row['cancelled'] for row in by_slot.values()),
+        'cancelled': sum(row['cancelled'] for row in by_slot.values()),
+    }
+
+    return {
+        'days':       days,
+        'room_types': room_types,
+        'rooms':      _room_metrics(total_rooms, total_sold, total_revenue, days),
+        'time_slots': time_slots,
+        'bookings':   sum(row['bookings'] for row in time_slots),
+        'covers':     sum(row['covers'] for row in time_slots),
+        'cancellation': {
+            'rooms':  _rate(arrivals),
+            'tables': _rate(tables),
+        },
+    }
+
+
+def _rate(counts):
+    total = counts['total']
+    return {
+        **counts,
+        'rate': round(100 * counts['cancelled'] / total, 1) if total else 0,
+    }
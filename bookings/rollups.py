@@ -0,0 +1,275 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+from django.db import connection, connections, transaction
+from django.db.models import Min, Max, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from rooms.models import Room
+from .inventory import stay_nights
+from .models import (
+    RoomBooking, TableBooking, BookingStatus, DailyStats,
+    BILLABLE_STATUSES, LUNCH_LAST_SLOT,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Columns rewritten on refresh. rooms_available is left out: it is
+# the count of bookable rooms when the row was first created, so an
+# edit to an old booking doesn't rewrite that day's capacity.
+ROLLUP_FIELDS = [
+    'room_nights_sold',
+    'room_revenue',
+    'booked_revenue',
+    'lunch_covers',
+    'dinner_covers',
+    'updated_at',
+]
+
+REBUILD_WINDOW = 366   # days recomputed per pass by rebuild_daily_stats()
+
+
+# ══════════════════════════════════════════════════════════════
+#   COMPUTATION
+# ══════════════════════════════════════════════════════════════
+
+def compute_daily_stats(start, end):
+    """
+    Unsaved DailyStats for every date in [start, end], from three
+    queries bounded by the window. rooms_available is today's count
+    of bookable rooms; only rows created now keep it (ROLLUP_FIELDS).
+    """
+    days = {
+        start + timedelta(days=i): DailyStats(date=start + timedelta(days=i))
+        for i in range((end - start).days + 1)
+    }
+    rooms_available = Room.objects.filter(is_available=True).count()
+    for row in days.values():
+        row.rooms_available = rooms_available
+        row.room_revenue    = Decimal('0')
+
+    # ── Nights sold + revenue earned per night ──────────
+    stays = RoomBooking.objects.filter(
+        status__in=BILLABLE_STATUSES,
+        check_in__lte=end,
+        check_out__gt=start,
+    ).values_list('check_in', 'check_out', 'total_price')
+
+    for check_in, check_out, total_price in stays.iterator(chunk_size=2000):
+        nights = (check_out - check_in).days
+        if nights <= 0:
+            continue
+        per_night = total_price / nights
+        for night in stay_nights(max(check_in, start), min(check_out, end + timedelta(days=1))):
+            row = days[night]
+            row.room_nights_sold += 1
+            row.room_revenue     += per_night
+
+    # ── Value of bookings made per day ──────────────────
+    booked = RoomBooking.objects.filter(
+        status__in=BILLABLE_STATUSES,
+        created_at__date__gte=start,
+        created_at__date__lte=end,
+    ).annotate(day=TruncDate('created_at')).values('day').annotate(
+        total=Sum('total_price')
+    ).order_by()
+    for entry in booked:
+        days[entry['day']].booked_revenue = entry['total'] or 0
+
+    # ── Restaurant covers per service ───────────────────
+    covers = TableBooking.objects.filter(
+        date__gte=start,
+        date__lte=end,
+    ).exclude(status=BookingStatus.CANCELLED).values('date').annotate(
+        lunch=Sum('guests',  filter=Q(time_slot__lte=LUNCH_LAST_SLOT)),
+        dinner=Sum('guests', filter=Q(time_slot__gt=LUNCH_LAST_SLOT)),
+    ).order_by()
+    for entry in covers:
+        row = days[entry['date']]
+        row.lunch_covers  = entry['lunch'] or 0
+        row.dinner_covers = entry['dinner'] or 0
+
+    for row in days.values():
+        row.room_revenue = row.room_revenue.quantize(Decimal('0.01'))
+    return list(days.values())
+
+
+def _runs(dates):
+    """Sorted dates → [(start, end), ...] of consecutive days."""
+    runs = []
+    for day in sorted(set(dates)):
+        if runs and day == runs[-1][1] + timedelta(days=1):
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return runs
+
+
+def refresh_daily_stats(dates):
+    """Recomputes and upserts the rollup rows for the given dates."""
+    rows = []
+    for start, end in _runs(dates):
+        rows.extend(compute_daily_stats(start, end))
+    if not rows:
+        return 0
+    DailyStats.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['date'],
+        update_fields=ROLLUP_FIELDS,
+        batch_size=500,
+    )
+    return len(rows)
+
+
+_pool = None
+
+
+def _executor():
+    global _pool
+    if _pool is None:
+        # One worker: refreshes of overlapping dates never race
+        _pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rollups')
+    return _pool
+
+
+def _refresh_in_worker(dates):
+    try:
+        refresh_daily_stats(dates)
+    except Exception:
+        logger.exception('Daily stats refresh failed for %s date(s)', len(dates))
+    finally:
+        # Worker threads hold their own connections; don't leak them
+        connections.close_all()
+
+
+def schedule_refresh(dates):
+    """
+    refresh_daily_stats() on a background thread once the booking
+    change has committed, so booking requests don't wait for the
+    rollup queries. `manage.py rebuild_daily_stats` repairs any
+    refresh lost to a restart.
+    """
+    dates = set(dates)
+    if dates:
+        transaction.on_commit(lambda: _executor().submit(_refresh_in_worker, dates))
+
+
+def rebuild_daily_stats(start=None, end=None):
+    """
+    Recomputes every day between the first and last booking (or the
+    given bounds) in REBUILD_WINDOW-day passes. Returns rows written.
+    """
+    if start is None or end is None:
+        rooms  = RoomBooking.objects.aggregate(
+            first=Min('check_in'), last=Max('check_out'), created=Min('created_at')
+        )
+        tables = TableBooking.objects.aggregate(first=Min('date'), last=Max('date'))
+        firsts = [d for d in (rooms['first'], tables['first']) if d]
+        if rooms['created']:
+            firsts.append(timezone.localdate(rooms['created']))
+        lasts  = [d for d in (rooms['last'], tables['last']) if d]
+        if not firsts:
+            return 0
+        start = start or min(firsts)
+        end   = end or max(lasts)
+
+    written = 0
+    while start <= end:
+        window_end = min(start + timedelta(days=REBUILD_WINDOW - 1), end)
+        with transaction.atomic():
+            written += refresh_daily_stats(
+                [start + timedelta(days=i) for i in range((window_end - start).days + 1)]
+            )
+        start = window_end + timedelta(days=1)
+    return written
+
+
+# ══════════════════════════════════════════════════════════════
+#   DATES TOUCHED BY A BOOKING
+# ══════════════════════════════════════════════════════════════
+
+def room_booking_dates(check_in, check_out, created_at):
+    dates = stay_nights(check_in, check_out)
+    if created_at:
+        dates.append(timezone.localdate(created_at))
+    return dates
+
+
+def queryset_dates(queryset):
+    """Every rollup date touched by a RoomBooking / TableBooking queryset."""
+    if queryset.model is TableBooking:
+        return set(queryset.values_list('date', flat=True))
+    dates = set()
+    for check_in, check_out, created_at in queryset.values_list(
+        'check_in', 'check_out', 'created_at'
+    ):
+        dates.update(room_booking_dates(check_in, check_out, created_at))
+    return dates
+
+
+# ══════════════════════════════════════════════════════════════
+#   REPORTING (reads the rollups only)
+# ══════════════════════════════════════════════════════════════
+
+# Every date of the year, so days without a rollup row still count
+# towards rooms_available (at today's bookable rooms).
+YEAR_SQL = """
+SELECT date_trunc('month', d.day)::date,
+       COUNT(s.date),
+       COALESCE(SUM(s.room_nights_sold), 0),
+       SUM(COALESCE(s.rooms_available, %s)),
+       COALESCE(SUM(s.room_revenue), 0),
+       COALESCE(SUM(s.booked_revenue), 0),
+       COALESCE(SUM(s.lunch_covers), 0),
+       COALESCE(SUM(s.dinner_covers), 0)
+  FROM (SELECT generate_series(%s::date, %s::date, interval '1 day')::date AS day) d
+  LEFT JOIN {table} s ON s.date = d.day
+ GROUP BY 1
+ ORDER BY 1
+"""
+
+REPORT_FIELDS = [
+    'room_nights_sold',
+    'rooms_available',
+    'room_revenue',
+    'booked_revenue',
+    'lunch_covers',
+    'dinner_covers',
+]
+
+
+def _with_occupancy(row):
+    available = row['rooms_available'] or 0
+    row['occupancy'] = round(100 * row['room_nights_sold'] / available, 1) if available else 0
+    return row
+
+
+def yearly_report(year):
+    """
+    Per-month rows plus a year total for `year`, from one query over
+    every date of the year left-joined to DailyStats (at most 366
+    rows). A year without any rollup rows has no months.
+    """
+    rooms_now = Room.objects.filter(is_available=True).count()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            YEAR_SQL.format(table=DailyStats._meta.db_table),
+            [rooms_now, date(year, 1, 1), date(year, 12, 31)],
+        )
+        rows = cursor.fetchall()
+
+    months = [
+        {'month': month, **dict(zip(REPORT_FIELDS, values))}
+        for month, recorded, *values in rows
+    ]
+    if not any(recorded for _month, recorded, *_values in rows):
+        months = []
+    total = {field: sum(row[field] for row in months) for field in REPORT_FIELDS}
+
+    return {
+        'months': [_with_occupancy(row) for row in months],
+        'total':  _with_occupancy(total),
+    }
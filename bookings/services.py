@@ -0,0 +1,113 @@
+import time
+import zlib
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction, OperationalError
+from django.utils.translation import gettext_lazy as _
+from rooms.models import Room
+from .inventory import room_is_free
+
+
+# Attempts per booking before a serialization failure / deadlock is
+# surfaced to the caller. Reference collisions are retried by save().
+MAX_ATTEMPTS  = 3
+RETRY_BACKOFF = 0.05   # seconds, multiplied by the attempt number
+
+# serialization_failure, deadlock_detected
+RETRYABLE_PGCODES = {'40001', '40P01'}
+
+
+# ══════════════════════════════════════════════════════════════
+#   LOCKS
+# ══════════════════════════════════════════════════════════════
+
+def _lock_room(room_id):
+    """
+    Row-locks a single Room until the surrounding transaction ends.
+    Bookings for other rooms are never blocked.
+    """
+    Room.objects.select_for_update().only('pk').get(pk=room_id)
+
+
+def _lock_table_slot(date, time_slot):
+    """
+    Takes a transaction-scoped PostgreSQL advisory lock for one
+    (date, time_slot). There is no row to lock for a slot, so the
+    key is a stable hash of the pair.
+    """
+    key = zlib.crc32(f'table-slot:{date.isoformat()}:{time_slot}'.encode())
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(%s)', [key])
+
+
+def _is_retryable(error):
+    return getattr(error.__cause__, 'pgcode', None) in RETRYABLE_PGCODES
+
+
+def _with_retries(place):
+    """
+    Runs place() in its own transaction, retrying serialization
+    failures and deadlocks with a short linear backoff.
+    """
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            with transaction.atomic():
+                return place()
+        except OperationalError as e:
+            if attempt == MAX_ATTEMPTS or not _is_retryable(e):
+                raise
+            time.sleep(RETRY_BACKOFF * attempt)
+
+
+# ══════════════════════════════════════════════════════════════
+#   ROOM BOOKING
+# ══════════════════════════════════════════════════════════════
+
+def place_room_booking(booking, on_placed=None):
+    """
+    Saves an unsaved RoomBooking while holding its room's row lock.
+    Raises ValidationError if the nights were taken in the meantime.
+    on_placed(booking) runs in the same transaction (e.g. queueing
+    the confirmation), so it commits or rolls back with the booking.
+    """
+    def place():
+        _lock_room(booking.room_id)
+        if not room_is_free(booking.room, booking.check_in, booking.check_out):
+            raise ValidationError(
+                _('This room is not available for the selected dates. Please choose different dates.')
+            )
+        # A rolled-back attempt may have assigned a pk and reference
+        booking.pk        = None
+        booking.reference = ''
+        booking.save()
+        if on_placed:
+            on_placed(booking)
+        return booking
+
+    return _with_retries(place)
+
+
+# ══════════════════════════════════════════════════════════════
+#   TABLE BOOKING
+# ══════════════════════════════════════════════════════════════
+
+def place_table_booking(booking, on_placed=None):
+    """
+    Saves an unsaved TableBooking while holding the advisory lock
+    for its (date, time_slot). Raises ValidationError if the slot
+    filled up in the meantime. on_placed as for place_room_booking().
+    """
+    def place():
+        _lock_table_slot(booking.date, booking.time_slot)
+        available = booking.MAX_SEATS_PER_SLOT - booking.seats_taken()
+        if booking.guests > available:
+            raise ValidationError(
+                _('Not enough seats available for this time slot. Please choose a different time.')
+            )
+        booking.pk        = None
+        booking.reference = ''
+        booking.save()
+        if on_placed:
+            on_placed(booking)
+        return booking
+
+    return _with_retries(place)
@@ -0,0 +1,75 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from core.cache import bump_cache_version
+from rooms.models import Room
+from .models import TableBooking, RoomBooking, EmailTemplate
+from .inventory import invalidate_table_availability, bump_room_calendar_version
+from .events import publish, booking_event
+from .rollups import schedule_refresh, room_booking_dates
+
+
+@receiver([post_save, post_delete], sender=TableBooking)
+def table_booking_changed(sender, instance, **kwargs):
+    invalidate_table_availability([instance.date])
+
+
+@receiver(post_delete, sender=RoomBooking)
+@receiver(post_save, sender=Room)
+def room_calendar_changed(sender, **kwargs):
+    # After commit, so no worker re-caches the calendar from before it
+    transaction.on_commit(bump_room_calendar_version)
+
+
+@receiver([post_save, post_delete], sender=EmailTemplate)
+def email_template_changed(sender, **kwargs):
+    # Every worker drops its compiled templates on the next get()
+    transaction.on_commit(lambda: bump_cache_version('email-templates'))
+
+
+@receiver(post_save, sender=TableBooking)
+@receiver(post_save, sender=RoomBooking)
+def booking_saved(sender, instance, created, **kwargs):
+    publish(booking_event(instance, 'created' if created else 'updated'))
+
+
+@receiver(post_delete, sender=TableBooking)
+@receiver(post_delete, sender=RoomBooking)
+def booking_deleted(sender, instance, **kwargs):
+    publish(booking_event(instance, 'deleted'))
+
+
+# ── Daily rollups ───────────────────────────────────────────
+# Columns _rollup_dates() reads, per model
+ROLLUP_DATE_FIELDS = {
+    TableBooking: ('date',),
+    RoomBooking:  ('check_in', 'check_out', 'created_at'),
+}
+
+
+def _rollup_dates(instance):
+    if isinstance(instance, TableBooking):
+        return [instance.date]
+    return room_booking_dates(instance.check_in, instance.check_out, instance.created_at)
+
+
+@receiver(pre_save, sender=TableBooking)
+@receiver(pre_save, sender=RoomBooking)
+def booking_rollup_before(sender, instance, update_fields=None, **kwargs):
+    # Dates the stored row counted towards, in case they move
+    instance._rollup_old_dates = []
+    fields = ROLLUP_DATE_FIELDS[sender]
+    if not instance.pk or (update_fields is not None and not set(update_fields) & set(fields)):
+        return
+    old = sender.objects.filter(pk=instance.pk).values(*fields).first()
+    if old is not None:
+        instance._rollup_old_dates = _rollup_dates(sender(**old))
+
+
+@receiver(post_save, sender=TableBooking)
+@receiver(post_save, sender=RoomBooking)
+@receiver(post_delete, sender=TableBooking)
+@receiver(post_delete, sender=RoomBooking)
+def booking_rollup_after(sender, instance, **kwargs):
+    old_dates = getattr(instance, '_rollup_old_dates', [])
+    schedule_refresh([*old_dates, *_rollup_dates(instance)])
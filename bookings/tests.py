@@ -1,3 +1,1200 @@
-from django.test import TestCase
+import importlib
+import json
+import threading
+import time
+from io import StringIO
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.apps import apps as django_apps
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.exceptions import ValidationError
+from django.db import connection, connections, IntegrityError, OperationalError
+from django.template import Context, Template
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import translation
+from restaurant.models import RestaurantSettings
+from rooms.models import Room
+from .emails import send_table_confirmation
+from .events import EventHub, booking_event
+from .exports import csv_rows, TABLE_EXPORT_COLUMNS
+from .reports import range_report
+from .rollups import refresh_daily_stats, rebuild_daily_stats, yearly_report
+from .inventory import table_slot_availability, booked_night_runs, room_is_free, rebuild_ledger
+from .models import (
+    RoomBooking, RoomNight, TableBooking, BookingStatus, TimeSlot, EmailTemplate, OutboundEmail, DailyStats,
+    new_reference,
+)
+from .services import place_room_booking, place_table_booking
+from .views import _queue_email
 
-# Create your tests here.
+
+def make_room(name='Camera Test', **fields):
+    return Room.objects.create(
+        name=name,
+        room_type=fields.pop('room_type', 'doppia'),
+        price_per_night=fields.pop('price_per_night', 100),
+        capacity=fields.pop('capacity', 2),
+        **fields,
+    )
+
+
+# ══════════════════════════════════════════════════════════════
+#   INDEX USAGE (EXPLAIN on a seeded table)
+# ══════════════════════════════════════════════════════════════
+
+class BookingIndexTests(TestCase):
+    """
+    The hot booking queries must be answered from the Meta.indexes
+    once the tables hold realistic volumes, not by sequential scans.
+    """
+
+    ROOMS          = 40
+    STAYS_PER_ROOM = 400
+    TABLE_BOOKINGS = 8000
+    STATUSES       = [
+        BookingStatus.CONFIRMED, BookingStatus.COMPLETED,
+        BookingStatus.CANCELLED, BookingStatus.PENDING,
+    ]
+    # Most of a hotel's history is finished stays; few are still active
+    HISTORY        = [BookingStatus.COMPLETED, BookingStatus.COMPLETED, BookingStatus.CANCELLED]
+    ACTIVE_FROM    = 360   # stays from this index on are upcoming
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.start = date(2024, 1, 1)
+        rooms = [make_room(f'Camera {i}') for i in range(cls.ROOMS)]
+
+        stays = []
+        for room in rooms:
+            for i in range(cls.STAYS_PER_ROOM):
+                check_in = cls.start + timedelta(days=3 * i)
+                stays.append(RoomBooking(
+                    room=room,
+                    guest_name='Ospite',
+                    guest_email=f'guest{len(stays) % 3000}@example.com',
+                    check_in=check_in,
+                    check_out=check_in + timedelta(days=2),
+                    guests=2,
+                    price_per_night=100,
+                    total_price=200,
+                    status=(
+                        BookingStatus.CONFIRMED if i >= cls.ACTIVE_FROM
+                        else cls.HISTORY[i % len(cls.HISTORY)]
+                    ),
+                    reference=f'IX{len(stays):08d}',
+                ))
+        RoomBooking.objects.bulk_create(stays, batch_size=2000)
+
+        slots = TimeSlot.values
+        TableBooking.objects.bulk_create([
+            TableBooking(
+                guest_name='Ospite',
+                guest_email=f'diner{i % 3000}@example.com',
+                date=cls.start + timedelta(days=i % 400),
+                time_slot=slots[i % len(slots)],
+                guests=2,
+                status=cls.STATUSES[i % len(cls.STATUSES)],
+                reference=f'IT{i:08d}',
+            )
+            for i in range(cls.TABLE_BOOKINGS)
+        ], batch_size=2000)
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE bookings_roombooking')
+            cursor.execute('ANALYZE bookings_tablebooking')
+
+    def assertUsesIndex(self, queryset, *index_names):
+        plan = queryset.explain()
+        self.assertTrue(
+            any(name in plan for name in index_names),
+            f'Expected one of {index_names} in the plan:\n{plan}',
+        )
+
+    def test_active_stay_lookup(self):
+        day = self.start + timedelta(days=3 * self.ACTIVE_FROM + 6)
+        self.assertUsesIndex(
+            RoomBooking.objects.filter(
+                room=Room.objects.first(),
+                status__in=[BookingStatus.PENDING, BookingStatus.CONFIRMED],
+                check_in__lt=day + timedelta(days=3),
+                check_out__gt=day,
+            ),
+            'bk_room_active_stay_idx',
+            # The exclusion constraint's GiST index serves the same lookup
+            'bookings_roombooking_no_overlapping_stays',
+        )
+
+    def test_guest_dashboard_room_bookings(self):
+        self.assertUsesIndex(
+            RoomBooking.objects.filter(guest_email='guest42@example.com').order_by('-check_in'),
+            'bk_room_email_checkin_idx',
+        )
+
+    def test_admin_dashboard_arrivals_and_departures(self):
+        day = self.start + timedelta(days=30)
+        self.assertUsesIndex(
+            RoomBooking.objects.filter(check_in=day, status=BookingStatus.CONFIRMED),
+            'bk_room_checkin_status_idx',
+        )
+        self.assertUsesIndex(
+            RoomBooking.objects.filter(check_out=day, status=BookingStatus.CONFIRMED),
+            'bk_room_checkout_status_idx',
+        )
+
+    def test_table_slot_occupancy(self):
+        day = self.start + timedelta(days=10)
+        self.assertUsesIndex(
+            TableBooking.objects.filter(
+                date=day,
+                status__in=[BookingStatus.PENDING, BookingStatus.CONFIRMED],
+            ).values('date', 'time_slot').order_by(),
+            'bk_table_active_slot_idx',
+        )
+
+    def test_guest_dashboard_table_bookings(self):
+        self.assertUsesIndex(
+            TableBooking.objects.filter(guest_email='diner42@example.com').order_by('-date'),
+            'bk_table_email_date_idx',
+        )
+
+
+# ══════════════════════════════════════════════════════════════
+#   BOOKING REFERENCES
+# ══════════════════════════════════════════════════════════════
+
+class ReferenceAllocationTests(TestCase):
+    """
+    References come from secrets and rely on the unique index: no
+    existence check per booking, whatever the number of references.
+    """
+
+    EXISTING = 50000
+
+    @classmethod
+    def setUpTestData(cls):
+        TableBooking.objects.bulk_create([
+            TableBooking(
+                guest_name='Ospite',
+                guest_email='old@example.com',
+                date=date(2020, 1, 1) + timedelta(days=i % 1000),
+                guests=2,
+                status=BookingStatus.COMPLETED,
+                reference=f'TB{i:08d}',
+            )
+            for i in range(cls.EXISTING)
+        ], batch_size=5000)
+
+    def new_booking(self, **fields):
+        return TableBooking(
+            guest_name='Ospite',
+            guest_email='guest@example.com',
+            date=date.today() + timedelta(days=7),
+            guests=2,
+            **fields,
+        )
+
+    def test_no_reference_lookup_on_insert(self):
+        with CaptureQueriesContext(connection) as queries:
+            booking = self.new_booking()
+            booking.save()
+
+        self.assertRegex(booking.reference, r'^TB[A-Z0-9]{8}$')
+        lookups = [
+            q['sql'] for q in queries
+            if 'FROM "bookings_tablebooking"' in q['sql'] and '"reference"' in q['sql']
+        ]
+        self.assertEqual(lookups, [])
+
+    def test_collision_retries_with_a_new_code(self):
+        codes = iter(['TB00000001', 'TB00000002', 'TBFRESH001'])
+        with mock.patch('bookings.models.new_reference', side_effect=lambda prefix: next(codes)):
+            booking = self.new_booking()
+            booking.save()
+        self.assertEqual(booking.reference, 'TBFRESH001')
+
+    def test_gives_up_after_max_attempts(self):
+        with mock.patch('bookings.models.new_reference', return_value='TB00000001'):
+            booking = self.new_booking()
+            with self.assertRaises(IntegrityError):
+                booking.save()
+        self.assertEqual(booking.reference, '')
+
+    def test_unique_across_many_allocations(self):
+        references = {new_reference('TB') for _ in range(20000)}
+        self.assertEqual(len(references), 20000)
+
+
+# ══════════════════════════════════════════════════════════════
+#   TABLE SLOT AVAILABILITY CACHE
+# ══════════════════════════════════════════════════════════════
+
+class TableAvailabilityCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        RestaurantSettings.objects.update_or_create(pk=1, defaults={
+            'closed_monday': False, 'closed_tuesday': False,
+        })
+        self.day = date.today() + timedelta(days=10)
+
+    def seats_left(self, slot=TimeSlot.DINNER_1):
+        slots = table_slot_availability(self.day)['slots']
+        return next(s['seats_left'] for s in slots if s['time_slot'] == slot)
+
+    def test_booking_write_invalidates_after_commit(self):
+        self.assertEqual(self.seats_left(), TableBooking.MAX_SEATS_PER_SLOT)
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            TableBooking.objects.create(
+                guest_name='Ospite', guest_email='guest@example.com',
+                date=self.day, time_slot=TimeSlot.DINNER_1, guests=4,
+            )
+            # Not committed yet: the cached entry is still served
+            self.assertEqual(self.seats_left(), TableBooking.MAX_SEATS_PER_SLOT)
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.seats_left(), TableBooking.MAX_SEATS_PER_SLOT - 4)
+
+    def test_settings_save_retires_cached_dates(self):
+        self.assertTrue(table_slot_availability(self.day)['slots'][0]['available'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            settings = RestaurantSettings.objects.get(pk=1)
+            settings.lunch_enabled = False
+            settings.save()
+
+        self.assertFalse(table_slot_availability(self.day)['slots'][0]['available'])
+
+
+# ══════════════════════════════════════════════════════════════
+#   ROOM AVAILABILITY CALENDAR
+# ══════════════════════════════════════════════════════════════
+
+class RoomCalendarCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.room  = make_room()
+        self.month = date.today().replace(day=1) + timedelta(days=40)
+        self.month = self.month.replace(day=1)
+
+    def booked(self):
+        return booked_night_runs(self.month, 1, self.room.pk)['rooms'][str(self.room.pk)]
+
+    def book(self, **fields):
+        return RoomBooking.objects.create(
+            room=self.room, guest_name='Ospite', guest_email='guest@example.com',
+            check_in=self.month + timedelta(days=2), check_out=self.month + timedelta(days=5),
+            guests=2, status=BookingStatus.CONFIRMED, **fields,
+        )
+
+    def test_booking_retires_calendar_after_commit(self):
+        self.assertEqual(self.booked(), [])
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.book()
+            # Uncommitted: other workers must keep seeing the old calendar
+            self.assertEqual(self.booked(), [])
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.booked(), [[2, 3]])
+
+    def test_deleting_a_booking_frees_its_nights(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = self.book()
+        self.assertEqual(self.booked(), [[2, 3]])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.delete()
+        self.assertEqual(self.booked(), [])
+
+
+class RoomCalendarEndpointTests(TestCase):
+
+    ROOMS      = 40
+    STAY       = 3    # nights per stay
+    GAP        = 2    # free nights between stays
+    TARGET_MS  = 20   # 12 months × every room, one request
+    RUNS       = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.start = date.today().replace(day=1)
+        rooms = [make_room(f'Camera {i}') for i in range(cls.ROOMS)]
+        stays = [
+            RoomBooking(
+                room=room, guest_name='Ospite', guest_email='guest@example.com',
+                check_in=check_in, check_out=check_in + timedelta(days=cls.STAY),
+                guests=2, price_per_night=100, total_price=100 * cls.STAY,
+                status=BookingStatus.CONFIRMED, reference=f'RC{r:03d}{i:04d}',
+            )
+            for r, room in enumerate(rooms)
+            for i, check_in in enumerate(
+                cls.start + timedelta(days=day)
+                for day in range(r % cls.STAY, 366, cls.STAY + cls.GAP)
+            )
+        ]
+        RoomBooking.objects.bulk_create(stays, batch_size=2000)
+        rebuild_ledger()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE bookings_roomnight')
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, **params):
+        return self.client.get(reverse('bookings:room_calendar'), params)
+
+    def test_out_of_range_parameters_are_rejected(self):
+        for params in [
+            {'start': '9999-12'},
+            {'start': '9999-11', 'months': 2},
+            {'start': '0000-01'},
+            {'start': '2026-13'},
+            {'start': 'next'},
+            {'months': 0},
+            {'months': 13},
+            {'room': 'x'},
+        ]:
+            with self.subTest(**params):
+                self.assertEqual(self.get(**params).status_code, 400)
+
+    def test_last_representable_month_is_served(self):
+        response = self.get(start='9999-11', months=1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['end'], '9999-12-01')
+
+    def test_year_for_every_room_is_one_fast_request(self):
+        params = {'start': self.start.strftime('%Y-%m'), 'months': 12}
+        timings = []
+        for _ in range(self.RUNS):
+            cache.clear()
+            started = time.perf_counter()
+            response = self.get(**params)
+            timings.append((time.perf_counter() - started) * 1000)
+            self.assertEqual(response.status_code, 200)
+
+        data = response.json()
+        self.assertEqual(len(data['rooms']), self.ROOMS)
+        self.assertTrue(all(data['rooms'].values()))
+        self.assertLess(min(timings), self.TARGET_MS, f'{sorted(timings)} ms')
+
+
+class RoomNightLedgerTests(TestCase):
+    """
+    Every save rewrites the nights a booking holds, so the ledger
+    never drifts from RoomBooking.
+    """
+
+    def setUp(self):
+        self.room     = make_room()
+        self.check_in = date.today() + timedelta(days=10)
+        self.booking  = RoomBooking.objects.create(
+            room=self.room, guest_name='Ospite', guest_email='guest@example.com',
+            check_in=self.check_in, check_out=self.check_in + timedelta(days=3),
+            guests=2, status=BookingStatus.CONFIRMED,
+        )
+
+    def nights(self, booking=None):
+        return list(
+            RoomNight.objects.filter(booking=booking or self.booking)
+            .order_by('night').values_list('night', flat=True)
+        )
+
+    def test_booking_holds_each_night_but_checkout(self):
+        self.assertEqual(self.nights(), [self.check_in + timedelta(days=i) for i in range(3)])
+
+    def test_cancelling_releases_nights(self):
+        self.booking.status = BookingStatus.CANCELLED
+        self.booking.save()
+        self.assertEqual(self.nights(), [])
+
+    def test_status_change_releases_or_keeps_nights(self):
+        self.booking.status = BookingStatus.PENDING
+        self.booking.save()
+        self.assertEqual(len(self.nights()), 3)
+
+        self.booking.status = BookingStatus.COMPLETED
+        self.booking.save()
+        self.assertEqual(self.nights(), [])
+
+        self.booking.status = BookingStatus.CONFIRMED
+        self.booking.save()
+        self.assertEqual(len(self.nights()), 3)
+
+    def test_date_change_moves_nights(self):
+        self.booking.check_in  = self.check_in + timedelta(days=1)
+        self.booking.check_out = self.check_in + timedelta(days=5)
+        self.booking.save()
+        self.assertEqual(
+            self.nights(), [self.check_in + timedelta(days=i) for i in range(1, 5)],
+        )
+        self.assertTrue(room_is_free(self.room, self.check_in, self.check_in + timedelta(days=1)))
+
+    def test_rebuild_room_nights_restores_the_ledger(self):
+        cancelled = RoomBooking.objects.create(
+            room=make_room('Camera Due'), guest_name='Ospite', guest_email='guest@example.com',
+            check_in=self.check_in, check_out=self.check_in + timedelta(days=2),
+            guests=2, status=BookingStatus.CANCELLED,
+        )
+        RoomNight.objects.all().delete()
+        RoomNight.objects.create(room=cancelled.room, booking=cancelled, night=self.check_in)
+
+        out = StringIO()
+        call_command('rebuild_room_nights', stdout=out)
+
+        self.assertIn('3 night(s) written', out.getvalue())
+        self.assertEqual(len(self.nights()), 3)
+        self.assertEqual(self.nights(cancelled), [])
+
+
+class StayOverlapConstraintTests(TestCase):
+    """
+    The exclusion constraint is the last line of defence: a clash that
+    slips past the availability checks still reaches the guest as a
+    ValidationError, never as a raw IntegrityError.
+    """
+
+    def setUp(self):
+        self.room     = make_room()
+        self.check_in = date.today() + timedelta(days=10)
+        self.first    = self.stay(self.check_in, self.check_in + timedelta(days=3))
+
+    def stay(self, check_in, check_out, status=BookingStatus.CONFIRMED):
+        booking = RoomBooking(
+            room=self.room, guest_name='Ospite', guest_email='guest@example.com',
+            check_in=check_in, check_out=check_out, guests=2, status=status,
+        )
+        booking.save()
+        return booking
+
+    def test_overlapping_active_stay_raises_validation_error(self):
+        for status in (BookingStatus.CONFIRMED, BookingStatus.PENDING):
+            with self.subTest(status=status), self.assertRaises(ValidationError):
+                self.stay(self.check_in + timedelta(days=2), self.check_in + timedelta(days=4), status)
+        self.assertEqual(RoomBooking.objects.filter(room=self.room).count(), 1)
+
+    def test_moving_a_stay_onto_another_raises_validation_error(self):
+        second = self.stay(self.check_in + timedelta(days=5), self.check_in + timedelta(days=7))
+        second.check_in = self.check_in + timedelta(days=1)
+        with self.assertRaises(ValidationError):
+            second.save()
+
+    def test_cancelled_and_adjacent_stays_are_allowed(self):
+        self.stay(self.check_in, self.check_in + timedelta(days=3), BookingStatus.CANCELLED)
+        self.stay(self.check_in + timedelta(days=3), self.check_in + timedelta(days=5))
+        self.assertEqual(RoomBooking.objects.filter(room=self.room).count(), 3)
+
+
+# ══════════════════════════════════════════════════════════════
+#   CONCURRENT BOOKINGS
+# ══════════════════════════════════════════════════════════════
+
+class ConcurrentBookingTests(TransactionTestCase):
+    """
+    Guests racing for the same room or slot from separate connections:
+    the locks in bookings.services let exactly one of them through.
+    The availability check is slowed down so that, without the lock,
+    every thread would read "free" before any of them writes.
+    """
+
+    THREADS = 4
+    DELAY   = 0.2
+
+    def race(self, place, make_booking):
+        barrier = threading.Barrier(self.THREADS)
+        results = []
+
+        def attempt():
+            try:
+                barrier.wait()
+                place(make_booking())
+                results.append('booked')
+            except ValidationError:
+                results.append('refused')
+            except Exception as e:
+                results.append(repr(e))
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=attempt) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return sorted(results)
+
+    def slowed(self, target, original):
+        def check(*args, **kwargs):
+            result = original(*args, **kwargs)
+            time.sleep(self.DELAY)
+            return result
+        return mock.patch(target, side_effect=check, autospec=True)
+
+    def test_one_guest_gets_the_room(self):
+        from . import services
+        room     = make_room()
+        check_in = date.today() + timedelta(days=20)
+
+        with self.slowed('bookings.services.room_is_free', services.room_is_free):
+            results = self.race(place_room_booking, lambda: RoomBooking(
+                room=room, guest_name='Ospite', guest_email='guest@example.com',
+                check_in=check_in, check_out=check_in + timedelta(days=2), guests=2,
+                price_per_night=100, total_price=200,
+            ))
+
+        self.assertEqual(results, ['booked'] + ['refused'] * (self.THREADS - 1))
+        self.assertEqual(RoomBooking.objects.filter(room=room).count(), 1)
+
+    def test_slot_is_not_overbooked(self):
+        day    = date.today() + timedelta(days=20)
+        guests = TableBooking.MAX_SEATS_PER_SLOT // 2 + 1   # only one party fits
+
+        with self.slowed('bookings.models.TableBooking.seats_taken', TableBooking.seats_taken):
+            results = self.race(place_table_booking, lambda: TableBooking(
+                guest_name='Ospite', guest_email='guest@example.com',
+                date=day, time_slot=TimeSlot.DINNER_1, guests=guests,
+            ))
+
+        self.assertEqual(results, ['booked'] + ['refused'] * (self.THREADS - 1))
+        self.assertEqual(TableBooking.objects.filter(date=day).count(), 1)
+
+
+class BookingRetryTests(TestCase):
+    """
+    Only serialization failures and deadlocks are worth another
+    attempt; anything else reaches the caller at once.
+    """
+
+    def setUp(self):
+        self.room     = make_room()
+        self.check_in = date.today() + timedelta(days=20)
+
+    def booking(self):
+        return RoomBooking(
+            room=self.room, guest_name='Ospite', guest_email='guest@example.com',
+            check_in=self.check_in, check_out=self.check_in + timedelta(days=2), guests=2,
+        )
+
+    def failing(self, pgcode, times):
+        from . import services
+        cause = Exception('simulated')
+        cause.pgcode = pgcode
+        error = OperationalError('simulated')
+        error.__cause__ = cause
+        calls = []
+
+        def lock(room_id):
+            calls.append(room_id)
+            if len(calls) <= times:
+                raise error
+            return services.Room.objects.select_for_update().get(pk=room_id)
+
+        return mock.patch('bookings.services._lock_room', side_effect=lock), calls
+
+    @mock.patch('bookings.services.RETRY_BACKOFF', 0)
+    def test_deadlock_is_retried(self):
+        patch, calls = self.failing('40P01', times=1)
+        with patch:
+            booking = place_room_booking(self.booking())
+        self.assertEqual(len(calls), 2)
+        self.assertTrue(RoomBooking.objects.filter(pk=booking.pk).exists())
+
+    @mock.patch('bookings.services.RETRY_BACKOFF', 0)
+    def test_other_operational_errors_are_not_retried(self):
+        patch, calls = self.failing('57014', times=1)   # query_canceled
+        with patch, self.assertRaises(OperationalError):
+            place_room_booking(self.booking())
+        self.assertEqual(len(calls), 1)
+
+    def test_overlapping_stay_is_refused_not_retried(self):
+        place_room_booking(self.booking())
+        with mock.patch('bookings.services.room_is_free', return_value=True), \
+                self.assertRaises(ValidationError):
+            place_room_booking(self.booking())
+        self.assertEqual(RoomBooking.objects.filter(room=self.room).count(), 1)
+
+
+# ══════════════════════════════════════════════════════════════
+#   RECEPTION DASHBOARD
+# ══════════════════════════════════════════════════════════════
+
+class DashboardQueryBudgetTests(TestCase):
+    """The dashboard costs a fixed number of queries, however busy the day."""
+
+    # Session + user, two counter aggregates, the month's rollups and
+    # the six lists (select_related, no per-row queries)
+    BUDGET = 11
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(get_user_model().objects.create_user(
+            'reception', password='x', is_staff=True,
+        ))
+        self.today = date.today()
+
+    def add_bookings(self, count):
+        for i in range(count):
+            status = [BookingStatus.CONFIRMED, BookingStatus.PENDING][i % 2]
+            # One room per stay: the same dates can't be booked twice
+            RoomBooking.objects.create(
+                room=make_room(f'Camera {RoomBooking.objects.count()}'),
+                guest_name='Ospite', guest_email='guest@example.com',
+                check_in=self.today, check_out=self.today + timedelta(days=2),
+                guests=2, status=status,
+            )
+            TableBooking.objects.create(
+                guest_name='Ospite', guest_email='guest@example.com',
+                date=self.today, time_slot=TimeSlot.values[i % len(TimeSlot.values)],
+                guests=2, status=status,
+            )
+
+    def test_query_budget_does_not_grow_with_bookings(self):
+        url = reverse('admin_dashboard')
+
+        self.add_bookings(2)
+        with self.assertNumQueries(self.BUDGET):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+        self.add_bookings(10)
+        with self.assertNumQueries(self.BUDGET):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_lunch_and_dinner_covers_split_on_the_shared_boundary(self):
+        from .dashboard import dashboard_counts
+        for slot in (TimeSlot.LUNCH_4, TimeSlot.DINNER_1):
+            TableBooking.objects.create(
+                guest_name='Ospite', guest_email='guest@example.com',
+                date=self.today, time_slot=slot, guests=3, status=BookingStatus.CONFIRMED,
+            )
+        counts = dashboard_counts(self.today)
+        self.assertEqual((counts['covers_lunch'], counts['covers_tonight']), (3, 3))
+
+
+class AdminStatusActionTests(TestCase):
+
+    def setUp(self):
+        self.bookings = {}
+        for status in (BookingStatus.PENDING, BookingStatus.CONFIRMED,
+                       BookingStatus.CANCELLED, BookingStatus.COMPLETED):
+            self.bookings[status] = TableBooking.objects.create(
+                guest_name='Ospite', guest_email='guest@example.com',
+                date=date.today() + timedelta(days=3), time_slot=TimeSlot.DINNER_1,
+                guests=2, status=status,
+            )
+
+    def run_action(self, action):
+        with mock.patch('bookings.admin.publish_status_change') as publish:
+            action(mock.Mock(), None, TableBooking.objects.all())
+        (model_name, pks, status), _kwargs = publish.call_args
+        return sorted(pks), status
+
+    def test_confirm_publishes_only_the_rows_it_changed(self):
+        from .admin import confirm_table_bookings
+        pks, status = self.run_action(confirm_table_bookings)
+        # Cancelled is skipped, already-confirmed did not change
+        self.assertEqual(pks, sorted([
+            self.bookings[BookingStatus.PENDING].pk, self.bookings[BookingStatus.COMPLETED].pk,
+        ]))
+        self.assertEqual(status, BookingStatus.CONFIRMED)
+
+    def test_cancel_publishes_only_the_rows_it_changed(self):
+        from .admin import cancel_table_bookings
+        pks, _status = self.run_action(cancel_table_bookings)
+        self.assertEqual(pks, sorted([
+            self.bookings[BookingStatus.PENDING].pk, self.bookings[BookingStatus.CONFIRMED].pk,
+        ]))
+        self.assertEqual(
+            TableBooking.objects.get(pk=self.bookings[BookingStatus.COMPLETED].pk).status,
+            BookingStatus.COMPLETED,
+        )
+
+
+class TableBookingChangelistTests(TestCase):
+    """
+    slot_capacity reads the occupancy batched by TableBookingChangeList,
+    so the changelist costs the same queries for 2 rows or 20.
+    """
+
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.create_superuser(
+            'staff', 'staff@example.com', 'password',
+        ))
+        self.url = reverse('admin:bookings_tablebooking_changelist')
+
+    def book(self, count):
+        for i in range(count):
+            TableBooking.objects.create(
+                guest_name='Ospite', guest_email='guest@example.com',
+                date=date.today() + timedelta(days=1 + i % 7),
+                time_slot=TimeSlot.values[i % len(TimeSlot.values)],
+                guests=2, status=BookingStatus.CONFIRMED,
+            )
+
+    def changelist_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_slot_occupancy_is_batched(self):
+        self.book(2)
+        baseline = self.changelist_queries()
+
+        self.book(18)
+        with self.assertNumQueries(baseline):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.context['cl'].result_list), 20)
+        self.assertContains(response, f'/{TableBooking.MAX_SEATS_PER_SLOT} seats', count=20)
+
+
+class DashboardEventStreamTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('reception', password='x', is_staff=True)
+        self.url  = reverse('admin_dashboard_events')
+
+    async def test_staff_only(self):
+        self.assertEqual((await self.async_client.get(self.url)).status_code, 403)
+
+    @mock.patch('bookings.admin_views.EVENTS_MAX_LIFETIME', 0.3)
+    @mock.patch('bookings.admin_views.EVENTS_KEEPALIVE', 0.1)
+    async def test_stream_delivers_events_sends_keepalives_and_ends(self):
+        await self.async_client.aforce_login(self.user)
+        hub = EventHub()
+        hub._listener = mock.Mock()   # no LISTEN thread: events are dispatched by hand
+        with mock.patch('bookings.admin_views.hub', hub):
+            response = await self.async_client.get(self.url)
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            chunks = [(await anext(response.streaming_content)).decode()]
+
+            # Dispatched from another thread, as the LISTEN thread does
+            def dispatch():
+                try:
+                    hub.dispatch([{'model': 'table', 'action': 'status', 'ids': [1], 'status': 'confirmed'}])
+                finally:
+                    connections.close_all()
+            await sync_to_async(dispatch, thread_sensitive=False)()
+            chunks += [chunk.decode() async for chunk in response.streaming_content]
+
+        self.assertTrue(chunks[0].startswith('retry:'))
+        self.assertTrue(chunks[1].startswith('event: bookings\ndata: '))
+        self.assertIn('"counts"', chunks[1])
+        self.assertIn(': keepalive\n\n', chunks[2:])
+        # The stream ended on its own and left the hub
+        self.assertEqual(hub._subscribers, set())
+
+    def test_notify_payload_carries_no_guest_details(self):
+        booking = TableBooking.objects.create(
+            guest_name='Ospite Riservato', guest_email='guest@example.com',
+            date=date.today() + timedelta(days=3), time_slot=TimeSlot.DINNER_1, guests=2,
+        )
+        event = booking_event(booking, 'created')
+        self.assertEqual(event['ids'], [booking.pk])
+        self.assertNotIn('Ospite Riservato', json.dumps(event))
+        self.assertNotIn('guest@example.com', json.dumps(event))
+
+
+# ══════════════════════════════════════════════════════════════
+#   DAILY ROLLUPS
+# ══════════════════════════════════════════════════════════════
+
+class DailyStatsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.rooms = [make_room(f'Camera {i}') for i in range(2)]
+        self.day   = date(2025, 3, 10)
+
+    def stay(self, room, check_in, nights=2, **fields):
+        return RoomBooking.objects.create(
+            room=room, guest_name='Ospite', guest_email='guest@example.com',
+            check_in=check_in, check_out=check_in + timedelta(days=nights),
+            guests=2, price_per_night=100, total_price=100 * nights,
+            status=fields.pop('status', BookingStatus.CONFIRMED), **fields,
+        )
+
+    def test_booking_commit_defers_the_refresh(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.stay(self.rooms[0], date.today() + timedelta(days=5))
+
+        executor = mock.Mock()
+        with mock.patch('bookings.rollups._executor', return_value=executor):
+            # Nothing left on the request thread but cache writes
+            with self.assertNumQueries(0):
+                for callback in callbacks:
+                    callback()
+        executor.submit.assert_called_once()
+
+    def test_refresh_keeps_rooms_available_of_the_first_write(self):
+        self.stay(self.rooms[0], self.day)
+        refresh_daily_stats([self.day])
+        make_room('Camera Nuova')
+        refresh_daily_stats([self.day])
+
+        row = DailyStats.objects.get(date=self.day)
+        self.assertEqual((row.rooms_available, row.room_nights_sold), (2, 1))
+
+    def test_yearly_denominator_counts_days_without_rows(self):
+        self.stay(self.rooms[0], self.day, nights=1)
+        refresh_daily_stats([self.day])
+        make_room('Camera Nuova')
+
+        report = yearly_report(2025)
+        # One recorded day at 2 rooms, the other 364 at today's 3
+        self.assertEqual(report['total']['rooms_available'], 2 + 364 * 3)
+        self.assertEqual(report['total']['room_nights_sold'], 1)
+        self.assertEqual(len(report['months']), 12)
+        self.assertEqual(yearly_report(2024), {'months': [], 'total': mock.ANY})
+
+    def test_previous_dates_are_read_from_the_needed_columns_only(self):
+        booking = self.stay(self.rooms[0], self.day)
+        booking.check_out = self.day + timedelta(days=4)
+        with CaptureQueriesContext(connection) as queries:
+            booking.save()
+        lookup = next(
+            q['sql'] for q in queries if q['sql'].startswith('SELECT') and 'bookings_roombooking' in q['sql']
+        )
+        self.assertIn('"check_in"', lookup)
+        self.assertNotIn('"guest_name"', lookup)
+        self.assertEqual(
+            sorted(booking._rollup_old_dates),
+            sorted([self.day, self.day + timedelta(days=1), date.today()]),
+        )
+
+        # A save that cannot move any date skips the lookup
+        with CaptureQueriesContext(connection) as queries:
+            booking.save(update_fields=['special_requests'])
+        self.assertFalse(any('"check_in"' in q['sql'] for q in queries))
+
+    def test_report_year_out_of_range_falls_back_to_this_year(self):
+        self.client.force_login(get_user_model().objects.create_superuser(
+            'staff', 'staff@example.com', 'password',
+        ))
+        for year, shown in [('0', date.today().year), ('99999', date.today().year),
+                            ('-5', date.today().year), ('1', 1), ('9999', 9999)]:
+            with self.subTest(year=year):
+                response = self.client.get(reverse('admin_reports'), {'year': year})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.context['year'], shown)
+
+    def test_migration_backfill_matches_the_rollups(self):
+        self.stay(self.rooms[0], self.day, nights=3)
+        self.stay(self.rooms[1], self.day + timedelta(days=1), nights=2, status=BookingStatus.COMPLETED)
+        self.stay(self.rooms[1], self.day + timedelta(days=5), status=BookingStatus.CANCELLED)
+        for slot, guests in ((TimeSlot.LUNCH_2, 4), (TimeSlot.DINNER_3, 3)):
+            TableBooking.objects.create(
+                guest_name='Ospite', guest_email='guest@example.com',
+                date=self.day, time_slot=slot, guests=guests,
+            )
+
+        fields = ['date', 'room_nights_sold', 'rooms_available', 'room_revenue',
+                  'booked_revenue', 'lunch_covers', 'dinner_covers']
+        rebuild_daily_stats()
+        expected = list(DailyStats.objects.order_by('date').values_list(*fields))
+        DailyStats.objects.all().delete()
+
+        migration = importlib.import_module('bookings.migrations.0010_dailystats')
+        migration.backfill_daily_stats(django_apps, mock.Mock(connection=connection))
+        self.assertEqual(list(DailyStats.objects.order_by('date').values_list(*fields)), expected)
+
+
+class RangeReportTests(TestCase):
+
+    def test_nights_and_revenue_are_clipped_to_the_range(self):
+        room  = make_room(price_per_night=90)
+        start = date(2025, 3, 1)
+        # Four nights, two of them inside [1 March, 2 March]
+        RoomBooking.objects.create(
+            room=room, guest_name='Ospite', guest_email='guest@example.com',
+            check_in=start - timedelta(days=2), check_out=start + timedelta(days=2),
+            guests=2, price_per_night=100, total_price=Decimal('400.00'),
+            status=BookingStatus.COMPLETED,
+        )
+        report = range_report(start, start + timedelta(days=1))
+
+        self.assertEqual(report['rooms']['nights_sold'], 2)
+        self.assertEqual(report['rooms']['nights_available'], 2)
+        self.assertEqual(report['rooms']['revenue'], Decimal('200.00'))
+        self.assertEqual(report['rooms']['adr'], Decimal('100.00'))
+        self.assertEqual(report['rooms']['occupancy'], 100)
+
+
+# ══════════════════════════════════════════════════════════════
+#   EMAIL OUTBOX
+# ══════════════════════════════════════════════════════════════
+
+class OutboxTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        EmailTemplate.objects.create(
+            key=EmailTemplate.TemplateKey.TABLE_CONFIRMATION,
+            subject='Prenotazione {{ reference }}',
+            body='Grazie {{ guest_name }}',
+        )
+        RestaurantSettings.objects.update_or_create(pk=1, defaults={
+            'closed_monday': False, 'closed_tuesday': False,
+        })
+
+    def place(self, send=send_table_confirmation):
+        return place_table_booking(
+            TableBooking(
+                guest_name='Ospite', guest_email='guest@example.com',
+                date=date.today() + timedelta(days=5), time_slot=TimeSlot.DINNER_1, guests=2,
+            ),
+            on_placed=_queue_email(send),
+        )
+
+    def test_confirmation_is_queued_in_the_booking_transaction(self):
+        baseline, depth = len(connection.atomic_blocks), []
+
+        def send(booking):
+            depth.append(len(connection.atomic_blocks))
+            send_table_confirmation(booking)
+
+        self.place(send=send)
+        # The service's atomic block plus the enqueue savepoint
+        self.assertEqual(depth, [baseline + 2])
+        self.assertEqual(OutboundEmail.objects.count(), 2)
+
+    def test_queue_failure_is_logged_and_booking_kept(self):
+        def broken(booking):
+            OutboundEmail.objects.create(subject='x', body='x', from_email='x', to=['x'])
+            raise ValueError('no template')
+
+        with self.assertLogs('bookings.views', 'ERROR'):
+            booking = self.place(send=broken)
+
+        self.assertTrue(TableBooking.objects.filter(pk=booking.pk).exists())
+        # The partial enqueue was rolled back to its savepoint
+        self.assertEqual(OutboundEmail.objects.count(), 0)
+
+    def test_worker_sends_outside_a_transaction(self):
+        self.place()
+        depth = []
+        baseline = len(connection.atomic_blocks)
+
+        def send_messages(self_, messages):
+            depth.append(len(connection.atomic_blocks))
+            return len(messages)
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', send_messages):
+            call_command('send_queued_emails', stdout=mock.Mock())
+
+        self.assertEqual(depth, [baseline, baseline])
+        self.assertEqual(
+            OutboundEmail.objects.filter(status=OutboundEmail.Status.SENT).count(), 2
+        )
+
+    def test_claimed_rows_are_leased_to_one_worker(self):
+        from bookings.management.commands.send_queued_emails import Command
+        self.place()
+
+        claimed = Command().claim_batch(10)
+        self.assertEqual(len(claimed), 2)
+        # Until the lease runs out, a second worker finds nothing due
+        self.assertEqual(Command().claim_batch(10), [])
+
+    def test_failed_send_schedules_a_retry(self):
+        self.place()
+        with mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages',
+            side_effect=OSError('smtp down'),
+        ):
+            call_command('send_queued_emails', stdout=mock.Mock())
+
+        email = OutboundEmail.objects.first()
+        self.assertEqual(email.status, OutboundEmail.Status.QUEUED)
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual(email.last_error, 'smtp down')
+        self.assertEqual(len(mail.outbox), 0)
+
+
+# ══════════════════════════════════════════════════════════════
+#   EMAIL TEMPLATES
+# ══════════════════════════════════════════════════════════════
+
+class EmailTemplateCacheTests(TestCase):
+
+    KEY     = EmailTemplate.TemplateKey.TABLE_REMINDER
+    CONTEXT = {'guest_name': 'Ospite', 'reference': 'TB12345678', 'date': '1 June 2026'}
+    RENDERS = 300
+
+    def setUp(self):
+        cache.clear()
+        EmailTemplate.objects.filter(key=self.KEY).delete()
+        self.template = EmailTemplate.objects.create(
+            key=self.KEY,
+            subject='Promemoria {{ reference }}',
+            body=(
+                '{% if guest_name %}Gentile {{ guest_name }},{% endif %}\n'
+                'la aspettiamo il {{ date }}.\n' * 20
+            ),
+        )
+
+    def test_cached_lookup_costs_no_queries(self):
+        EmailTemplate.get(self.KEY)
+        with self.assertNumQueries(0):
+            template = EmailTemplate.get(self.KEY)
+            subject  = template.render_subject(self.CONTEXT)
+        self.assertEqual(subject, 'Promemoria TB12345678')
+
+    def test_edit_is_served_after_commit(self):
+        EmailTemplate.get(self.KEY).render_subject(self.CONTEXT)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.template.subject = 'Ci vediamo {{ date }}'
+            self.template.save()
+
+        self.assertEqual(
+            EmailTemplate.get(self.KEY).render_subject(self.CONTEXT), 'Ci vediamo 1 June 2026'
+        )
+
+    def test_inactive_or_deleted_template_is_not_served(self):
+        EmailTemplate.get(self.KEY)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.template.is_active = False
+            self.template.save()
+        self.assertIsNone(EmailTemplate.get(self.KEY))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.template.is_active = True
+            self.template.save()
+        self.assertIsNotNone(EmailTemplate.get(self.KEY))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.template.delete()
+        self.assertIsNone(EmailTemplate.get(self.KEY))
+
+    def test_loading_a_key_swaps_in_a_new_mapping(self):
+        other, _created = EmailTemplate.objects.update_or_create(
+            key=EmailTemplate.TemplateKey.ROOM_PRE_ARRIVAL,
+            defaults={'subject': 'Arrivo', 'body': 'A presto', 'is_active': True},
+        )
+        snapshot = EmailTemplate._cached
+        EmailTemplate.get(self.KEY)
+        EmailTemplate.get(other.key)
+        # Readers holding an older mapping never see it change under them
+        self.assertIsNot(EmailTemplate._cached, snapshot)
+        self.assertEqual(set(EmailTemplate._cached[1]), {self.KEY, other.key})
+
+    def test_microbenchmark_against_loading_and_parsing(self):
+        def uncached():
+            row = EmailTemplate.objects.get(key=self.KEY, is_active=True)
+            Template(row.subject).render(Context(self.CONTEXT))
+            Template(row.body).render(Context(self.CONTEXT))
+
+        def cached():
+            template = EmailTemplate.get(self.KEY)
+            template.render_subject(self.CONTEXT)
+            template.render_body(self.CONTEXT)
+
+        timings = {}
+        for name, render in [('uncached', uncached), ('cached', cached)]:
+            render()
+            started = time.perf_counter()
+            for _ in range(self.RENDERS):
+                render()
+            timings[name] = (time.perf_counter() - started) / self.RENDERS * 1e6
+
+        self.assertLess(
+            timings['cached'], timings['uncached'],
+            f"µs per render: {timings['cached']:.0f} cached vs {timings['uncached']:.0f} uncached",
+        )
+
+
+class GuestReminderTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_missing_template_skips_only_its_own_reminders(self):
+        EmailTemplate.objects.filter(key=EmailTemplate.TemplateKey.ROOM_PRE_ARRIVAL).delete()
+        EmailTemplate.objects.update_or_create(
+            key=EmailTemplate.TemplateKey.TABLE_REMINDER,
+            defaults={'subject': 'Promemoria {{ reference }}', 'body': 'A domani', 'is_active': True},
+        )
+        booking = TableBooking.objects.create(
+            guest_name='Ospite', guest_email='guest@example.com',
+            date=date.today() + timedelta(days=1), time_slot=TimeSlot.DINNER_1, guests=2,
+        )
+
+        with self.assertLogs('bookings.management.commands.send_guest_reminders', 'ERROR'):
+            call_command('send_guest_reminders', stdout=mock.Mock(), stderr=mock.Mock())
+
+        self.assertEqual(
+            list(OutboundEmail.objects.values_list('to', flat=True)), [['guest@example.com']]
+        )
+        booking.refresh_from_db()
+        self.assertIsNotNone(booking.reminder_sent_at)
+
+    def test_reminders_are_queued_once_not_sent(self):
+        EmailTemplate.objects.update_or_create(
+            key=EmailTemplate.TemplateKey.TABLE_REMINDER,
+            defaults={'subject': 'Promemoria {{ reference }}', 'body': 'A domani', 'is_active': True},
+        )
+        bookings = [
+            TableBooking.objects.create(
+                guest_name='Ospite', guest_email=f'guest{i}@example.com',
+                date=date.today() + timedelta(days=1), time_slot=TimeSlot.DINNER_1, guests=2,
+            )
+            for i in range(3)
+        ]
+
+        call_command('send_guest_reminders', '--chunk-size=2', stdout=mock.Mock(), stderr=mock.Mock())
+        call_command('send_guest_reminders', stdout=mock.Mock(), stderr=mock.Mock())
+
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(
+            sorted(OutboundEmail.objects.values_list('subject', flat=True)),
+            sorted(f'Promemoria {booking.reference}' for booking in bookings),
+        )
+        self.assertFalse(
+            TableBooking.objects.filter(reminder_sent_at__isnull=True).exists()
+        )
+
+
+
+# ══════════════════════════════════════════════════════════════
+#   CSV EXPORT
+# ══════════════════════════════════════════════════════════════
+
+class CsvExportTests(TestCase):
+
+    def export(self, **fields):
+        TableBooking.objects.create(
+            guest_email='guest@example.com', date=date.today() + timedelta(days=3),
+            time_slot=TimeSlot.DINNER_1, guests=2, **fields,
+        )
+        header, row = list(csv_rows(TableBooking.objects.all(), TABLE_EXPORT_COLUMNS))
+        return header, row
+
+    def test_phone_numbers_are_exported_as_typed(self):
+        _header, row = self.export(guest_name='Ospite', guest_phone='+39 06 1234-5678')
+        self.assertIn(',+39 06 1234-5678,', row)
+
+    def test_free_text_formulas_are_neutralised(self):
+        _header, row = self.export(guest_name='=HYPERLINK("http://x")', guest_phone='+39 (06) 123')
+        self.assertIn('"\'=HYPERLINK(""http://x"")"', row)
+        self.assertIn(',+39 (06) 123,', row)
+
+    def test_phone_with_letters_is_guarded(self):
+        _header, row = self.export(guest_name='Ospite', guest_phone='+cmd|calc')
+        self.assertIn(",'+cmd|calc,", row)
+
+    def test_headers_follow_the_active_language(self):
+        rows = TableBooking.objects.none()
+        with translation.override('it'):
+            self.assertIn('Ospiti', next(csv_rows(rows, TABLE_EXPORT_COLUMNS)))
+        with translation.override('en'):
+            self.assertIn('Guests', next(csv_rows(rows, TABLE_EXPORT_COLUMNS)))
@@ -6,6 +6,8 @@ app_name = 'bookings'
 urlpatterns = [
     path('room/',                              views.book_room,           name='book_room'),
     path('room/confirmation/<str:reference>/', views.booking_confirmation, name='booking_confirmation'),
+    path('room/calendar/',                     views.room_calendar,       name='room_calendar'),
     path('table/',                             views.book_table,          name='book_table'),
     path('table/confirmation/<str:reference>/', views.table_confirmation, name='table_confirmation'),
+    path('table/availability/',                views.table_availability,  name='table_availability'),
 ]
\ No newline at end of file
@@ -1,16 +1,52 @@
-from django.shortcuts import render, redirect, get_object_or_404
+import logging
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.shortcuts import redirect
 from django.contrib import messages
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.dateparse import parse_date
+from django.views.decorators.http import require_GET, condition
 from django.utils.translation import gettext_lazy as _
+from core.shortcuts import arender, aget_object_or_404
 from rooms.models import Room
 from .models import RoomBooking, TableBooking
 from .forms import RoomBookingForm, TableBookingForm
 from .emails import send_booking_confirmation, send_table_confirmation
+from .services import place_room_booking, place_table_booking
+from .inventory import (
+    table_slot_availability, booked_night_runs, room_calendar_version, add_months,
+    ROOM_CALENDAR_MAX_MONTHS,
+)
 
 
-def book_room(request):
+logger = logging.getLogger(__name__)
+
+
+def _queue_email(send):
+    """
+    on_placed hook for the booking services: queues the confirmation
+    in the booking's own transaction, so a committed booking always
+    has its outbox rows. If queueing fails (e.g. no active template)
+    the error is logged and the booking still goes through.
+    """
+    def queue(booking):
+        try:
+            with transaction.atomic():
+                send(booking)
+        except Exception:
+            logger.exception('Could not queue the confirmation for booking %s', booking.reference)
+    return queue
+
+
+async def book_room(request):
     # Pre-select room from query param (comes from room detail/listing page)
     room_id = request.POST.get('room') or request.GET.get('room')
-    room    = get_object_or_404(Room, pk=room_id, is_available=True) if room_id else None
+    room    = await aget_object_or_404(
+        Room.objects.filter(is_available=True), pk=room_id
+    ) if room_id else None
 
     # Pre-fill dates from query params
     initial = {}
@@ -24,42 +60,45 @@ def book_room(request):
     if request.method == 'POST':
         form = RoomBookingForm(request.POST, room=room)
 
-        if form.is_valid():
+        if await sync_to_async(form.is_valid)():
             booking          = form.save(commit=False)
             booking.room     = room
             booking.price_per_night = room.price_per_night
             booking.total_price     = booking.price_per_night * booking.nights
-            booking.save()
 
-            # Send confirmation email
+            # Re-checks availability under the room's row lock; the
+            # confirmation email is queued in the same transaction
             try:
-                send_booking_confirmation(booking)
-            except Exception:
-                # Don't block confirmation if email fails
-                pass
-
-            return redirect('bookings:booking_confirmation', reference=booking.reference)
+                await sync_to_async(place_room_booking)(
+                    booking, on_placed=_queue_email(send_booking_confirmation)
+                )
+            except ValidationError as e:
+                form.add_error(None, e)
+            else:
+                return redirect('bookings:booking_confirmation', reference=booking.reference)
 
     else:
         form = RoomBookingForm(initial=initial, room=room)
 
     # All available rooms for the room selector
-    available_rooms = Room.objects.filter(is_available=True)
+    available_rooms = [r async for r in Room.objects.filter(is_available=True)]
 
     context = {
         'form':            form,
         'room':            room,
         'available_rooms': available_rooms,
     }
-    return render(request, 'bookings/book_room.html', context)
+    return await arender(request, 'bookings/book_room.html', context)
 
 
-def booking_confirmation(request, reference):
-    booking = get_object_or_404(RoomBooking, reference=reference)
-    return render(request, 'bookings/booking_confirmation.html', {'booking': booking})
+async def booking_confirmation(request, reference):
+    booking = await aget_object_or_404(
+        RoomBooking.objects.select_related('room'), reference=reference
+    )
+    return await arender(request, 'bookings/booking_confirmation.html', {'booking': booking})
 
 
-def book_table(request):
+async def book_table(request):
     initial = {}
     if request.GET.get('date'):
         initial['date'] = request.GET.get('date')
@@ -67,31 +106,95 @@ def book_table(request):
     if request.method == 'POST':
         form = TableBookingForm(request.POST)
 
-        if form.is_valid():
-            booking = form.save()
-
+        if await sync_to_async(form.is_valid)():
+            # Re-checks seats under the (date, time slot) lock
             try:
-                send_table_confirmation(booking)
-            except Exception:
-                pass
-
-            return redirect(
-                'bookings:table_confirmation',
-                reference=booking.reference
-            )
+                booking = await sync_to_async(place_table_booking)(
+                    form.save(commit=False), on_placed=_queue_email(send_table_confirmation)
+                )
+            except ValidationError as e:
+                form.add_error(None, e)
+            else:
+                return redirect(
+                    'bookings:table_confirmation',
+                    reference=booking.reference
+                )
     else:
         form = TableBookingForm(initial=initial)
 
     context = {
         'form': form,
     }
-    return render(request, 'bookings/book_table.html', context)
+    return await arender(request, 'bookings/book_table.html', context)
 
 
-def table_confirmation(request, reference):
-    booking = get_object_or_404(TableBooking, reference=reference)
-    return render(
+async def table_confirmation(request, reference):
+    booking = await aget_object_or_404(TableBooking.objects.all(), reference=reference)
+    return await arender(
         request,
         'bookings/table_confirmation.html',
         {'booking': booking}
-    )
\ No newline at end of file
+    )
+
+
+@require_GET
+def table_availability(request):
+    """JSON: remaining seats per time slot for ?date=YYYY-MM-DD."""
+    try:
+        day = parse_date(request.GET.get('date', ''))
+    except ValueError:
+        day = None
+    if not day:
+        return JsonResponse({'error': 'A valid ?date=YYYY-MM-DD is required.'}, status=400)
+
+    return JsonResponse(table_slot_availability(day))
+
+
+def _calendar_params(request):
+    """
+    Parses ?start=YYYY-MM&months=N&room=ID for the room calendar.
+    Returns (start, months, room_id) or None if invalid.
+    """
+    today = timezone.now().date()
+    try:
+        start = parse_date(request.GET.get('start', today.strftime('%Y-%m')) + '-01')
+        months = int(request.GET.get('months', 1))
+        room_id = int(request.GET['room']) if request.GET.get('room') else None
+    except ValueError:
+        return None
+    if not start or not 1 <= months <= ROOM_CALENDAR_MAX_MONTHS:
+        return None
+    # The window must end inside the calendar (9999-12 + 1 month does not)
+    try:
+        add_months(start, months)
+    except ValueError:
+        return None
+    return start, months, room_id
+
+
+def _calendar_etag(request):
+    params = _calendar_params(request)
+    if params is None:
+        return None
+    start, months, room_id = params
+    return f'{room_calendar_version()}-{room_id or "all"}-{start:%Y%m}-{months}'
+
+
+@require_GET
+@condition(etag_func=_calendar_etag)
+def room_calendar(request):
+    """
+    JSON: booked nights per room for up to 12 months, run-length
+    encoded. Supports If-None-Match; the ETag changes whenever any
+    room booking does.
+    """
+    params = _calendar_params(request)
+    if params is None:
+        return JsonResponse(
+            {'error': f'Use ?start=YYYY-MM&months=1..{ROOM_CALENDAR_MAX_MONTHS}&room=ID.'},
+            status=400,
+        )
+
+    response = JsonResponse(booked_night_runs(*params))
+    patch_cache_control(response, public=True, max_age=60)
+    return response
@@ -0,0 +1,182 @@
+import hashlib
+import re
+import time
+from calendar import timegm
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.utils.translation import get_language
+
+
+def cache_version(name):
+    """
+    Version stamp for a family of cached entries. Include it in cache
+    keys; bump_cache_version() then retires every entry at once, in
+    every worker — which is why CACHES must be a shared backend (see
+    settings). Seeded from the clock so a cache flush or eviction
+    never reuses an old version number.
+    """
+    return cache.get_or_set(f'version:{name}', time.time_ns, None)
+
+
+def bump_cache_version(name):
+    try:
+        cache.incr(f'version:{name}')
+    except ValueError:
+        cache.set(f'version:{name}', time.time_ns(), None)
+
+
+# ══════════════════════════════════════════════════════════════
+#   FULL-PAGE CACHE (anonymous visitors)
+# ══════════════════════════════════════════════════════════════
+
+PAGE_CACHE_TIMEOUT = 60 * 60   # invalidated through the versions; this is a backstop
+
+# Every page carries CSRF tokens (language switcher). They are cut out
+# before storing and a token for the current visitor is punched back in.
+CSRF_PLACEHOLDER = b'__csrf_token__'
+CSRF_INPUT       = re.compile(rb'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+
+
+def _page_lookup(request, versions):
+    """
+    Returns (key, entry). key is None when the request must bypass
+    the cache: non-GET, logged-in users, or flash messages pending.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return None, None
+    if request.user.is_authenticated or len(get_messages(request)):
+        return None, None
+
+    stamp = ':'.join(str(cache_version(name)) for name in versions)
+    path  = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    key   = f'page:{get_language()}:{stamp}:{path}'
+    return key, cache.get(key)
+
+
+def _page_store(key, response, timeout):
+    if key is None or response.status_code != 200 or response.streaming or response.cookies:
+        return
+    cache.set(key, {
+        'content':      CSRF_INPUT.sub(rb'\1' + CSRF_PLACEHOLDER + rb'\2', response.content),
+        'content_type': response['Content-Type'],
+    }, timeout)
+
+
+def _page_response(request, entry):
+    token = get_token(request).encode()
+    return HttpResponse(
+        entry['content'].replace(CSRF_PLACEHOLDER, token),
+        content_type=entry['content_type'],
+    )
+
+
+def cache_public_page(*versions, timeout=PAGE_CACHE_TIMEOUT):
+    """
+    Caches a public page per language and full path (query string
+    included) for anonymous visitors. `versions` name the
+    cache_version() families the page depends on; bumping any of them
+    retires the page. Works on sync and async views.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def wrapper(request, *args, **kwargs):
+                key, entry = await sync_to_async(_page_lookup)(request, versions)
+                if entry is not None:
+                    return _page_response(request, entry)
+                response = await view(request, *args, **kwargs)
+                await sync_to_async(_page_store)(key, response, timeout)
+                return response
+        else:
+            @wraps(view)
+            def wrapper(request, *args, **kwargs):
+                key, entry = _page_lookup(request, versions)
+                if entry is not None:
+                    return _page_response(request, entry)
+                response = view(request, *args, **kwargs)
+                _page_store(key, response, timeout)
+                return response
+        return wrapper
+    return decorator
+
+
+# ══════════════════════════════════════════════════════════════
+#   CONDITIONAL GET (ETag / Last-Modified)
+# ══════════════════════════════════════════════════════════════
+
+def _conditional_check(request, validators, args, kwargs):
+    """
+    Returns (response, etag, last_modified). response is a 304/412
+    when the client's copy is still current, else None.
+    """
+    if request.method not in ('GET', 'HEAD') or len(get_messages(request)):
+        return None, None, None
+
+    etag, last_modified = validators(request, *args, **kwargs)
+    # The page also differs by language and by who is logged in
+    if etag:
+        viewer = request.user.pk if request.user.is_authenticated else 'anon'
+        etag   = quote_etag(f'{get_language()}-{viewer}-{etag}')
+    timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    return response, etag, timestamp
+
+
+def _conditional_headers(request, response, etag, timestamp):
+    if request.method not in ('GET', 'HEAD') or response.status_code not in (200, 304):
+        return response
+    if etag and not response.has_header('ETag'):
+        response.headers['ETag'] = etag
+    if timestamp and not response.has_header('Last-Modified'):
+        response.headers['Last-Modified'] = http_date(timestamp)
+    return response
+
+
+def version_validators(*names):
+    """
+    conditional_page() validators for pages that depend only on the
+    cache_version() families in `names`: the ETag is their stamps, so
+    a warm request costs no queries when CACHES is Redis (with the
+    DatabaseCache fallback each stamp is one query). Stamps count
+    bumps rather than time, so no Last-Modified is sent.
+    """
+    def validators(request, *args, **kwargs):
+        return '-'.join(str(cache_version(name)) for name in names), None
+    return validators
+
+
+def conditional_page(validators):
+    """
+    django.views.decorators.http.condition for pages that may be
+    async. validators(request, *args, **kwargs) returns
+    (etag, last_modified) from a cheap query; a match answers 304
+    before the view (and its template) runs.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def wrapper(request, *args, **kwargs):
+                response, etag, timestamp = await sync_to_async(_conditional_check)(
+                    request, validators, args, kwargs
+                )
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return _conditional_headers(request, response, etag, timestamp)
+        else:
+            @wraps(view)
+            def wrapper(request, *args, **kwargs):
+                response, etag, timestamp = _conditional_check(
+                    request, validators, args, kwargs
+                )
+                if response is None:
+                    response = view(request, *args, **kwargs)
+                return _conditional_headers(request, response, etag, timestamp)
+        return wrapper
+    return decorator
@@ -0,0 +1,118 @@
+import json
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+from rooms.models import RoomImage
+from restaurant.models import MenuItem
+
+
+GALLERY_PAGE_SIZE = 12
+
+
+# ══════════════════════════════════════════════════════════════
+#   KEYSET PAGINATION
+# ══════════════════════════════════════════════════════════════
+
+def encode_cursor(item, keys):
+    """Opaque cursor holding the sort-key values of the last row shown."""
+    values = [getattr(item, key) for key in keys]
+    return urlsafe_base64_encode(json.dumps(values, cls=DjangoJSONEncoder).encode())
+
+
+def decode_cursor(cursor, keys, model):
+    """
+    {key: value} from encode_cursor(), or None if it is malformed.
+    Each value is coerced by its model field, so a tampered cursor
+    ("x", null, {} or an out-of-range id) is rejected here rather
+    than failing in the query.
+    """
+    try:
+        values = json.loads(urlsafe_base64_decode(cursor))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or len(values) != len(keys):
+        return None
+
+    anchor = {}
+    for key, value in zip(keys, values):
+        field = model._meta.pk if key == 'pk' else model._meta.get_field(key)
+        try:
+            value = field.to_python(value)
+            field.run_validators(value)
+        except (ValidationError, TypeError):
+            return None
+        if value is None:
+            return None
+        anchor[key] = value
+    return anchor
+
+
+def _after(keys, anchor):
+    """
+    Rows strictly after `anchor` in (keys...) order, as one Q:
+    k1 > a1  OR  (k1 = a1 AND k2 > a2)  OR  ...
+    """
+    condition = Q()
+    for i, key in enumerate(keys):
+        equal = {k: anchor[k] for k in keys[:i]}
+        condition |= Q(**equal, **{f'{key}__gt': anchor[key]})
+    return condition
+
+
+def keyset_page(queryset, keys, after=None, size=GALLERY_PAGE_SIZE):
+    """
+    One page of `queryset` ordered by `keys` (model attributes, the
+    last one 'pk'), starting after the cursor `after`. The cursor
+    carries the key values, so there is no anchor lookup and a
+    deleted anchor row does not end the scroll. Cost depends on the
+    page size only — no OFFSET, no COUNT.
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    """
+    queryset = queryset.order_by(*keys)
+    if after:
+        anchor = decode_cursor(after, keys, queryset.model)
+        if anchor is None:
+            return [], None
+        queryset = queryset.filter(_after(keys, anchor))
+
+    items = list(queryset[:size + 1])
+    if len(items) > size:
+        return items[:size], encode_cursor(items[size - 1], keys)
+    return items, None
+
+
+# ══════════════════════════════════════════════════════════════
+#   GALLERY SECTIONS (slugs match the page's filter tabs)
+# ══════════════════════════════════════════════════════════════
+
+def room_images():
+    return RoomImage.objects.select_related('room').filter(room__is_available=True)
+
+
+def food_images():
+    return MenuItem.objects.filter(
+        is_available=True,
+        photo__isnull=False,
+    ).exclude(photo='')
+
+
+GALLERY_SECTIONS = {
+    'rooms': {
+        'queryset': room_images,
+        # Grouped by room; sorts on RoomImage's own (room, order, id) index
+        'keys':     ('room_id', 'order', 'pk'),
+        'template': 'core/gallery_room_items.html',
+    },
+    'restaurant': {
+        'queryset': food_images,
+        'keys':     ('category', 'order', 'pk'),   # MenuItem's gallery index
+        'template': 'core/gallery_food_items.html',
+    },
+}
+
+
+def gallery_page(section, after=None):
+    """Returns (items, next_cursor) for one gallery section."""
+    config = GALLERY_SECTIONS[section]
+    return keyset_page(config['queryset'](), config['keys'], after)
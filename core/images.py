@@ -0,0 +1,185 @@
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+
+# Derivative widths (px). Widths narrower than the upload are made,
+# plus one at the upload's own width capped at THUMBNAIL_MAX_WIDTH.
+THUMBNAIL_WIDTHS    = (320, 640, 1280)
+THUMBNAIL_MAX_WIDTH = 1920
+THUMBNAIL_FORMATS   = {
+    'webp': ('WEBP', 'webp'),
+    'jpeg': ('JPEG', 'jpg'),
+}
+THUMBNAIL_QUALITY   = 80
+THUMBNAIL_WORKERS   = 2
+
+
+# ══════════════════════════════════════════════════════════════
+#   GENERATION
+# ══════════════════════════════════════════════════════════════
+
+def thumbnail_name(source_name, width, fmt):
+    """rooms/a.jpg → rooms/thumbs/a-640w.webp"""
+    folder, filename = posixpath.split(source_name)
+    stem = posixpath.splitext(filename)[0]
+    ext  = THUMBNAIL_FORMATS[fmt][1]
+    return posixpath.join(folder, 'thumbs', f'{stem}-{width}w.{ext}')
+
+
+def generate_thumbnails(field_file):
+    """
+    Writes every derivative of an uploaded image next to it and
+    returns the value stored in the model's `thumbnails` field:
+    {'source': name, 'webp': [[width, name], ...], 'jpeg': [...]}
+    """
+    storage = field_file.storage
+    with field_file.open('rb') as f:
+        original = ImageOps.exif_transpose(Image.open(f))
+        original.load()
+    if original.mode not in ('RGB', 'L'):
+        original = original.convert('RGB')
+
+    data = {'source': field_file.name}
+    for fmt in THUMBNAIL_FORMATS:
+        data[fmt] = []
+
+    widths = [w for w in THUMBNAIL_WIDTHS if w < original.width]
+    widths.append(min(original.width, THUMBNAIL_MAX_WIDTH))
+
+    for width in widths:
+        height  = round(original.height * width / original.width)
+        resized = original.resize((width, height), Image.LANCZOS)
+        for fmt, (pil_format, _ext) in THUMBNAIL_FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, pil_format, quality=THUMBNAIL_QUALITY, optimize=True)
+            name = thumbnail_name(field_file.name, width, fmt)
+            if storage.exists(name):
+                storage.delete(name)
+            name = storage.save(name, ContentFile(buffer.getvalue()))
+            data[fmt].append([width, name])
+    return data
+
+
+def build_thumbnails(model, pk, field_name, on_done=None):
+    """
+    Generates and records the derivatives for one row. Skips the
+    write if the image was replaced meanwhile; on_done() runs after
+    a successful write. Returns True if the row was updated.
+    """
+    try:
+        instance   = model.objects.filter(pk=pk).first()
+        field_file = getattr(instance, field_name, None)
+        if not field_file:
+            return False
+        data    = generate_thumbnails(field_file)
+        updated = model.objects.filter(
+            pk=pk, **{field_name: field_file.name}
+        ).update(thumbnails=data)
+        if updated and on_done is not None:
+            on_done()
+        return bool(updated)
+    except Exception:
+        logger.exception('Thumbnail generation failed for %s #%s', model.__name__, pk)
+        return False
+
+
+# ══════════════════════════════════════════════════════════════
+#   BACKGROUND POOL
+# ══════════════════════════════════════════════════════════════
+
+_pool = None
+
+
+def _executor():
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(
+            max_workers=THUMBNAIL_WORKERS,
+            thread_name_prefix='thumbnails',
+        )
+    return _pool
+
+
+def _build_in_worker(*args):
+    try:
+        build_thumbnails(*args)
+    finally:
+        # Worker threads hold their own connections; don't leak them
+        connections.close_all()
+
+
+def _delete_in_worker(storage, names):
+    for name in names:
+        try:
+            storage.delete(name)
+        except Exception:
+            logger.exception('Could not delete thumbnail %s', name)
+
+
+def thumbnails_stale(field_file, thumbnails):
+    return bool(field_file) and (thumbnails or {}).get('source') != field_file.name
+
+
+def discard_thumbnails(instance, field_name):
+    """
+    Deletes the derivative files recorded on the row once the
+    surrounding transaction commits: for a deleted row, or one whose
+    image was replaced or cleared.
+    """
+    thumbnails = instance.thumbnails or {}
+    names = [name for fmt in THUMBNAIL_FORMATS for _width, name in thumbnails.get(fmt, [])]
+    if not names:
+        return
+    storage = getattr(instance, field_name).storage
+    transaction.on_commit(lambda: _executor().submit(_delete_in_worker, storage, names))
+
+
+def schedule_thumbnails(instance, field_name, on_done=None):
+    """
+    Queues derivative generation for a saved row once the surrounding
+    transaction commits, so the upload request returns immediately.
+    Derivatives of a replaced or cleared image are deleted; no-op
+    when the recorded derivatives already match the image.
+    """
+    field_file = getattr(instance, field_name)
+    source     = (instance.thumbnails or {}).get('source')
+    if source and source != field_file.name:
+        discard_thumbnails(instance, field_name)
+    if not thumbnails_stale(field_file, instance.thumbnails):
+        return
+    model, pk = type(instance), instance.pk
+    transaction.on_commit(
+        lambda: _executor().submit(_build_in_worker, model, pk, field_name, on_done)
+    )
+
+
+# ══════════════════════════════════════════════════════════════
+#   LOOKUPS (templates / admin)
+# ══════════════════════════════════════════════════════════════
+
+def thumbnail_srcset(field_file, thumbnails, fmt):
+    """srcset candidates for one format; '' while derivatives are stale."""
+    if not field_file or thumbnails_stale(field_file, thumbnails):
+        return ''
+    storage = field_file.storage
+    return ', '.join(
+        f'{storage.url(name)} {width}w' for width, name in thumbnails.get(fmt, [])
+    )
+
+
+def thumbnail_url(field_file, thumbnails, width):
+    """URL of the smallest JPEG derivative at least `width` px wide."""
+    if not field_file:
+        return ''
+    if not thumbnails_stale(field_file, thumbnails):
+        for thumb_width, name in thumbnails.get('jpeg', []):
+            if thumb_width >= width:
+                return field_file.storage.url(name)
+    return field_file.url
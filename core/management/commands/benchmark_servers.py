@@ -0,0 +1,139 @@
+import importlib.util
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+
+
+# (label, module, command line) — {workers} / {port} filled in per run
+SERVERS = [
+    ('WSGI  gunicorn sync', 'gunicorn', [
+        '-m', 'gunicorn', 'hotel_santa_filomena.wsgi:application',
+        '--workers', '{workers}', '--threads', '1', '--bind', '127.0.0.1:{port}',
+        '--log-level', 'warning',
+    ]),
+    ('ASGI  uvicorn',       'uvicorn', [
+        '-m', 'uvicorn', 'hotel_santa_filomena.asgi:application',
+        '--workers', '{workers}', '--host', '127.0.0.1', '--port', '{port}',
+        '--log-level', 'warning', '--no-access-log',
+    ]),
+]
+
+STARTUP_TIMEOUT = 30   # seconds for a server to start accepting connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks the public pages under WSGI (gunicorn, sync workers) '
+        'and ASGI (uvicorn) at the same worker count, with clients that '
+        'trickle their request in like slow mobile connections. Needs '
+        'gunicorn and uvicorn installed; they are not runtime requirements.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default='/rooms/',
+            help='Page to request (default /rooms/).',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Server worker processes, the same for both servers (default 1).',
+        )
+        parser.add_argument(
+            '--concurrency', default='1,16,64',
+            help='Comma-separated numbers of simultaneous clients (default 1,16,64).',
+        )
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Requests per concurrency level (default 200).',
+        )
+        parser.add_argument(
+            '--client-delay', type=float, default=0.05,
+            help='Seconds a client pauses halfway through its request headers (default 0.05).',
+        )
+        parser.add_argument(
+            '--uncached', action='store_true',
+            help='Add a unique query string per request so every one misses the page cache.',
+        )
+        parser.add_argument(
+            '--port', type=int, default=8765,
+        )
+
+    def handle(self, *args, **options):
+        missing = [m for _label, m, _cmd in SERVERS if importlib.util.find_spec(m) is None]
+        if missing:
+            raise CommandError(f'Install {", ".join(missing)} to run the benchmark.')
+
+        levels = [int(c) for c in options['concurrency'].split(',')]
+        self.stdout.write(
+            f"{options['path']}  workers={options['workers']}  "
+            f"requests={options['requests']}  client delay={options['client_delay'] * 1000:.0f} ms"
+            + ('  uncached' if options['uncached'] else '')
+        )
+        self.stdout.write(f"{'server':<22}{'clients':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'errors':>8}")
+
+        for label, _module, command in SERVERS:
+            server = self.start(command, options['workers'], options['port'])
+            try:
+                # Warm-up: imports, connections and the page cache
+                self.load(options['port'], options['path'], 4, 20, 0, False)
+                for clients in levels:
+                    rate, p50, p95, errors = self.load(
+                        options['port'], options['path'], clients,
+                        options['requests'], options['client_delay'], options['uncached'],
+                    )
+                    self.stdout.write(
+                        f'{label:<22}{clients:>8}{rate:>9.1f}{p50:>9.1f}{p95:>9.1f}{errors:>8}'
+                    )
+            finally:
+                server.terminate()
+                server.wait(timeout=STARTUP_TIMEOUT)
+
+    # ── Server process ──────────────────────────────────
+    def start(self, command, workers, port):
+        args   = [arg.format(workers=workers, port=port) for arg in command]
+        server = subprocess.Popen([sys.executable, *args], env=os.environ.copy())
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return server
+            except OSError:
+                time.sleep(0.2)
+        server.kill()
+        raise CommandError(f'{args[1]} did not start on port {port}.')
+
+    # ── Load generator ──────────────────────────────────
+    def load(self, port, path, clients, total, delay, uncached):
+        """Returns (requests/s, p50 ms, p95 ms, errors) for `total` requests."""
+        separator = '&' if '?' in path else '?'
+
+        def fetch(i):
+            target  = f'{path}{separator}nocache={time.time_ns()}-{i}' if uncached else path
+            started = time.perf_counter()
+            try:
+                with socket.create_connection(('127.0.0.1', port), timeout=60) as sock:
+                    sock.sendall(f'GET {target} HTTP/1.1\r\nHost: localhost\r\n'.encode())
+                    time.sleep(delay)
+                    sock.sendall(b'User-Agent: benchmark\r\nConnection: close\r\n\r\n')
+                    response = b''
+                    while chunk := sock.recv(65536):
+                        response += chunk
+                ok = response.startswith(b'HTTP/1.1 200')
+            except OSError:
+                ok = False
+            return ok, (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            results = list(pool.map(fetch, range(total)))
+        elapsed = time.perf_counter() - started
+
+        timings = sorted(ms for _ok, ms in results)
+        p95     = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        errors  = sum(1 for ok, _ms in results if not ok)
+        return total / elapsed, statistics.median(timings), p95, errors
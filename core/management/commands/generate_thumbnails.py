@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from core.cache import bump_cache_version
+from core.images import build_thumbnails, thumbnails_stale
+from restaurant.models import MenuItem
+from rooms.models import RoomImage
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates missing or outdated thumbnails for room images and menu '
+        'photos. Backfills existing uploads and recovers jobs lost on restart.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate every thumbnail, even up-to-date ones.',
+        )
+
+    def handle(self, *args, **options):
+        # (model, image field, cache_version family showing its srcset)
+        targets = [
+            (RoomImage, 'image', 'rooms'),
+            (MenuItem,  'photo', 'menu'),
+        ]
+        built  = 0
+        failed = 0
+        for model, field_name, version in targets:
+            built_before = built
+            rows = model.objects.exclude(**{field_name: ''}).exclude(
+                **{f'{field_name}__isnull': True}
+            ).only('pk', field_name, 'thumbnails')
+            for row in rows.iterator(chunk_size=200):
+                field_file = getattr(row, field_name)
+                if not options['force'] and not thumbnails_stale(field_file, row.thumbnails):
+                    continue
+                if build_thumbnails(model, row.pk, field_name):
+                    built += 1
+                else:
+                    failed += 1
+            if built > built_before:
+                bump_cache_version(version)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Thumbnails generated for {built} image(s).'
+        ))
+        if failed:
+            self.stderr.write(self.style.WARNING(
+                f'{failed} image(s) failed — see the log for details.'
+            ))
@@ -0,0 +1,20 @@
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.shortcuts import render
+
+
+async def arender(request, template_name, context=None):
+    """
+    render() for async views. Templates may still resolve lazy
+    values (request.user, related objects), so rendering runs in
+    Django's sync thread rather than on the event loop.
+    """
+    return await sync_to_async(render)(request, template_name, context)
+
+
+async def aget_object_or_404(queryset, **kwargs):
+    """Async counterpart of get_object_or_404 for a queryset."""
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
@@ -0,0 +1,21 @@
+from django import template
+from core.images import thumbnail_srcset
+
+register = template.Library()
+
+
+@register.inclusion_tag('core/responsive_image.html')
+def responsive_image(field_file, thumbnails, alt='', css_class='', sizes='100vw', lazy=False):
+    """
+    <picture> with WebP and JPEG srcsets from the generated thumbnails.
+    Until they exist it renders the plain original image.
+    """
+    return {
+        'src':         field_file.url if field_file else '',
+        'webp_srcset': thumbnail_srcset(field_file, thumbnails, 'webp'),
+        'jpeg_srcset': thumbnail_srcset(field_file, thumbnails, 'jpeg'),
+        'alt':         alt,
+        'css_class':   css_class,
+        'sizes':       sizes,
+        'lazy':        lazy,
+    }
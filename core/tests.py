@@ -1,3 +1,236 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+import threading
+from io import BytesIO, StringIO
+from unittest import mock
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils.http import urlsafe_base64_encode
+from PIL import Image
+from rooms.models import Room, RoomImage
+from .cache import bump_cache_version
+from .gallery import GALLERY_SECTIONS, gallery_page, encode_cursor
 
-# Create your tests here.
+
+def make_upload(name, size=(800, 600)):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'white').save(buffer, 'JPEG')
+    return ContentFile(buffer.getvalue(), name=name)
+
+
+class InlineExecutor:
+    """Runs each job on its own thread and waits for it to finish."""
+
+    def submit(self, fn, *args):
+        thread = threading.Thread(target=fn, args=args)
+        thread.start()
+        thread.join()
+
+
+# ══════════════════════════════════════════════════════════════
+#   THUMBNAILS
+# ══════════════════════════════════════════════════════════════
+
+class ThumbnailCleanupTests(TransactionTestCase):
+    """The workers read committed rows, so this runs in autocommit."""
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=self.media)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        executor = mock.patch('core.images._executor', return_value=InlineExecutor())
+        executor.start()
+        self.addCleanup(executor.stop)
+
+        room = Room.objects.create(name='Camera Test', room_type='doppia', price_per_night=100, capacity=2)
+        self.image = RoomImage.objects.create(room=room, image=make_upload('camera.jpg'))
+        self.image.refresh_from_db()
+        self.old = self.derivatives(self.image)
+
+    def derivatives(self, image):
+        return [name for fmt in ('webp', 'jpeg') for _width, name in image.thumbnails.get(fmt, [])]
+
+    def test_replacing_the_image_deletes_old_derivatives(self):
+        self.assertTrue(self.old)
+        self.assertTrue(all(default_storage.exists(name) for name in self.old))
+
+        self.image.image = make_upload('nuova.jpg')
+        self.image.save()
+
+        self.image.refresh_from_db()
+        self.assertFalse(any(default_storage.exists(name) for name in self.old))
+        new = self.derivatives(self.image)
+        self.assertTrue(new)
+        self.assertTrue(all(default_storage.exists(name) for name in new))
+
+    def test_deleting_the_row_deletes_its_derivatives(self):
+        self.image.delete()
+        self.assertFalse(any(default_storage.exists(name) for name in self.old))
+
+    def test_rolled_back_replacement_keeps_derivatives(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.image.image = make_upload('nuova.jpg')
+            self.image.save()
+            raise RuntimeError('rolled back')
+        self.assertTrue(all(default_storage.exists(name) for name in self.old))
+
+    def test_resave_without_change_keeps_derivatives(self):
+        self.image.caption = 'Vista mare'
+        self.image.save()
+        self.assertTrue(all(default_storage.exists(name) for name in self.old))
+
+    def test_backfill_retires_the_room_pages(self):
+        RoomImage.objects.filter(pk=self.image.pk).update(thumbnails={})
+
+        with mock.patch('core.management.commands.generate_thumbnails.bump_cache_version') as bump:
+            call_command('generate_thumbnails', stdout=StringIO())
+        bump.assert_called_once_with('rooms')
+
+        with mock.patch('core.management.commands.generate_thumbnails.bump_cache_version') as bump:
+            call_command('generate_thumbnails', stdout=StringIO())
+        bump.assert_not_called()
+
+
+# ══════════════════════════════════════════════════════════════
+#   GALLERY PAGINATION
+# ══════════════════════════════════════════════════════════════
+
+class GalleryPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for r in range(3):
+            room = Room.objects.create(
+                name=f'Camera {3 - r}', room_type='doppia', price_per_night=100, capacity=2,
+            )
+            RoomImage.objects.bulk_create([
+                RoomImage(room=room, image=f'rooms/{r}-{i}.jpg', order=i % 4) for i in range(10)
+            ])
+
+    def expected(self):
+        return list(
+            GALLERY_SECTIONS['rooms']['queryset']()
+            .order_by('room_id', 'order', 'pk').values_list('pk', flat=True)
+        )
+
+    def walk(self):
+        seen, cursor = [], None
+        while True:
+            with self.assertNumQueries(1):
+                items, cursor = gallery_page('rooms', cursor)
+            seen += [item.pk for item in items]
+            if cursor is None:
+                return seen
+
+    def test_pages_cover_every_image_once_in_order(self):
+        self.assertEqual(self.walk(), self.expected())
+
+    def test_deleted_anchor_does_not_end_the_scroll(self):
+        items, cursor = gallery_page('rooms')
+        items[-1].delete()
+        rest, _next = gallery_page('rooms', cursor)
+        self.assertEqual([item.pk for item in rest], self.expected()[len(items) - 1:][:len(rest)])
+
+    def test_malformed_cursor_returns_an_empty_page(self):
+        for cursor in ['nope', encode_cursor(RoomImage.objects.first(), ['pk'])]:
+            self.assertEqual(gallery_page('rooms', cursor), ([], None))
+
+    def test_wrongly_typed_cursor_values_return_an_empty_page(self):
+        def cursor(values):
+            return urlsafe_base64_encode(json.dumps(values).encode())
+
+        first = RoomImage.objects.order_by('room_id', 'order', 'pk').first()
+        for section, values in [
+            ('rooms',      ['x', 1, 2]),
+            ('rooms',      [None, 1, 2]),
+            ('rooms',      [{}, 1, 2]),
+            ('rooms',      [first.room_id, [], first.pk]),
+            ('rooms',      [first.room_id, 0, 2 ** 70]),
+            ('restaurant', [None, 1, 2]),
+            ('restaurant', ['antipasti', {}, 2]),
+        ]:
+            with self.subTest(section=section, values=values):
+                self.assertEqual(gallery_page(section, cursor(values)), ([], None))
+                response = self.client.get(
+                    reverse('core:gallery_items', args=[section]), {'after': cursor(values)},
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()['next'], None)
+
+    def test_numeric_strings_are_coerced(self):
+        first = RoomImage.objects.order_by('room_id', 'order', 'pk').first()
+        cursor = urlsafe_base64_encode(json.dumps(
+            [str(first.room_id), str(first.order), str(first.pk)]
+        ).encode())
+        items, _next = gallery_page('rooms', cursor)
+        self.assertEqual([item.pk for item in items], self.expected()[1:13])
+
+    def test_sort_does_not_need_the_room_join(self):
+        sql = str(
+            GALLERY_SECTIONS['rooms']['queryset']()
+            .order_by(*GALLERY_SECTIONS['rooms']['keys']).query
+        )
+        order_by = sql.split('ORDER BY')[1]
+        self.assertNotIn('"rooms_room".', order_by)
+
+
+# ══════════════════════════════════════════════════════════════
+#   PUBLIC PAGE CACHE
+# ══════════════════════════════════════════════════════════════
+
+class PublicPageCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.room = Room.objects.create(
+            name='Camera Rosa', room_type='doppia', price_per_night=100, capacity=2,
+            is_featured=True,
+        )
+        self.url = reverse('core:home')
+
+    def rename(self, name):
+        self.room.name = name
+        self.room.save()
+
+    def test_repeat_visit_is_served_from_the_cache(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertContains(response, 'Camera Rosa')
+        self.assertContains(response, 'csrfmiddlewaretoken')
+
+    def test_edit_retires_the_page_after_commit(self):
+        self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.rename('Camera Blu')
+            # Uncommitted: the page must not be re-cached from the old rows
+            self.assertContains(self.client.get(self.url), 'Camera Rosa')
+
+        for callback in callbacks:
+            callback()
+        self.assertContains(self.client.get(self.url), 'Camera Blu')
+
+    def test_bump_from_another_worker_retires_the_page(self):
+        self.client.get(self.url)
+        Room.objects.filter(pk=self.room.pk).update(name='Camera Verde')
+        # Another process edited the room; versions live in the shared cache
+        bump_cache_version('rooms')
+        self.assertContains(self.client.get(self.url), 'Camera Verde')
+
+    def test_room_page_answers_304_until_the_room_changes(self):
+        url   = reverse('rooms:room_detail', args=[self.room.pk])
+        etag  = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rename('Camera Blu')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
@@ -4,6 +4,7 @@ from . import views
 app_name = 'core'
 
 urlpatterns = [
-    path('',         views.home,    name='home'),
-    path('gallery/', views.gallery, name='gallery'),
+    path('',                          views.home,          name='home'),
+    path('gallery/',                  views.gallery,       name='gallery'),
+    path('gallery/<slug:section>/',   views.gallery_items, name='gallery_items'),
 ]
\ No newline at end of file
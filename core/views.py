@@ -1,8 +1,14 @@
+from django.http import Http404, JsonResponse
 from django.shortcuts import render
-from rooms.models import Room, RoomImage
-from restaurant.models import MenuItem
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.views.decorators.http import require_GET
+from rooms.models import Room
+from .cache import cache_public_page
+from .gallery import GALLERY_SECTIONS, gallery_page
 
 
+@cache_public_page('rooms')
 def home(request):
     featured_rooms = Room.objects.filter(
         is_available=True, is_featured=True
@@ -10,24 +16,44 @@ def home(request):
     return render(request, 'core/home.html', {'featured_rooms': featured_rooms})
 
 
-def gallery(request):
-    # All room images grouped by room
-    room_images = RoomImage.objects.select_related('room').filter(
-        room__is_available=True
-    ).order_by('room__name', 'order')
+def _next_page_url(section, cursor):
+    if cursor is None:
+        return None
+    return f"{reverse('core:gallery_items', args=[section])}?after={cursor}"
+
 
-    # Featured menu photos
-    food_images = MenuItem.objects.filter(
-        is_available=True,
-        photo__isnull=False
-    ).exclude(photo='').order_by('category', 'order')[:12]
+@cache_public_page('rooms', 'menu')
+def gallery(request):
+    # First screenful of each section; the rest loads on scroll
+    room_images, room_next = gallery_page('rooms')
+    food_images, food_next = gallery_page('restaurant')
 
     # Active filter from query param
     active_filter = request.GET.get('filter', 'all')
 
     context = {
-        'room_images':   room_images,
-        'food_images':   food_images,
-        'active_filter': active_filter,
+        'room_images':    room_images,
+        'room_count':     GALLERY_SECTIONS['rooms']['queryset']().count(),
+        'room_next_url':  _next_page_url('rooms', room_next),
+        'food_images':    food_images,
+        'food_count':     GALLERY_SECTIONS['restaurant']['queryset']().count(),
+        'food_next_url':  _next_page_url('restaurant', food_next),
+        'active_filter':  active_filter,
     }
-    return render(request, 'core/gallery.html', context)
\ No newline at end of file
+    return render(request, 'core/gallery.html', context)
+
+
+@require_GET
+@cache_public_page('rooms', 'menu')
+def gallery_items(request, section):
+    """
+    Next page of one gallery section for infinite scroll:
+    {"html": "<rendered items>", "next": "<url>" | null}
+    """
+    if section not in GALLERY_SECTIONS:
+        raise Http404
+    items, cursor = gallery_page(section, request.GET.get('after') or None)
+    html = render_to_string(
+        GALLERY_SECTIONS[section]['template'], {'items': items}, request=request
+    )
+    return JsonResponse({'html': html, 'next': _next_page_url(section, cursor)})
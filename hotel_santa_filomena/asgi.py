@@ -3,6 +3,14 @@ ASGI config for hotel_santa_filomena project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve the site through this entry point, e.g.
+
+    uvicorn hotel_santa_filomena.asgi:application --workers 2
+
+The admin dashboard's event stream is an async view: under ASGI an
+open stream costs a coroutine, under WSGI it would hold a worker
+thread for its whole lifetime.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
@@ -35,6 +35,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     # Third-party
     'crispy_forms',
     'crispy_tailwind',
@@ -71,11 +72,14 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'restaurant.context_processors.restaurant_settings',
             ],
         },
     },
 ]
 
+# Deploy with the ASGI entry point (asgi.py, e.g. uvicorn): the dashboard
+# event stream is async. WSGI stays for runserver and tooling.
 WSGI_APPLICATION = 'hotel_santa_filomena.wsgi.application'
 
 DATABASES = {
@@ -109,6 +113,33 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL  = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# ── Cache ─────────────────────────────────────────────────
+# Must be shared by every worker: the cache versions in core.cache
+# retire menu, page, calendar and settings entries in all processes
+# at once. Redis when REDIS_URL is set, otherwise the database
+# (create the table once with `manage.py createcachetable`).
+# Production wants Redis: warm public pages and their ETag checks
+# read only these versions, which is free in Redis but one query
+# per version with the database cache.
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND':  'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND':  'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'django_cache',
+            # Culling could evict the version stamps along with pages
+            'OPTIONS':  {'MAX_ENTRIES': 20000},
+        }
+    }
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 CRISPY_ALLOWED_TEMPLATE_PACKS = 'tailwind'
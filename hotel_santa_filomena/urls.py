@@ -3,7 +3,10 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.urls import path, include
 from django.conf.urls.i18n import i18n_patterns
-from bookings.admin_views import admin_dashboard
+from bookings.admin_views import (
+    admin_dashboard, admin_dashboard_events,
+    admin_reports, admin_range_report,
+)
 
 admin.site.site_header = 'Hotel Santa Filomena'
 admin.site.site_title  = 'Santa Filomena Admin'
@@ -13,6 +16,9 @@ urlpatterns = [
     path('i18n/', include('django.conf.urls.i18n')),
     # Admin dashboard — must come before admin/ 
     path('admin/dashboard/', admin_dashboard, name='admin_dashboard'),
+    path('admin/dashboard/events/', admin_dashboard_events, name='admin_dashboard_events'),
+    path('admin/reports/', admin_reports, name='admin_reports'),
+    path('admin/reports/range/', admin_range_report, name='admin_range_report'),
 ]
 
 urlpatterns += i18n_patterns(
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
 from django.utils.html import format_html
+from core.images import thumbnail_url
 from .models import MenuItem, MenuCategory, RestaurantSettings
 
 @admin.register(MenuItem)
@@ -70,7 +71,7 @@ class MenuItemAdmin(admin.ModelAdmin):
             return format_html(
                 '<img src="{}" style="height:55px; width:75px; '
                 'object-fit:cover; border-radius:4px;" />',
-                obj.photo.url
+                thumbnail_url(obj.photo, obj.thumbnails, 320)
             )
         return '—'
     photo_preview.short_description = _('Photo')
@@ -81,7 +82,7 @@ class MenuItemAdmin(admin.ModelAdmin):
             return format_html(
                 '<img src="{}" style="max-height:200px; '
                 'border-radius:6px; margin-top:8px;" />',
-                obj.photo.url
+                thumbnail_url(obj.photo, obj.thumbnails, 640)
             )
         return _('No photo uploaded yet')
     photo_preview_detail.short_description = _('Preview')
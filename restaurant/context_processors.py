@@ -0,0 +1,11 @@
+from django.utils.functional import SimpleLazyObject
+from .models import RestaurantSettings
+
+
+def restaurant_settings(request):
+    """
+    Exposes opening hours / closed days to every template as
+    `restaurant_settings`. Lazy and cached, so pages that don't use
+    it pay nothing and pages that do pay no query.
+    """
+    return {'restaurant_settings': SimpleLazyObject(RestaurantSettings.get)}
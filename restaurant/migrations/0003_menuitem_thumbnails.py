@@ -0,0 +1,18 @@
+# Generated by Django 5.0.4 on 2026-10-18 08:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0002_restaurantsettings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='menuitem',
+            name='thumbnails',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Thumbnails'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.4 on 2026-10-18 08:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0003_menuitem_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurantsettings',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
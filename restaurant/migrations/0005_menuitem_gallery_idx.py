@@ -0,0 +1,17 @@
+# Generated by Django 5.0.4 on 2026-10-18 09:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0004_restaurantsettings_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='menuitem',
+            index=models.Index(fields=['category', 'order', 'id'], name='rs_menu_gallery_idx'),
+        ),
+    ]
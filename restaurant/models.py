@@ -1,5 +1,6 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
+from core.cache import cache_version
 
 
 class MenuCategory(models.TextChoices):
@@ -44,6 +45,13 @@ class MenuItem(models.Model):
         null=True,
         blank=True
     )
+    # Resized WebP/JPEG derivatives, written by core.images
+    thumbnails = models.JSONField(
+        _('Thumbnails'),
+        default=dict,
+        blank=True,
+        editable=False
+    )
 
     # ── Dietary flags ───────────────────────────────────
     is_vegetarian  = models.BooleanField(_('Vegetarian'),    default=False)
@@ -76,6 +84,10 @@ class MenuItem(models.Model):
         verbose_name        = _('Menu Item')
         verbose_name_plural = _('Menu Items')
         ordering            = ['category', 'order', 'name']
+        indexes = [
+            # Gallery keyset pagination: ordered by (category, order, id)
+            models.Index(fields=['category', 'order', 'id'], name='rs_menu_gallery_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.get_category_display()}) — €{self.price}"
@@ -131,6 +143,9 @@ class RestaurantSettings(models.Model):
         help_text=_('Optional note shown under hours, e.g. "Closed in August"')
     )
 
+    # ── Timestamps ──────────────────────────────────────
+    updated_at = models.DateTimeField(auto_now=True)
+
     class Meta:
         verbose_name        = _('Restaurant Settings')
         verbose_name_plural = _('Restaurant Settings')
@@ -138,29 +153,58 @@ class RestaurantSettings(models.Model):
     def __str__(self):
         return 'Restaurant Settings'
 
+    # Process-local copy as (version, row); see get()
+    _cached = None
+
     # ── Singleton: always return the same row ─────────────
     @classmethod
     def get(cls):
-        obj, _ = cls.objects.get_or_create(pk=1)
+        """
+        Returns the settings row, cached in-process. The shared
+        'restaurant-settings' version is bumped on save, so every
+        worker re-reads the row once after an edit. Treat the result
+        as read-only — it is shared between requests.
+        """
+        version = cache_version('restaurant-settings')
+        cached  = cls._cached
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        obj, _created = cls.objects.get_or_create(pk=1)
+        cls._cached = (version, obj)
         return obj
 
+    # Closed-day flags in Python weekday() order (Monday = 0)
+    CLOSED_DAY_FIELDS = [
+        ('closed_monday',    _('Monday')),
+        ('closed_tuesday',   _('Tuesday')),
+        ('closed_wednesday', _('Wednesday')),
+        ('closed_thursday',  _('Thursday')),
+        ('closed_friday',    _('Friday')),
+        ('closed_saturday',  _('Saturday')),
+        ('closed_sunday',    _('Sunday')),
+    ]
+
     # ── Helper: list of closed day names ─────────────────
     def closed_days(self):
         days = []
-        mapping = [
-            ('closed_monday',    _('Monday')),
-            ('closed_tuesday',   _('Tuesday')),
-            ('closed_wednesday', _('Wednesday')),
-            ('closed_thursday',  _('Thursday')),
-            ('closed_friday',    _('Friday')),
-            ('closed_saturday',  _('Saturday')),
-            ('closed_sunday',    _('Sunday')),
-        ]
-        for field, label in mapping:
+        for field, label in self.CLOSED_DAY_FIELDS:
             if getattr(self, field):
                 days.append(str(label))
         return days
 
+    # ── Helper: is the restaurant closed on a given date ─
+    def is_closed_on(self, date):
+        field, _label = self.CLOSED_DAY_FIELDS[date.weekday()]
+        return getattr(self, field)
+
+    # ── Helper: closed weekdays as numbers (Monday = 0) ──
+    def closed_weekdays(self):
+        return [
+            weekday
+            for weekday, (field, _label) in enumerate(self.CLOSED_DAY_FIELDS)
+            if getattr(self, field)
+        ]
+
     # ── Helper: format time as HH:MM ─────────────────────
     def fmt(self, t):
         return t.strftime('%H:%M') if t else ''
\ No newline at end of file
@@ -0,0 +1,32 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.cache import bump_cache_version
+from core.images import schedule_thumbnails, discard_thumbnails
+from .models import MenuItem, RestaurantSettings
+
+
+@receiver([post_save, post_delete], sender=MenuItem)
+def menu_changed(sender, **kwargs):
+    transaction.on_commit(lambda: bump_cache_version('menu'))
+
+
+@receiver([post_save, post_delete], sender=RestaurantSettings)
+def settings_changed(sender, **kwargs):
+    # After commit: a worker re-reading the row on the new version
+    # must find the edit. The menu page shows opening hours too.
+    def bump():
+        bump_cache_version('restaurant-settings')
+        bump_cache_version('menu')
+    transaction.on_commit(bump)
+
+
+@receiver(post_save, sender=MenuItem)
+def menu_item_saved(sender, instance, **kwargs):
+    # The cached menu fragment picks up the srcset once they exist
+    schedule_thumbnails(instance, 'photo', on_done=lambda: bump_cache_version('menu'))
+
+
+@receiver(post_delete, sender=MenuItem)
+def menu_item_deleted(sender, instance, **kwargs):
+    discard_thumbnails(instance, 'photo')
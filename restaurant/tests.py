@@ -1,3 +1,81 @@
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from core.cache import bump_cache_version
+from .models import MenuItem, RestaurantSettings
 
-# Create your tests here.
+
+# ══════════════════════════════════════════════════════════════
+#   SETTINGS CACHE
+# ══════════════════════════════════════════════════════════════
+
+class RestaurantSettingsCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        RestaurantSettings._cached = None
+        RestaurantSettings.objects.update_or_create(pk=1, defaults={'lunch_enabled': True})
+
+    def test_cached_row_serves_without_queries(self):
+        RestaurantSettings.get()
+        with self.assertNumQueries(0):
+            self.assertTrue(RestaurantSettings.get().lunch_enabled)
+
+    def test_edit_is_picked_up_after_commit(self):
+        RestaurantSettings.get()
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            settings = RestaurantSettings.objects.get(pk=1)
+            settings.lunch_enabled = False
+            settings.save()
+            # Not committed yet: the version must not move
+            self.assertTrue(RestaurantSettings.get().lunch_enabled)
+
+        for callback in callbacks:
+            callback()
+        self.assertFalse(RestaurantSettings.get().lunch_enabled)
+
+    def test_bump_from_another_worker_retires_the_copy(self):
+        RestaurantSettings.get()
+        # Another process edited the row; the version lives in the shared cache
+        RestaurantSettings.objects.filter(pk=1).update(lunch_enabled=False)
+        bump_cache_version('restaurant-settings')
+
+        self.assertFalse(RestaurantSettings.get().lunch_enabled)
+
+
+# ══════════════════════════════════════════════════════════════
+#   MENU PAGE
+# ══════════════════════════════════════════════════════════════
+
+class MenuPageCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        RestaurantSettings.objects.get_or_create(pk=1)
+        RestaurantSettings._cached = None
+        self.item = MenuItem.objects.create(name='Risotto', price=14)
+        self.url  = reverse('restaurant:menu')
+
+    def test_warm_anonymous_visit_costs_no_queries(self):
+        # Holds because the test cache, like Redis, answers cache_version()
+        # without the database; the DatabaseCache fallback would not
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertContains(response, 'Risotto')
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_menu_edit_moves_the_etag_after_commit(self):
+        etag = self.client.get(self.url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.item.name = 'Risotto ai funghi'
+            self.item.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Risotto ai funghi')
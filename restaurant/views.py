@@ -1,28 +1,58 @@
-from django.shortcuts import render
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.translation import get_language
+from core.cache import cache_public_page, cache_version, conditional_page, version_validators
+from core.shortcuts import arender
 from .models import MenuItem, MenuCategory, RestaurantSettings
 
 
-def menu(request):
-    items = MenuItem.objects.filter(is_available=True)
+MENU_CACHE_TIMEOUT = 60 * 60 * 24   # invalidated on save; this is a backstop
 
-    menu_sections = []
-    for value, label in MenuCategory.choices:
-        section_items = items.filter(category=value).order_by('order', 'name')
-        if section_items.exists():
-            menu_sections.append({
-                'category': value,
-                'label':    label,
-                'items':    section_items,
-            })
 
-    featured_items  = items.filter(is_featured=True)[:4]
-    signature_items = items.filter(is_signature=True)[:3]
-    settings        = RestaurantSettings.get()
+def _build_menu_context():
+    """
+    Everything the menu fragment needs, from a single MenuItem query
+    (plus the RestaurantSettings row) grouped in Python.
+    """
+    items = list(
+        MenuItem.objects.filter(is_available=True).order_by('category', 'order', 'name')
+    )
 
-    context = {
+    by_category = {}
+    for item in items:
+        by_category.setdefault(item.category, []).append(item)
+
+    menu_sections = [
+        {
+            'category': value,
+            'label':    label,
+            'items':    by_category[value],
+        }
+        for value, label in MenuCategory.choices
+        if value in by_category
+    ]
+
+    return {
         'menu_sections':   menu_sections,
-        'featured_items':  featured_items,
-        'signature_items': signature_items,
-        'rs':              settings,      
+        'featured_items':  [item for item in items if item.is_featured][:4],
+        'signature_items': [item for item in items if item.is_signature][:3],
+        'rs':              RestaurantSettings.get(),
     }
-    return render(request, 'restaurant/menu.html', context)
\ No newline at end of file
+
+
+def _render_menu_content():
+    return render_to_string('restaurant/menu_content.html', _build_menu_context())
+
+
+@conditional_page(version_validators('menu'))
+@cache_public_page('menu')
+async def menu(request):
+    # Rendered fragment per language; steady state costs no queries
+    key     = f'restaurant:menu:{get_language()}:{cache_version("menu")}'
+    content = await cache.aget(key)
+    if content is None:
+        content = await sync_to_async(_render_menu_content)()
+        await cache.aset(key, content, MENU_CACHE_TIMEOUT)
+
+    return await arender(request, 'restaurant/menu.html', {'menu_content': content})
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
 from django.utils.html import format_html
+from core.images import thumbnail_url
 from .models import Room, RoomImage
 
 
@@ -18,7 +19,7 @@ class RoomImageInline(admin.TabularInline):
         if obj.image:
             return format_html(
                 '<img src="{}" style="height:80px; border-radius:4px;" />',
-                obj.image.url
+                thumbnail_url(obj.image, obj.thumbnails, 320)
             )
         return _('No image yet')
     image_preview.short_description = _('Preview')
@@ -82,13 +83,17 @@ class RoomAdmin(admin.ModelAdmin):
 
     inlines = [RoomImageInline]
 
+    def get_queryset(self, request):
+        # main_image_preview reads from the prefetched images
+        return super().get_queryset(request).prefetch_related('images')
+
     # ── Custom column: image thumbnail in list view ─────
     def main_image_preview(self, obj):
         img = obj.get_main_image()
         if img:
             return format_html(
                 '<img src="{}" style="height:50px; border-radius:4px;" />',
-                img.image.url
+                thumbnail_url(img.image, img.thumbnails, 320)
             )
         return _('No image')
     main_image_preview.short_description = _('Image')
@@ -104,7 +109,7 @@ class RoomImageAdmin(admin.ModelAdmin):
         if obj.image:
             return format_html(
                 '<img src="{}" style="height:60px; border-radius:4px;" />',
-                obj.image.url
+                thumbnail_url(obj.image, obj.thumbnails, 320)
             )
         return _('No image')
     image_preview.short_description = _('Preview')
\ No newline at end of file
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class RoomsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'rooms'
\ No newline at end of file
+    name = 'rooms'
+
+    def ready(self):
+        from . import signals  # noqa: F401
\ No newline at end of file
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.4 on 2026-10-18 09:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0002_roomimage_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='roomimage',
+            index=models.Index(fields=['room', 'order', 'id'], name='rm_image_gallery_idx'),
+        ),
+    ]
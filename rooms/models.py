@@ -96,8 +96,14 @@ class Room(models.Model):
         return f"{self.name} ({self.get_room_type_display()})"
 
     def get_main_image(self):
-        """Returns the first image or None."""
-        return self.images.filter(is_main=True).first() or self.images.first()
+        """
+        Returns the main image, else the first image, else None.
+        Picks from self.images.all() so prefetch_related('images')
+        serves it; without a prefetch it costs a single query.
+        """
+        images = self.images.all()
+        main   = next((image for image in images if image.is_main), None)
+        return main or next(iter(images), None)
     
 def get_absolute_url(self):
     return reverse('rooms:room_detail', kwargs={'pk': self.pk})
@@ -127,11 +133,22 @@ class RoomImage(models.Model):
         _('Display Order'),
         default=0
     )
+    # Resized WebP/JPEG derivatives, written by core.images
+    thumbnails = models.JSONField(
+        _('Thumbnails'),
+        default=dict,
+        blank=True,
+        editable=False
+    )
 
     class Meta:
         verbose_name        = _('Room Image')
         verbose_name_plural = _('Room Images')
         ordering            = ['order', 'id']
+        indexes = [
+            # Gallery keyset pagination: ordered by (room, order, id)
+            models.Index(fields=['room', 'order', 'id'], name='rm_image_gallery_idx'),
+        ]
 
     def __str__(self):
         return f"{self.room.name} — image {self.id}"
@@ -0,0 +1,40 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from core.cache import bump_cache_version
+from core.images import schedule_thumbnails, discard_thumbnails
+from .models import Room, RoomImage
+
+
+def touch_room(room_id):
+    """
+    Image changes count as a change to their room: bumps
+    Room.updated_at and the 'rooms' version (page cache and ETags).
+    """
+    Room.objects.filter(pk=room_id).update(updated_at=timezone.now())
+    transaction.on_commit(lambda: bump_cache_version('rooms'))
+
+
+@receiver(post_save, sender=RoomImage)
+def room_image_saved(sender, instance, **kwargs):
+    # Cached pages pick up the srcset once they exist
+    room_id = instance.room_id
+    schedule_thumbnails(instance, 'image', on_done=lambda: touch_room(room_id))
+
+
+@receiver([post_save, post_delete], sender=RoomImage)
+def room_image_changed(sender, instance, **kwargs):
+    touch_room(instance.room_id)
+
+
+@receiver(post_delete, sender=RoomImage)
+def room_image_deleted(sender, instance, **kwargs):
+    discard_thumbnails(instance, 'image')
+
+
+@receiver([post_save, post_delete], sender=Room)
+def rooms_changed(sender, **kwargs):
+    # Retires the cached home, room and gallery pages. After commit,
+    # or a worker could re-cache the old rows under the new version.
+    transaction.on_commit(lambda: bump_cache_version('rooms'))
@@ -1,3 +1,170 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from core.cache import bump_cache_version
+from bookings.models import RoomBooking, BookingStatus
+from .models import Room, RoomImage
+from .views import _catalog_validators
 
-# Create your tests here.
+
+def make_room(name='Camera Test', images=2, **fields):
+    room = Room.objects.create(
+        name=name,
+        room_type=fields.pop('room_type', 'doppia'),
+        price_per_night=fields.pop('price_per_night', 100),
+        capacity=fields.pop('capacity', 2),
+        **fields,
+    )
+    for i in range(images):
+        RoomImage.objects.create(room=room, image=f'rooms/{name}-{i}.jpg', order=i, is_main=(i == 1))
+    return room
+
+
+# ══════════════════════════════════════════════════════════════
+#   MAIN IMAGE QUERIES
+# ══════════════════════════════════════════════════════════════
+
+class RoomMainImageQueryTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        for i in range(3):
+            make_room(f'Camera {i}')
+
+    def test_prefetched_main_image_costs_no_queries(self):
+        rooms = list(Room.objects.prefetch_related('images'))
+        with self.assertNumQueries(0):
+            mains = [room.get_main_image() for room in rooms]
+        self.assertTrue(all(image.is_main for image in mains))
+
+    def test_main_image_without_prefetch_is_one_query(self):
+        room = Room.objects.first()
+        with self.assertNumQueries(1):
+            self.assertTrue(room.get_main_image().is_main)
+
+    def test_room_without_images_returns_none(self):
+        room = make_room('Camera Vuota', images=0)
+        self.assertIsNone(room.get_main_image())
+
+    def test_room_list_queries_do_not_grow_with_rooms(self):
+        def list_queries():
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse('rooms:room_list'))
+            self.assertEqual(response.status_code, 200)
+            return len(queries)
+
+        before = list_queries()
+        for i in range(3, 9):
+            make_room(f'Camera {i}')
+        self.assertEqual(list_queries(), before)
+
+
+# ══════════════════════════════════════════════════════════════
+#   CONDITIONAL GET VALIDATORS
+# ══════════════════════════════════════════════════════════════
+
+class CatalogValidatorTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.rooms = [make_room(f'Camera {i}', images=0) for i in range(3)]
+        self.factory = RequestFactory()
+
+    def validators(self, **params):
+        return _catalog_validators(self.factory.get('/rooms/', params))
+
+    def test_validators_cost_no_queries(self):
+        # With Redis or LocMem; the DatabaseCache fallback costs a query per stamp
+        self.validators()
+        with self.assertNumQueries(0):
+            etag, last_modified = self.validators()
+        self.assertIsNone(last_modified)
+
+    def test_stay_filter_adds_the_calendar_version(self):
+        check_in = date.today() + timedelta(days=10)
+        stay     = {'check_in': check_in.isoformat(), 'check_out': (check_in + timedelta(days=2)).isoformat()}
+        etag, _last_modified = self.validators(**stay)
+        self.assertNotEqual(etag, self.validators()[0])
+
+        bump_cache_version('room-calendar')
+        self.assertNotEqual(self.validators(**stay)[0], etag)
+
+    def test_withdrawn_room_moves_the_etag_after_commit(self):
+        before = self.validators()[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            room = self.rooms[0]
+            room.is_available = False
+            room.save()
+        self.assertNotEqual(self.validators()[0], before)
+
+    def test_warm_anonymous_pages_cost_no_queries(self):
+        for url in [reverse('rooms:room_list'), reverse('rooms:room_detail', args=[self.rooms[0].pk])]:
+            with self.subTest(url=url):
+                self.client.get(url)
+                with self.assertNumQueries(0):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                with self.assertNumQueries(0):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(response.status_code, 304)
+
+
+# ══════════════════════════════════════════════════════════════
+#   STAY FILTER
+# ══════════════════════════════════════════════════════════════
+
+class RoomStayFilterTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.busy     = make_room('Camera Occupata', images=0)
+        self.free     = make_room('Camera Libera', images=0)
+        self.check_in = date.today() + timedelta(days=10)
+        RoomBooking.objects.create(
+            room=self.busy, guest_name='Ospite', guest_email='guest@example.com',
+            check_in=self.check_in, check_out=self.check_in + timedelta(days=3),
+            guests=2, status=BookingStatus.CONFIRMED,
+        )
+
+    def listed(self, check_in, check_out):
+        response = self.client.get(reverse('rooms:room_list'), {
+            'check_in': str(check_in), 'check_out': str(check_out),
+        })
+        self.assertEqual(response.status_code, 200)
+        names = {room.name for room in response.context['rooms']}
+        return names, response.context['stay_valid']
+
+    def test_overlapping_booking_hides_the_room(self):
+        names, valid = self.listed(
+            self.check_in + timedelta(days=2), self.check_in + timedelta(days=5),
+        )
+        self.assertTrue(valid)
+        self.assertEqual(names, {'Camera Libera'})
+
+    def test_adjacent_stays_do_not_overlap(self):
+        # Arrive on the previous guest's check-out day
+        names, _valid = self.listed(
+            self.check_in + timedelta(days=3), self.check_in + timedelta(days=5),
+        )
+        self.assertEqual(names, {'Camera Occupata', 'Camera Libera'})
+
+        # Leave on the next guest's check-in day
+        names, _valid = self.listed(self.check_in - timedelta(days=2), self.check_in)
+        self.assertEqual(names, {'Camera Occupata', 'Camera Libera'})
+
+    def test_invalid_or_reversed_dates_are_ignored(self):
+        for check_in, check_out in [
+            ('not-a-date', self.check_in),
+            (self.check_in, '2026-02-30'),
+            (self.check_in + timedelta(days=2), self.check_in),
+            (self.check_in, self.check_in),
+            (date.today() - timedelta(days=2), self.check_in),
+        ]:
+            with self.subTest(check_in=check_in, check_out=check_out):
+                names, valid = self.listed(check_in, check_out)
+                self.assertFalse(valid)
+                self.assertEqual(names, {'Camera Occupata', 'Camera Libera'})
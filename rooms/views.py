@@ -1,9 +1,47 @@
-from django.shortcuts import render, get_object_or_404
+from core.cache import cache_public_page, conditional_page, version_validators
+from core.shortcuts import arender, aget_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.utils.translation import gettext_lazy as _
+from bookings.inventory import free_rooms
 from .models import Room, RoomType
 
 
-def room_list(request):
+def _parse_stay(check_in, check_out):
+    """
+    Returns (check_in, check_out) as dates when both query params
+    describe a valid future stay, otherwise (None, None).
+    """
+    try:
+        check_in  = parse_date(check_in)
+        check_out = parse_date(check_out)
+    except ValueError:
+        return None, None
+    if not check_in or not check_out:
+        return None, None
+    if check_out <= check_in or check_in < timezone.now().date():
+        return None, None
+    return check_in, check_out
+
+
+_catalog_etag = version_validators('rooms')
+_stay_etag    = version_validators('rooms', 'room-calendar')
+
+
+def _catalog_validators(request, pk=None):
+    """
+    ETag for the room pages from the 'rooms' version stamp, which every
+    Room / RoomImage change bumps; stay filters depend on bookings too.
+    No queries with a Redis cache.
+    """
+    if request.GET.get('check_in') and request.GET.get('check_out'):
+        return _stay_etag(request)
+    return _catalog_etag(request)
+
+
+@conditional_page(_catalog_validators)
+@cache_public_page('rooms', 'room-calendar')
+async def room_list(request):
     rooms = Room.objects.filter(is_available=True).prefetch_related('images')
 
     # ── Filters ──────────────────────────────────────────
@@ -12,6 +50,8 @@ def room_list(request):
     min_price = request.GET.get('min_price', '')
     max_price = request.GET.get('max_price', '')
     sort_by   = request.GET.get('sort',      'price_asc')
+    check_in  = request.GET.get('check_in',  '')
+    check_out = request.GET.get('check_out', '')
 
     if room_type:
         rooms = rooms.filter(room_type=room_type)
@@ -22,43 +62,57 @@ def room_list(request):
     if max_price:
         rooms = rooms.filter(price_per_night__lte=max_price)
 
+    # Only rooms free for every night of the stay (one anti-join)
+    stay_in, stay_out = _parse_stay(check_in, check_out)
+    if stay_in:
+        rooms = free_rooms(rooms, stay_in, stay_out)
+
     sort_options = {
         'price_asc':  'price_per_night',
         'price_desc': '-price_per_night',
         'capacity':   '-capacity',
         'name':       'name',
     }
-    rooms = rooms.order_by(sort_options.get(sort_by, 'price_per_night'))
+    rooms = [
+        room async for room in
+        rooms.order_by(sort_options.get(sort_by, 'price_per_night'))
+    ]
 
     context = {
         'rooms':      rooms,
         'room_types': RoomType.choices,
-        'room_count': rooms.count(),
+        'room_count': len(rooms),
         'current_filters': {
             'room_type': room_type,
             'capacity':  capacity,
             'min_price': min_price,
             'max_price': max_price,
             'sort':      sort_by,
+            'check_in':  check_in,
+            'check_out': check_out,
         },
+        'stay_valid': bool(stay_in),
     }
-    return render(request, 'rooms/room_list.html', context)
+    return await arender(request, 'rooms/room_list.html', context)
 
 
-def room_detail(request, pk):
-    room = get_object_or_404(Room, pk=pk, is_available=True)
+@conditional_page(_catalog_validators)
+@cache_public_page('rooms')
+async def room_detail(request, pk):
+    room = await aget_object_or_404(Room.objects.filter(is_available=True), pk=pk)
 
     # All images for the gallery
-    images = room.images.all().order_by('order', 'id')
+    images = [image async for image in room.images.all().order_by('order', 'id')]
 
     # Other rooms to suggest at the bottom (same type, exclude current)
-    related_rooms = Room.objects.filter(
-        is_available=True
-    ).exclude(pk=pk).prefetch_related('images')[:3]
+    related_rooms = [
+        related async for related in
+        Room.objects.filter(is_available=True).exclude(pk=pk).prefetch_related('images')[:3]
+    ]
 
     context = {
         'room':          room,
         'images':        images,
         'related_rooms': related_rooms,
     }
-    return render(request, 'rooms/room_detail.html', context)
\ No newline at end of file
+    return await arender(request, 'rooms/room_detail.html', context)
\ No newline at end of file
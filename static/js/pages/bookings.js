@@ -29,11 +29,49 @@ document.addEventListener('DOMContentLoaded', function () {
         }
       }
       updateSummary();
+      checkAvailability();
     });
   }
 
   if (checkOut) {
-    checkOut.addEventListener('change', updateSummary);
+    checkOut.addEventListener('change', function () {
+      updateSummary();
+      checkAvailability();
+    });
+  }
+
+  // ── Warn when the room is booked for any chosen night ──
+  function checkAvailability() {
+    const warning = document.getElementById('datesUnavailable');
+    if (!warning || !priceMeta || !priceMeta.dataset.room) return;
+    if (!checkIn.value || !checkOut.value || checkOut.value <= checkIn.value) {
+      warning.style.display = 'none';
+      return;
+    }
+
+    const start  = checkIn.value.slice(0, 7);
+    const first  = new Date(start + '-01T00:00:00Z');
+    const last   = new Date(checkOut.value + 'T00:00:00Z');
+    const months = Math.min(12,
+      (last.getUTCFullYear() - first.getUTCFullYear()) * 12 +
+      (last.getUTCMonth() - first.getUTCMonth()) + 1);
+    const url = priceMeta.dataset.calendarUrl +
+      '?room=' + priceMeta.dataset.room + '&start=' + start + '&months=' + months;
+
+    fetch(url, { headers: { 'Accept': 'application/json' } })
+      .then(function (response) { return response.ok ? response.json() : null; })
+      .then(function (data) {
+        if (!data) return;
+        const day  = 24 * 60 * 60 * 1000;
+        const from = (new Date(checkIn.value + 'T00:00:00Z') - first) / day;
+        const to   = (last - first) / day;
+        const runs = data.rooms[priceMeta.dataset.room] || [];
+        const clash = runs.some(function (run) {
+          return run[0] < to && run[0] + run[1] > from;
+        });
+        warning.style.display = clash ? 'block' : 'none';
+      })
+      .catch(function () { /* Server-side validation still applies */ });
   }
 
   if (guestsInput) {
@@ -61,5 +99,6 @@ document.addEventListener('DOMContentLoaded', function () {
 
   // Initial call in case dates are pre-filled
   updateSummary();
+  if (checkIn && checkOut) checkAvailability();
 
 });
\ No newline at end of file
@@ -28,6 +28,46 @@ document.addEventListener('DOMContentLoaded', function () {
     });
   });
 
+  // ── Infinite scroll (keyset pages from /gallery/<section>/) ──
+  const moreObserver = 'IntersectionObserver' in window && new IntersectionObserver(
+    function (entries) {
+      entries.forEach(function (entry) {
+        if (entry.isIntersecting) loadMore(entry.target);
+      });
+    },
+    { rootMargin: '600px 0px' }
+  );
+
+  function loadMore(sentinel) {
+    if (sentinel.dataset.loading) return;
+    sentinel.dataset.loading = '1';
+    const grid = sentinel.previousElementSibling;
+
+    fetch(sentinel.dataset.nextUrl, { headers: { 'Accept': 'application/json' } })
+      .then(function (res) { return res.json(); })
+      .then(function (data) {
+        grid.insertAdjacentHTML('beforeend', data.html);
+        // New items arrive after main.js set up scroll reveal
+        grid.querySelectorAll('.reveal:not(.revealed)').forEach(function (el) {
+          el.classList.add('revealed');
+        });
+        if (data.next) {
+          sentinel.dataset.nextUrl = data.next;
+          delete sentinel.dataset.loading;
+        } else {
+          moreObserver.unobserve(sentinel);
+          sentinel.remove();
+        }
+      })
+      .catch(function () { delete sentinel.dataset.loading; });
+  }
+
+  if (moreObserver) {
+    document.querySelectorAll('.gallery-more').forEach(function (el) {
+      moreObserver.observe(el);
+    });
+  }
+
   // ── Lightbox ──────────────────────────────────────────
   const lightbox     = document.getElementById('lightbox');
   const lbImg        = document.getElementById('lbImg');
@@ -16,17 +16,50 @@ document.addEventListener('DOMContentLoaded', function () {
 
     dateInput.addEventListener('change', function () {
       validateDay(this.value);
+      loadAvailability(this.value);
       updateSummary();
     });
   }
 
-  // ── Block Mondays ──────────────────────────────────────
+  // ── Disable full / closed time slots ───────────────────
+  const slotField = document.getElementById('timeSlotField');
+
+  function loadAvailability(dateValue) {
+    if (!dateValue || !slotField || !timeSelect) return;
+    const url = slotField.dataset.availabilityUrl + '?date=' + encodeURIComponent(dateValue);
+
+    fetch(url, { headers: { 'Accept': 'application/json' } })
+      .then(function (response) { return response.ok ? response.json() : null; })
+      .then(function (data) {
+        if (!data) return;
+        const available = {};
+        data.slots.forEach(function (slot) {
+          available[slot.time_slot] = slot.available;
+        });
+        Array.from(timeSelect.options).forEach(function (option) {
+          if (option.value in available) option.disabled = !available[option.value];
+        });
+        // Move off a slot that just became unavailable
+        const selected = timeSelect.options[timeSelect.selectedIndex];
+        if (selected && selected.disabled) {
+          const firstOpen = Array.from(timeSelect.options).find(function (o) { return !o.disabled; });
+          if (firstOpen) timeSelect.value = firstOpen.value;
+          updateServiceLabel(timeSelect.value);
+          updateSummary();
+        }
+      })
+      .catch(function () { /* Server-side validation still applies */ });
+  }
+
+  // ── Block closed days (from RestaurantSettings) ────────
   function validateDay(dateValue) {
     if (!dateValue) return;
-    const day     = new Date(dateValue).getDay();
-    const warning = document.getElementById('mondayWarning');
-    // getDay() returns 1 for Monday
-    if (day === 1) {
+    const warning = document.getElementById('closedDayWarning');
+    if (!warning || !warning.dataset.closedWeekdays) return;
+    const closed  = warning.dataset.closedWeekdays.split(',').map(Number);
+    // Server sends Python weekdays (Monday = 0); getDay() has Sunday = 0
+    const day     = (new Date(dateValue).getDay() + 6) % 7;
+    if (closed.indexOf(day) !== -1) {
       if (warning) warning.style.display = 'block';
       if (dateInput) dateInput.value = '';
     } else {
@@ -88,5 +121,6 @@ document.addEventListener('DOMContentLoaded', function () {
 
   // Initial summary update
   updateSummary();
+  if (dateInput) loadAvailability(dateInput.value);
 
 });
\ No newline at end of file